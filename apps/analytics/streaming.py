@@ -4,10 +4,12 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 import time
 
+from greaterwms.routers import read_alias, replica_reads
+
 class AnalyticsStreaming:
     @staticmethod
-    def get_realtime_data():
-        """Get real-time analytics data"""
+    def get_realtime_data(using):
+        """Get real-time analytics data from the ``using`` database alias"""
         from goods.models import ListModel as Product
         from orders.models import SalesOrder
         from stock.models import StockListModel
@@ -16,28 +18,33 @@ class AnalyticsStreaming:
         
         data = {
             'timestamp': timezone.now().isoformat(),
-            'total_products': Product.objects.filter(is_delete=False).count(),
-            'total_orders': SalesOrder.objects.count(),
-            'low_stock_items': StockListModel.objects.filter(goods_qty__lt=10).count(),
-            'total_customers': Customer.objects.filter(is_delete=False).count(),
-            'orders_today': SalesOrder.objects.filter(created_at__date=timezone.now().date()).count(),
+            'total_products': Product.objects.using(using).filter(is_delete=False).count(),
+            'total_orders': SalesOrder.objects.using(using).count(),
+            'low_stock_items': StockListModel.objects.using(using).filter(goods_qty__lt=10).count(),
+            'total_customers': Customer.objects.using(using).filter(is_delete=False).count(),
+            'orders_today': SalesOrder.objects.using(using).filter(created_at__date=timezone.now().date()).count(),
         }
         
         return data
     
     @staticmethod
-    def event_stream():
+    def event_stream(using):
         """Server-Sent Events stream for real-time updates"""
         while True:
-            data = AnalyticsStreaming.get_realtime_data()
+            data = AnalyticsStreaming.get_realtime_data(using)
             yield f"data: {json.dumps(data)}\n\n"
             time.sleep(5)  # Update every 5 seconds
 
 @login_required
 def realtime_stream(request):
     """SSE endpoint for real-time analytics"""
+    # The stream is iterated after ReplicaPinMiddleware has let go of the
+    # request, when the session's primary pin can no longer be seen; pick
+    # the alias now and keep it for the life of the stream.
+    with replica_reads():
+        using = read_alias()
     response = StreamingHttpResponse(
-        AnalyticsStreaming.event_stream(),
+        AnalyticsStreaming.event_stream(using),
         content_type='text/event-stream'
     )
     response['Cache-Control'] = 'no-cache'
@@ -7,6 +7,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
+from django.utils import timezone
 from datetime import datetime, timedelta
 import json
 
@@ -15,6 +16,7 @@ from storage.models import StorageUnit, StorageBooking
 from lockers.models import Locker, LockerBooking
 from permissions.decorators import require_role
 from payments.unified_payment import UnifiedPayment
+from availability.engine import Unavailable, reserve
 
 
 @login_required
@@ -53,27 +55,28 @@ def process_rental_booking(request):
         item = RentalItem.objects.get(id=item_id)
         
         # Calculate amount based on duration
+        start_date = timezone.now()
         if duration_type == 'hourly':
             total_amount = item.hourly_rate * duration_count
-            end_date = datetime.now() + timedelta(hours=duration_count)
+            end_date = start_date + timedelta(hours=duration_count)
         elif duration_type == 'daily':
             total_amount = item.daily_rate * duration_count
-            end_date = datetime.now() + timedelta(days=duration_count)
+            end_date = start_date + timedelta(days=duration_count)
         elif duration_type == 'weekly':
             total_amount = item.weekly_rate * duration_count
-            end_date = datetime.now() + timedelta(weeks=duration_count)
+            end_date = start_date + timedelta(weeks=duration_count)
         elif duration_type == 'monthly':
             total_amount = item.monthly_rate * duration_count
-            end_date = datetime.now() + timedelta(days=30 * duration_count)
+            end_date = start_date + timedelta(days=30 * duration_count)
         else:
             return JsonResponse({'success': False, 'message': 'Invalid duration type'}, status=400)
         
         # Create booking
         with transaction.atomic():
-            booking = RentalBooking.objects.create(
+            booking = reserve('rental', item.id, start_date, end_date, lambda: RentalBooking.objects.create(
                 customer=request.user,
                 item=item,
-                start_date=datetime.now(),
+                start_date=start_date,
                 end_date=end_date,
                 duration_type=duration_type,
                 duration_count=duration_count,
@@ -82,7 +85,7 @@ def process_rental_booking(request):
                 terms_agreed=agree_terms,
                 penalty_agreed=agree_penalty,
                 liability_agreed=agree_liability,
-            )
+            ))
             
             # Reduce stock if item has stock tracking
             if hasattr(item, 'stock_quantity') and item.stock_quantity:
@@ -105,6 +108,8 @@ def process_rental_booking(request):
                 'booking_reference': f'RB{booking.id:05d}',
             })
     
+    except Unavailable as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=409)
     except RentalItem.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Item not found'}, status=404)
     except Exception as e:
@@ -151,7 +156,7 @@ def process_storage_booking(request):
 
         # Parse start date and duration months
         try:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
+            start_date = timezone.make_aware(datetime.strptime(start_date_str, '%Y-%m-%d'))
         except ValueError:
             return JsonResponse({'success': False, 'message': 'Invalid start date format (expected YYYY-MM-DD)'}, status=400)
 
@@ -177,7 +182,7 @@ def process_storage_booking(request):
 
         # Create booking
         with transaction.atomic():
-            booking = StorageBooking.objects.create(
+            booking = reserve('storage', unit.id, start_date, end_date, lambda: StorageBooking.objects.create(
                 user=request.user,
                 unit=unit,
                 start_date=start_date,
@@ -188,7 +193,7 @@ def process_storage_booking(request):
                 terms_agreed=agree_terms,
                 penalty_agreed=agree_penalty,
                 liability_agreed=agree_liability,
-            )
+            ))
 
             # Process payment using unified service
             payment_method = data.get('payment_method', 'online')
@@ -211,6 +216,8 @@ def process_storage_booking(request):
                 'access_code': access_code,
             })
 
+    except Unavailable as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=409)
     except StorageUnit.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Unit not found'}, status=404)
     except Exception as e:
@@ -272,18 +279,19 @@ def process_locker_booking(request):
             return JsonResponse({'success': False, 'message': 'Locker type not configured'}, status=400)
 
         # Calculate amount based on duration
+        start_date = timezone.now()
         if duration_type == 'hourly':
             total_amount = locker_type.hourly_rate * duration_count
-            end_date = datetime.now() + timedelta(hours=duration_count)
+            end_date = start_date + timedelta(hours=duration_count)
         elif duration_type == 'daily':
             total_amount = locker_type.daily_rate * duration_count
-            end_date = datetime.now() + timedelta(days=duration_count)
+            end_date = start_date + timedelta(days=duration_count)
         elif duration_type == 'weekly':
             total_amount = locker_type.weekly_rate * duration_count
-            end_date = datetime.now() + timedelta(weeks=duration_count)
+            end_date = start_date + timedelta(weeks=duration_count)
         elif duration_type == 'monthly':
             total_amount = locker_type.monthly_rate * duration_count
-            end_date = datetime.now() + timedelta(days=30 * duration_count)
+            end_date = start_date + timedelta(days=30 * duration_count)
         else:
             return JsonResponse({'success': False, 'message': 'Invalid duration type'}, status=400)
 
@@ -297,7 +305,7 @@ def process_locker_booking(request):
         
         # Create booking
         with transaction.atomic():
-            booking = LockerBooking.objects.create(
+            booking = reserve('locker', locker.id, start_date, end_date, lambda: LockerBooking.objects.create(
                 created_by=request.user,
                 locker=locker,
                 customer_name=customer_name,
@@ -305,7 +313,7 @@ def process_locker_booking(request):
                 customer_phone=customer_phone,
                 duration_type=duration_type,
                 duration_count=duration_count,
-                start_date=datetime.now(),
+                start_date=start_date,
                 end_date=end_date,
                 access_code=access_code,
                 total_amount=total_amount,
@@ -313,7 +321,7 @@ def process_locker_booking(request):
                 terms_agreed=agree_terms,
                 penalty_agreed=agree_penalty,
                 liability_agreed=agree_liability,
-            )
+            ))
 
             # Process payment using unified service
             payment_method = data.get('payment_method', 'online')
@@ -331,6 +339,8 @@ def process_locker_booking(request):
                 'booking_reference': f'LB{booking.id:05d}',
             })
 
+    except Unavailable as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=409)
     except Locker.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Locker not found'}, status=404)
     except Exception as e:
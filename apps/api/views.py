@@ -2,6 +2,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.db import connection, models
+from django.utils import timezone
 from goods.models import ListModel
 from stock.models import StockListModel
 from orders.models import Order
@@ -29,7 +30,7 @@ def bulk_product_action(request):
     ids = data.get('ids', [])
     
     if action == 'delete':
-        ListModel.objects.filter(id__in=ids).update(is_delete=True)
+        ListModel.objects.filter(id__in=ids).update(is_delete=True, update_time=timezone.now())
         return JsonResponse({'status': 'success', 'message': f'{len(ids)} products deleted'})
     
     return JsonResponse({'status': 'error', 'message': 'Invalid action'})
@@ -72,23 +73,15 @@ def audit_logs(request):
 @login_required
 @require_role('superadmin', 'admin')
 def get_settings(request):
-    with connection.cursor() as cursor:
-        cursor.execute('SELECT key, value, category FROM settings_systemsetting')
-        settings = {row[0]: {'value': row[1], 'category': row[2]} for row in cursor.fetchall()}
-    
-    return JsonResponse({'settings': settings})
+    from settings import store
+    return JsonResponse({'settings': store.all_values()})
 
 @login_required
 @require_role('superadmin', 'admin')
 @require_http_methods(["POST"])
 def save_settings(request):
+    from settings import store
     data = json.loads(request.body)
-    
-    with connection.cursor() as cursor:
-        for key, value in data.items():
-            cursor.execute('''
-                INSERT OR REPLACE INTO settings_systemsetting (key, value, category, updated_at)
-                VALUES (?, ?, ?, datetime('now'))
-            ''', [key, value, 'general'])
+    store.set_many(data, category='general')
     
     return JsonResponse({'status': 'success', 'message': 'Settings saved'})
@@ -1,10 +1,12 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.db import connection
 import json
-import requests
 
 class AuditLogMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
+        # Views that write their own (aggregated) entry set ``audit_logged``.
+        if getattr(request, 'audit_logged', False):
+            return response
         if request.user.is_authenticated and request.method in ['POST', 'PUT', 'DELETE', 'PATCH']:
             try:
                 ip = self.get_client_ip(request)
@@ -37,6 +39,8 @@ class AuditLogMiddleware(MiddlewareMixin):
             return {'city': 'Local', 'country': 'Local', 'risk': 'low'}
         
         try:
+            import requests
+
             # Use free IP geolocation API
             response = requests.get(f'http://ip-api.com/json/{ip}', timeout=2)
             if response.status_code == 200:
@@ -6,9 +6,14 @@ class AuthSystemConfig(AppConfig):
     
     def ready(self):
         # Clear all sessions on server start to force re-login
+        from importlib import import_module
+        from django.conf import settings
         from django.contrib.sessions.models import Session
         try:
             Session.objects.all().delete()
+            engine = import_module(settings.SESSION_ENGINE)
+            if hasattr(engine, 'invalidate_all'):
+                engine.invalidate_all()
             print("✅ All sessions cleared - Users must login again")
         except:
             pass
@@ -0,0 +1,91 @@
+"""
+benchmark_access_middleware – per-request cost of RoleBasedAccessMiddleware.
+
+Runs the middleware in front of a no-op view for typical paths (static
+asset, public page, protected page, admin-only page as staff and as a
+customer) and reports the median overhead per request and the queries it
+issued, with a cold and a warm role cache. Synthetic users are created in
+a transaction that is rolled back:
+    python manage.py benchmark_access_middleware
+    python manage.py benchmark_access_middleware --iterations 50000
+"""
+import copy
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from auth_system.middleware import RoleBasedAccessMiddleware
+from permissions import roles
+from users.models import UserProfile
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the per-request overhead of RoleBasedAccessMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options['iterations'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _run(self, iterations):
+        staff = User.objects.create_user('bench-access-staff', is_staff=True)
+        customer = User.objects.create_user('bench-access-customer')
+        UserProfile.objects.update_or_create(user=staff, defaults={'role': 'staff'})
+        UserProfile.objects.update_or_create(user=customer, defaults={'role': 'customer'})
+        factory = RequestFactory(SERVER_NAME='localhost')
+        ok = HttpResponse()
+        middleware = RoleBasedAccessMiddleware(lambda request: ok)
+
+        def make_request(path, user):
+            request = factory.get(path)
+            # A fresh user object per request, as AuthenticationMiddleware would load it.
+            request.user = copy.copy(user)
+            request.user.__dict__.pop('_cached_role', None)
+            request.session = SessionStore()
+            request.session['login_verified'] = True
+            return request
+
+        scenarios = [
+            ('static asset', '/static/css/app.css', AnonymousUser()),
+            ('public page', '/about/', AnonymousUser()),
+            ('protected page', '/dashboard/', staff),
+            ('admin-only, staff', '/inventory/', staff),
+            ('admin-only, customer', '/stock/', customer),
+        ]
+        self.stdout.write(f'{"":<22} {"cold queries":>12} {"warm queries":>12} {"median":>10}')
+        for label, path, user in scenarios:
+            roles.clear()
+            with CaptureQueriesContext(connection) as cold:
+                status = middleware(make_request(path, user)).status_code
+            with CaptureQueriesContext(connection) as warm:
+                middleware(make_request(path, user))
+            samples = []
+            for _ in range(5):
+                requests = [make_request(path, user) for _ in range(iterations // 5)]
+                started = time.perf_counter()
+                for request in requests:
+                    # What the request_started hook does: re-read the shared version once.
+                    roles.VERSION.forget()
+                    middleware(request)
+                samples.append((time.perf_counter() - started) / len(requests))
+            self.stdout.write(
+                f'{label:<22} {len(cold.captured_queries):>12} {len(warm.captured_queries):>12} '
+                f'{statistics.median(samples) * 1e6:>8.2f}µs  ({status})'
+            )
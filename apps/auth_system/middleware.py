@@ -1,84 +1,126 @@
+import re
+
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.http import HttpResponseForbidden
 
+# Public paths that don't require authentication (URL names are reversed once).
+PUBLIC_URL_NAMES = [
+    'auth:login_selection',
+    'auth:team_login',
+    'auth:customer_login',
+    'auth:register',
+    'auth:logout',
+    'auth:forgot_password',
+    'auth:guest_access',
+]
+PUBLIC_PREFIXES = [
+    '/admin/',
+    '/static/',
+    '/media/',
+    '/about/',
+    '/help/',
+    '/api/goods/',
+    '/health/',
+    '/forums/',
+    '/guest/',  # Guest access
+]
+# Home page is public, but only the exact paths.
+PUBLIC_EXACT = frozenset(['/', '/home/'])
+
+# Admin-only URLs that customers cannot access
+ADMIN_ONLY_PREFIXES = [
+    '/products/create/',
+    '/products/edit/',
+    '/products/delete/',
+    '/inventory/',
+    '/stock/',
+    '/customers/',
+    '/suppliers/',
+    '/team/',
+    '/warehouses/',
+    '/categories/create/',
+    '/categories/edit/',
+    '/barcode/',
+    '/analytics/',
+    '/reports/',
+    '/expenses/',
+    '/permissions/',
+    '/audit/',
+    '/admin-panel/',
+    '/system-settings/',
+    '/api/dashboard-metrics/',
+    '/api/dashboard-charts/',
+]
+
+
+def _prefix_regex(prefixes):
+    """One anchored alternation for a prefix list; longest first so overlaps cannot matter."""
+    return re.compile('|'.join(re.escape(prefix) for prefix in sorted(set(prefixes), key=len, reverse=True)))
+
+
+class PathPolicy:
+    """The path rules above, compiled once into two regexes and a set."""
+
+    PUBLIC = 'public'
+    ADMIN_ONLY = 'admin_only'
+    PROTECTED = 'protected'
+
+    def __init__(self, public_prefixes, public_exact, admin_only_prefixes):
+        self.public = _prefix_regex(public_prefixes).match
+        self.public_exact = frozenset(public_exact)
+        self.admin_only = _prefix_regex(admin_only_prefixes).match
+
+    @classmethod
+    def compile(cls):
+        return cls([reverse(name) for name in PUBLIC_URL_NAMES] + PUBLIC_PREFIXES, PUBLIC_EXACT, ADMIN_ONLY_PREFIXES)
+
+    def classify(self, path):
+        if path in self.public_exact or self.public(path):
+            return self.PUBLIC
+        if self.admin_only(path):
+            return self.ADMIN_ONLY
+        return self.PROTECTED
+
+
 class RoleBasedAccessMiddleware:
+    """
+    Login-selection gate and customer restrictions.
+
+    Public paths (static and media included) pass straight through without
+    touching the session or the user. The policy is compiled on the first
+    request, once the URLconf is importable, and the role comes from the
+    shared role cache (``permissions.roles``) only for admin-only paths.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
+        self.policy = None
 
     def __call__(self, request):
-        # Public paths that don't require authentication
-        public_paths = [
-            reverse('auth:login_selection'),
-            reverse('auth:team_login'),
-            reverse('auth:customer_login'),
-            reverse('auth:register'),
-            reverse('auth:logout'),
-            reverse('auth:forgot_password'),
-            reverse('auth:guest_access'),
-            '/admin/',
-            '/static/',
-            '/media/',
-            '/about/',
-            '/help/',
-            '/api/goods/',
-            '/health/',
-            '/forums/',
-            '/guest/',  # Guest access
-        ]
-        
-        # Admin-only URLs that customers cannot access
-        admin_only_urls = [
-            '/products/create/',
-            '/products/edit/',
-            '/products/delete/',
-            '/inventory/',
-            '/stock/',
-            '/customers/',
-            '/suppliers/',
-            '/team/',
-            '/warehouses/',
-            '/categories/create/',
-            '/categories/edit/',
-            '/barcode/',
-            '/analytics/',
-            '/reports/',
-            '/expenses/',
-            '/permissions/',
-            '/audit/',
-            '/admin-panel/',
-            '/system-settings/',
-            '/api/dashboard-metrics/',
-            '/api/dashboard-charts/',
-        ]
-        
-        # Check if path is public
-        is_public = any(request.path.startswith(path) for path in public_paths)
-        
-        # Allow public access to home page
-        if request.path == '/' or request.path == '/home/':
-            is_public = True
-        
+        if self.policy is None:
+            self.policy = PathPolicy.compile()
+        kind = self.policy.classify(request.path)
+        if kind == PathPolicy.PUBLIC:
+            return self.get_response(request)
+
         # CUSTOMER ROLE RESTRICTIONS
-        if request.user.is_authenticated and hasattr(request.user, 'role'):
-            if request.user.role.role == 'customer':
-                # Block admin URLs for customers
-                for admin_url in admin_only_urls:
-                    if request.path.startswith(admin_url):
-                        return HttpResponseForbidden(
-                            '<h1>Access Denied</h1>'
-                            '<p>Customers do not have permission to access this page.</p>'
-                            '<p><a href="/dashboard/">Return to Dashboard</a></p>'
-                        )
-        
+        if kind == PathPolicy.ADMIN_ONLY and request.user.is_authenticated:
+            from permissions.decorators import get_user_role
+            if get_user_role(request.user) == 'customer':
+                return HttpResponseForbidden(
+                    '<h1>Access Denied</h1>'
+                    '<p>Customers do not have permission to access this page.</p>'
+                    '<p><a href="/dashboard/">Return to Dashboard</a></p>'
+                )
+
         # FORCE login selection if session not verified (only for protected pages)
-        if not is_public and not request.session.get('login_verified', False):
+        if not request.session.get('login_verified', False):
             # Clear any existing authentication
             if request.user.is_authenticated:
                 from django.contrib.auth import logout
                 logout(request)
             request.session.flush()
             return redirect('auth:login_selection')
-        
+
         response = self.get_response(request)
         return response
@@ -0,0 +1,178 @@
+"""
+Availability engine for rental items, storage units and lockers.
+
+Booked time is indexed in ``BookedInterval`` (one row per booking, kept in
+sync by signals). Questions are answered with range scans on that table:
+
+    free_resources('locker', start, end)           -> queryset of free lockers
+    is_free('storage', unit_id, start, end)        -> bool
+    next_free_slots('rental', ids, duration)       -> {id: earliest start}
+
+``reserve`` creates a booking only if its interval is still free. It locks
+the one resource row being booked (an UPDATE, so SQLite takes its write
+lock up front and PostgreSQL row-locks only that resource), re-checks for
+overlap and then runs the caller's create function in the same transaction.
+Bookings of different resources never wait on each other, and on
+PostgreSQL an exclusion constraint rejects any overlap that slips past.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import BookedInterval
+
+
+class Unavailable(Exception):
+    """The requested resource is already booked for (part of) the interval."""
+
+
+class ResourceSpec:
+    def __init__(self, model, booking_model, booking_fk, occupying_statuses, blocked):
+        self.model_label = model
+        self.booking_label = booking_model
+        self.booking_fk = booking_fk
+        self.occupying_statuses = occupying_statuses
+        self.blocked = blocked
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def booking_model(self):
+        return apps.get_model(self.booking_label)
+
+
+RESOURCES = {
+    'rental': ResourceSpec(
+        'rentals.RentalItem', 'rentals.RentalBooking', 'item',
+        ('pending', 'confirmed', 'active', 'overdue'),
+        Q(status='maintenance'),
+    ),
+    'storage': ResourceSpec(
+        'storage.StorageUnit', 'storage.StorageBooking', 'unit',
+        ('pending', 'active'),
+        Q(status='maintenance'),
+    ),
+    'locker': ResourceSpec(
+        'lockers.Locker', 'lockers.LockerBooking', 'locker',
+        ('pending', 'active', 'overdue'),
+        Q(status__in=('maintenance', 'disabled')) | Q(is_active=False),
+    ),
+}
+
+
+def kind_for_booking(booking):
+    for kind, spec in RESOURCES.items():
+        if booking._meta.label == spec.booking_label:
+            return kind
+    return None
+
+
+def sync_booking(kind, booking):
+    """Create, update or drop the interval row mirroring ``booking``."""
+    spec = RESOURCES[kind]
+    resource_id = getattr(booking, f'{spec.booking_fk}_id')
+    occupying = booking.status in spec.occupying_statuses
+    if not occupying or not booking.start_date or not booking.end_date or booking.end_date <= booking.start_date:
+        BookedInterval.objects.filter(resource_type=kind, booking_id=booking.pk).update(is_active=False)
+        return
+    BookedInterval.objects.update_or_create(
+        resource_type=kind, booking_id=booking.pk,
+        defaults={
+            'resource_id': resource_id,
+            'start': booking.start_date,
+            'end': booking.end_date,
+            'is_active': True,
+        },
+    )
+
+
+def drop_booking(kind, booking):
+    BookedInterval.objects.filter(resource_type=kind, booking_id=booking.pk).delete()
+
+
+def overlapping(kind, start, end, exclude_booking=None):
+    """Active intervals of ``kind`` that intersect [start, end)."""
+    qs = BookedInterval.objects.filter(resource_type=kind, is_active=True, start__lt=end, end__gt=start)
+    if exclude_booking is not None:
+        qs = qs.exclude(booking_id=exclude_booking)
+    return qs
+
+
+def free_resources(kind, start, end, queryset=None):
+    """
+    Resources of ``kind`` that are bookable for the whole of [start, end).
+
+    One query: the resource table anti-joined against overlapping intervals
+    through the (resource_type, resource_id, start, end) index.
+    """
+    spec = RESOURCES[kind]
+    queryset = spec.model.objects.all() if queryset is None else queryset
+    busy = overlapping(kind, start, end).filter(resource_id=OuterRef('pk'))
+    return queryset.exclude(spec.blocked).filter(~Exists(busy))
+
+
+def is_free(kind, resource_id, start, end, exclude_booking=None):
+    return not overlapping(kind, start, end, exclude_booking).filter(resource_id=resource_id).exists()
+
+
+def next_free_slots(kind, resource_ids, duration, after=None, horizon=timedelta(days=365)):
+    """
+    Earliest start >= ``after`` at which each resource is free for ``duration``.
+
+    Fetches the relevant intervals of all ``resource_ids`` in one query and
+    walks each resource's gaps in order. Resources with no gap inside
+    ``horizon`` map to ``None``.
+    """
+    after = after or timezone.now()
+    limit = after + horizon
+    slots = {resource_id: after for resource_id in resource_ids}
+    settled = set()
+    rows = (
+        BookedInterval.objects
+        .filter(resource_type=kind, resource_id__in=list(resource_ids), is_active=True,
+                end__gt=after, start__lt=limit + duration)
+        .order_by('resource_id', 'start')
+        .values_list('resource_id', 'start', 'end')
+    )
+    for resource_id, start, end in rows:
+        if resource_id in settled:
+            continue
+        candidate = slots[resource_id]
+        if candidate + duration <= start:
+            settled.add(resource_id)
+        elif end > candidate:
+            slots[resource_id] = end
+    return {rid: (slot if slot <= limit else None) for rid, slot in slots.items()}
+
+
+def reserve(kind, resource_id, start, end, create):
+    """
+    Atomically book ``resource_id`` for [start, end).
+
+    ``create`` is called inside the transaction once the interval is known
+    to be free and must create and return the booking; its post_save signal
+    writes the interval row. Raises ``Unavailable`` if the slot is taken or
+    the resource is blocked (maintenance, disabled).
+    """
+    if end <= start:
+        raise ValueError('end must be after start')
+    spec = RESOURCES[kind]
+    try:
+        with transaction.atomic():
+            locked = spec.model.objects.filter(pk=resource_id).update(updated_at=timezone.now())
+            if not locked:
+                raise spec.model.DoesNotExist
+            if spec.model.objects.filter(pk=resource_id).filter(spec.blocked).exists():
+                raise Unavailable('This resource is not available for booking')
+            if not is_free(kind, resource_id, start, end):
+                raise Unavailable('This resource is already booked for the selected dates')
+            return create()
+    except IntegrityError as exc:
+        if 'excl_interval_overlap' in str(exc):
+            raise Unavailable('This resource is already booked for the selected dates') from exc
+        raise
@@ -0,0 +1,45 @@
+"""
+rebuild_availability – regenerate the booked-interval index and the per-day
+occupancy bitmaps from bookings.
+
+Run once after deploying the availability app, or whenever bookings were
+changed with queryset.update() (which bypasses the signals that keep the
+index in sync):
+    python manage.py rebuild_availability
+    python manage.py rebuild_availability --kind locker
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from availability import occupancy
+from availability.engine import RESOURCES
+from availability.models import BookedInterval
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the availability interval index and occupancy bitmaps from rental, storage and locker bookings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(RESOURCES), help='Only rebuild one resource kind.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(RESOURCES)
+        for kind in kinds:
+            spec = RESOURCES[kind]
+            bookings = (
+                spec.booking_model.objects
+                .filter(status__in=spec.occupying_statuses, start_date__isnull=False, end_date__isnull=False)
+                .values_list('pk', f'{spec.booking_fk}_id', 'start_date', 'end_date')
+            )
+            rows = [
+                BookedInterval(resource_type=kind, booking_id=pk, resource_id=resource_id,
+                               start=start, end=end)
+                for pk, resource_id, start, end in bookings.iterator()
+                if end > start
+            ]
+            with transaction.atomic():
+                BookedInterval.objects.filter(resource_type=kind).delete()
+                BookedInterval.objects.bulk_create(rows, batch_size=options['batch_size'])
+                bitmaps = occupancy.rebuild(kind)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {len(rows)} intervals, {bitmaps} occupancy bitmaps'))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookedInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_type', models.CharField(choices=[('rental', 'Rental Item'), ('storage', 'Storage Unit'), ('locker', 'Locker')], max_length=10)),
+                ('resource_id', models.BigIntegerField()),
+                ('booking_id', models.BigIntegerField()),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'availability_intervals',
+                'ordering': ['resource_type', 'resource_id', 'start'],
+                'indexes': [models.Index(fields=['resource_type', 'resource_id', 'start', 'end'], name='idx_interval_resource'), models.Index(fields=['resource_type', 'start', 'end'], name='idx_interval_range')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookedinterval',
+            constraint=models.UniqueConstraint(fields=('resource_type', 'booking_id'), name='uniq_interval_booking'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookedinterval',
+            constraint=models.CheckConstraint(check=models.Q(('end__gt', models.F('start'))), name='interval_end_after_start'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE availability_intervals
+    ADD CONSTRAINT excl_interval_overlap
+    EXCLUDE USING gist (
+        resource_type WITH =,
+        resource_id WITH =,
+        tstzrange("start", "end", '[)') WITH &&
+    ) WHERE (is_active);
+"""
+
+DROP_SQL = "ALTER TABLE availability_intervals DROP CONSTRAINT IF EXISTS excl_interval_overlap;"
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    # SQLite has no exclusion constraints; reserve() serialises per resource instead.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('availability', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exclusion_constraint, drop_exclusion_constraint),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('availability', '0002_postgres_exclusion_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_type', models.CharField(choices=[('rental', 'Rental Item'), ('storage', 'Storage Unit'), ('locker', 'Locker')], max_length=10)),
+                ('resource_id', models.BigIntegerField()),
+                ('year', models.PositiveSmallIntegerField()),
+                ('bits', models.BinaryField(max_length=46)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'availability_occupancy',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='occupancybitmap',
+            constraint=models.UniqueConstraint(fields=('resource_type', 'year', 'resource_id'), name='uniq_occupancy_resource_year'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import models
+
+
+class BookedInterval(models.Model):
+    """
+    One occupied [start, end) interval of a bookable resource.
+
+    Rows mirror RentalBooking, StorageBooking and LockerBooking and are kept
+    in sync by signals, so every "is it free?" question is answered from a
+    single indexed table instead of three booking tables and a status flag.
+    """
+    RESOURCE_TYPES = [
+        ('rental', 'Rental Item'),
+        ('storage', 'Storage Unit'),
+        ('locker', 'Locker'),
+    ]
+
+    resource_type = models.CharField(max_length=10, choices=RESOURCE_TYPES)
+    resource_id = models.BigIntegerField()
+    booking_id = models.BigIntegerField()
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'availability_intervals'
+        ordering = ['resource_type', 'resource_id', 'start']
+        constraints = [
+            models.UniqueConstraint(fields=['resource_type', 'booking_id'], name='uniq_interval_booking'),
+            models.CheckConstraint(check=models.Q(end__gt=models.F('start')), name='interval_end_after_start'),
+        ]
+        indexes = [
+            models.Index(fields=['resource_type', 'resource_id', 'start', 'end'], name='idx_interval_resource'),
+            models.Index(fields=['resource_type', 'start', 'end'], name='idx_interval_range'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource_type}:{self.resource_id} {self.start:%Y-%m-%d %H:%M} → {self.end:%Y-%m-%d %H:%M}"
+
+
+class OccupancyBitmap(models.Model):
+    """
+    Per-day occupancy of one resource for one calendar year.
+
+    Bit ``n`` of ``bits`` (little-endian) is set when any active interval
+    touches day-of-year ``n`` (0-based, in the project time zone). A missing
+    row means the resource is free all year. Maintained incrementally by
+    ``occupancy.refresh`` whenever a booking's interval changes.
+    """
+    resource_type = models.CharField(max_length=10, choices=BookedInterval.RESOURCE_TYPES)
+    resource_id = models.BigIntegerField()
+    year = models.PositiveSmallIntegerField()
+    bits = models.BinaryField(max_length=46)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'availability_occupancy'
+        constraints = [
+            models.UniqueConstraint(fields=['resource_type', 'year', 'resource_id'], name='uniq_occupancy_resource_year'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource_type}:{self.resource_id} {self.year}"
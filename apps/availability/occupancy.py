@@ -0,0 +1,191 @@
+"""
+Per-day occupancy bitmaps and the batched availability search built on them.
+
+Each resource has at most one ``OccupancyBitmap`` row per calendar year with
+one bit per local day. ``refresh`` recomputes the years a changed interval
+touches, so a booking create, cancel or extension rewrites a couple of
+46-byte rows. ``search`` filters resources by attributes in one query,
+loads the bitmaps of the requested years in a second, and tests every
+candidate against the requested days with a single AND per year.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+from .engine import RESOURCES
+from .models import BookedInterval, OccupancyBitmap
+
+BITMAP_BYTES = 46  # 366 days rounded up to whole bytes
+FIT_WINDOW = 14
+
+# Query parameter -> ORM lookup, per resource kind.
+ATTRIBUTE_FILTERS = {
+    'rental': {
+        'category': 'category_id',
+    },
+    'storage': {
+        'unit_type': 'type',
+        'floor': 'floor',
+        'zone': 'zone',
+        'climate': 'is_climate_controlled',
+        'min_size': 'size_sqft__gte',
+        'max_size': 'size_sqft__lte',
+    },
+    'locker': {
+        'size': 'locker_type__size',
+        'locker_type': 'locker_type_id',
+        'climate': 'locker_type__has_climate_control',
+        'location': 'location__icontains',
+    },
+}
+BOOLEAN_FILTERS = {'climate'}
+NUMERIC_FILTERS = {
+    'category': int,
+    'floor': int,
+    'locker_type': int,
+    'min_size': Decimal,
+    'max_size': Decimal,
+}
+PRICE_FIELDS = {
+    'rental': 'daily_rate',
+    'storage': 'price_per_month',
+    'locker': 'locker_type__daily_rate',
+}
+
+
+def _year_bounds(year):
+    tz = timezone.get_current_timezone()
+    return (timezone.make_aware(datetime(year, 1, 1), tz),
+            timezone.make_aware(datetime(year + 1, 1, 1), tz))
+
+
+def day_span(start, end):
+    """First and last local dates touched by the interval [start, end)."""
+    return timezone.localdate(start), timezone.localdate(end - timedelta(microseconds=1))
+
+
+def day_mask(year, first, last):
+    """Bits for the days ``first``..``last`` (inclusive) that fall in ``year``."""
+    first = max(first, date(year, 1, 1))
+    last = min(last, date(year, 12, 31))
+    if last < first:
+        return 0
+    offset = first.timetuple().tm_yday - 1
+    return ((1 << ((last - first).days + 1)) - 1) << offset
+
+
+def refresh(kind, resource_id, start, end):
+    """Recompute the bitmap rows of every year that [start, end) touches."""
+    first, last = day_span(start, end)
+    for year in range(first.year, last.year + 1):
+        year_start, year_end = _year_bounds(year)
+        bits = 0
+        intervals = BookedInterval.objects.filter(
+            resource_type=kind, resource_id=resource_id, is_active=True,
+            start__lt=year_end, end__gt=year_start,
+        ).values_list('start', 'end')
+        for interval_start, interval_end in intervals:
+            bits |= day_mask(year, *day_span(interval_start, interval_end))
+        lookup = {'resource_type': kind, 'resource_id': resource_id, 'year': year}
+        if bits:
+            OccupancyBitmap.objects.update_or_create(
+                **lookup, defaults={'bits': bits.to_bytes(BITMAP_BYTES, 'little')})
+        else:
+            OccupancyBitmap.objects.filter(**lookup).delete()
+
+
+def rebuild(kind):
+    """Regenerate every bitmap of ``kind`` from the interval index."""
+    bitmaps = {}
+    intervals = BookedInterval.objects.filter(resource_type=kind, is_active=True) \
+        .values_list('resource_id', 'start', 'end')
+    for resource_id, start, end in intervals.iterator():
+        first, last = day_span(start, end)
+        for year in range(first.year, last.year + 1):
+            key = (resource_id, year)
+            bitmaps[key] = bitmaps.get(key, 0) | day_mask(year, first, last)
+    OccupancyBitmap.objects.filter(resource_type=kind).delete()
+    OccupancyBitmap.objects.bulk_create([
+        OccupancyBitmap(resource_type=kind, resource_id=resource_id, year=year,
+                        bits=bits.to_bytes(BITMAP_BYTES, 'little'))
+        for (resource_id, year), bits in bitmaps.items()
+    ], batch_size=1000)
+    return len(bitmaps)
+
+
+def clean_filters(kind, params):
+    """
+    The ``ATTRIBUTE_FILTERS`` of ``kind`` present in ``params`` (a query
+    dict), cast to the types their lookups expect. Raises ``ValueError``
+    naming the first invalid value.
+    """
+    filters = {}
+    for key in ATTRIBUTE_FILTERS[kind]:
+        value = params.get(key)
+        if value in (None, ''):
+            continue
+        if key in BOOLEAN_FILTERS:
+            filters[key] = value.lower() in ('1', 'true', 'yes')
+        elif key in NUMERIC_FILTERS:
+            try:
+                number = NUMERIC_FILTERS[key](value)
+            except (ValueError, InvalidOperation):
+                number = None
+            if number is None or (isinstance(number, Decimal) and not number.is_finite()):
+                raise ValueError(f"{key} must be {'a whole number' if NUMERIC_FILTERS[key] is int else 'a number'}")
+            filters[key] = number
+        else:
+            filters[key] = value
+    return filters
+
+
+def _free_run(occupied, day, step):
+    """Free days next to ``day`` walking by ``step``, capped at FIT_WINDOW."""
+    run = 0
+    while run < FIT_WINDOW:
+        day += timedelta(days=step)
+        bits = occupied.get(day.year, 0)
+        if bits >> (day.timetuple().tm_yday - 1) & 1:
+            break
+        run += 1
+    return run
+
+
+def search(kind, first, last, filters=None):
+    """
+    Resources of ``kind`` with no booking on any day from ``first`` to
+    ``last`` (inclusive) that match ``filters`` (``ATTRIBUTE_FILTERS`` keys).
+
+    Returns ``[(resource_id, price, slack)]`` ranked by price, then by best
+    fit: ``slack`` counts the free days around the range, so units whose
+    neighbouring days are already booked come first and longer gaps stay
+    free for longer bookings.
+    """
+    spec = RESOURCES[kind]
+    lookups = {ATTRIBUTE_FILTERS[kind][key]: value for key, value in (filters or {}).items()}
+    candidates = (
+        spec.model.objects.exclude(spec.blocked).filter(**lookups)
+        .values_list('pk', PRICE_FIELDS[kind])
+    )
+    years = range(first.year, last.year + 1)
+    masks = {year: day_mask(year, first, last) for year in years}
+    window = range((first - timedelta(days=FIT_WINDOW)).year, (last + timedelta(days=FIT_WINDOW)).year + 1)
+    occupancy = {}
+    rows = OccupancyBitmap.objects.filter(resource_type=kind, year__in=list(window)) \
+        .values_list('resource_id', 'year', 'bits')
+    for resource_id, year, bits in rows:
+        occupancy.setdefault(resource_id, {})[year] = int.from_bytes(bits, 'little')
+
+    results = []
+    for resource_id, price in candidates:
+        occupied = occupancy.get(resource_id)
+        if occupied is None:
+            results.append((resource_id, price, 2 * FIT_WINDOW))
+            continue
+        if any(occupied.get(year, 0) & mask for year, mask in masks.items()):
+            continue
+        slack = _free_run(occupied, first, -1) + _free_run(occupied, last, 1)
+        results.append((resource_id, price, slack))
+    results.sort(key=lambda row: (row[1] is None, row[1] or 0, row[2], row[0]))
+    return results
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from lockers.models import LockerBooking
+from rentals.models import RentalBooking
+from storage.models import StorageBooking
+
+from . import occupancy
+from .engine import RESOURCES, drop_booking, kind_for_booking, sync_booking
+from .models import BookedInterval
+
+
+def _current_interval(kind, booking):
+    return BookedInterval.objects.filter(resource_type=kind, booking_id=booking.pk) \
+        .values_list('resource_id', 'start', 'end').first()
+
+
+def _refresh_spans(kind, *spans):
+    for span in dict.fromkeys(s for s in spans if s and s[1] and s[2] and s[2] > s[1]):
+        occupancy.refresh(kind, *span)
+
+
+@receiver(post_save, sender=RentalBooking)
+@receiver(post_save, sender=StorageBooking)
+@receiver(post_save, sender=LockerBooking)
+def sync_booked_interval(sender, instance, **kwargs):
+    """Mirror the booking's dates and status into the interval index and day bitmaps."""
+    kind = kind_for_booking(instance)
+    previous = _current_interval(kind, instance)
+    sync_booking(kind, instance)
+    resource_id = getattr(instance, f'{RESOURCES[kind].booking_fk}_id')
+    _refresh_spans(kind, previous, (resource_id, instance.start_date, instance.end_date))
+
+
+@receiver(post_delete, sender=RentalBooking)
+@receiver(post_delete, sender=StorageBooking)
+@receiver(post_delete, sender=LockerBooking)
+def drop_booked_interval(sender, instance, **kwargs):
+    kind = kind_for_booking(instance)
+    previous = _current_interval(kind, instance)
+    drop_booking(kind, instance)
+    _refresh_spans(kind, previous)
@@ -0,0 +1,82 @@
+from datetime import date
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods
+
+from . import occupancy
+from .engine import RESOURCES
+
+MAX_SEARCH_DAYS = 366
+MAX_LIMIT = 100
+
+
+def _describe(kind, obj):
+    if kind == 'rental':
+        return {'title': obj.name, 'summary': obj.category.name, 'price': str(obj.daily_rate), 'price_unit': 'day'}
+    if kind == 'storage':
+        return {
+            'title': obj.unit_number,
+            'summary': f"{obj.size_sqft} sqft, floor {obj.floor}, zone {obj.zone}",
+            'price': str(obj.price_per_month),
+            'price_unit': 'month',
+            'climate_controlled': obj.is_climate_controlled,
+        }
+    return {
+        'title': f"Locker {obj.locker_number}",
+        'summary': f"{obj.locker_type.get_size_display()}, {obj.location}",
+        'price': str(obj.locker_type.daily_rate),
+        'price_unit': 'day',
+        'climate_controlled': obj.locker_type.has_climate_control,
+    }
+
+
+@login_required
+@require_http_methods(["GET"])
+def search_api(request):
+    """
+    Resources free on every day of a date range, filtered and ranked.
+
+    GET /api/availability/search/?type=locker&start=2026-11-02&end=2026-11-08&size=medium&climate=1
+    ``end`` is inclusive and defaults to ``start``. Attribute filters per
+    type are listed in ``occupancy.ATTRIBUTE_FILTERS``.
+    """
+    kind = request.GET.get('type', '')
+    if kind not in RESOURCES:
+        return JsonResponse({'success': False, 'message': f"type must be one of {', '.join(RESOURCES)}"}, status=400)
+    try:
+        first = date.fromisoformat(request.GET.get('start') or timezone.localdate().isoformat())
+        last = date.fromisoformat(request.GET.get('end') or first.isoformat())
+        page = max(1, int(request.GET.get('page', 1)))
+        limit = min(MAX_LIMIT, max(1, int(request.GET.get('limit', 20))))
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid date (YYYY-MM-DD) or paging parameter'}, status=400)
+    if last < first or (last - first).days >= MAX_SEARCH_DAYS:
+        return JsonResponse({'success': False, 'message': f'Date range must be 1 to {MAX_SEARCH_DAYS} days'}, status=400)
+
+    try:
+        filters = occupancy.clean_filters(kind, request.GET)
+    except ValueError as exc:
+        return JsonResponse({'success': False, 'message': str(exc)}, status=400)
+
+    ranked = occupancy.search(kind, first, last, filters)
+    window = ranked[(page - 1) * limit:page * limit]
+    related = {'rental': ['category'], 'storage': [], 'locker': ['locker_type']}[kind]
+    objects = RESOURCES[kind].model.objects.select_related(*related).in_bulk([row[0] for row in window])
+
+    items = []
+    for resource_id, price, slack in window:
+        obj = objects.get(resource_id)
+        if obj is not None:
+            items.append({'id': resource_id, 'type': kind, 'fit_slack_days': slack, **_describe(kind, obj)})
+
+    return JsonResponse({
+        'items': items,
+        'start': first.isoformat(),
+        'end': last.isoformat(),
+        'filters': filters,
+        'page': page,
+        'limit': limit,
+        'total': len(ranked),
+    })
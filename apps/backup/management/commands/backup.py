@@ -0,0 +1,70 @@
+"""
+backup – online, compressed database backup plus incremental media backup.
+
+Run manually:
+    python manage.py backup
+
+Schedule with cron (daily at 1 AM):
+    0 1 * * * /path/to/venv/bin/python manage.py backup --verify --quiet
+
+Flags:
+    --output-dir    Backup root (default: settings.BACKUP_ROOT or <BASE_DIR>/backups).
+    --skip-db / --skip-media
+    --verify        Restore-check the new database dump and re-hash media objects.
+    --keep-days N   Retention by backup timestamp (default 7, 0 = keep everything).
+    --pages N       SQLite pages copied per backup step (default 256).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from backup import engine
+
+
+class Command(BaseCommand):
+    help = 'Back up the database (online, compressed) and media (incremental, content-addressed).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=None, help='Backup root directory.')
+        parser.add_argument('--database', default='default', help='Database alias to back up.')
+        parser.add_argument('--skip-db', action='store_true', help='Do not back up the database.')
+        parser.add_argument('--skip-media', action='store_true', help='Do not back up media files.')
+        parser.add_argument('--verify', action='store_true', help='Verify the backups after writing them.')
+        parser.add_argument('--keep-days', type=int, default=7, help='Delete backups older than N days.')
+        parser.add_argument('--pages', type=int, default=256, help='SQLite pages per backup step.')
+        parser.add_argument('--sleep', type=float, default=0.005, help='Seconds to yield between SQLite steps.')
+        parser.add_argument('--quiet', action='store_true', help='Only print errors and the summary.')
+
+    def handle(self, *args, **options):
+        root = options['output_dir'] or engine.default_root()
+        quiet = options['quiet']
+        results = []
+
+        def log(msg):
+            if not quiet:
+                self.stdout.write(msg)
+
+        try:
+            if not options['skip_db']:
+                result = engine.backup_database(root, options['database'], options['pages'], options['sleep'])
+                results.append(result)
+                log(f'  {result.summary()}')
+                if options['verify']:
+                    check = engine.verify_database_backup(result.path)
+                    log(f'  verified database backup: {check}')
+
+            if not options['skip_media']:
+                result = engine.backup_media(root)
+                results.append(result)
+                log(f'  {result.summary()}')
+                if options['verify']:
+                    check = engine.verify_media_backup(result.path)
+                    log(f'  verified media backup: {check}')
+
+            removed = engine.cleanup_old_backups(root, options['keep_days']) if options['keep_days'] else 0
+        except engine.BackupError as exc:
+            raise CommandError(str(exc))
+
+        seconds = sum(r.seconds for r in results)
+        written = sum(r.bytes_written for r in results) / 1024 / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f'\nbackup complete: {len(results)} step(s), {written:.1f} MB written in {seconds:.2f}s, '
+            f'{removed} expired file(s) removed.'
+        ))
@@ -0,0 +1,190 @@
+"""
+Barcode and QR rendering with a content-addressed on-disk cache.
+
+Each image is stored under the SHA-256 of its symbology and payload, so the
+same SKU is encoded once and every later request is a file read. The digest
+doubles as the ETag and as the immutable image URL.
+
+This app is itself importable as ``barcode`` (the apps directory is on
+``sys.path``), which shadows the python-barcode distribution of the same
+name. ``_import_python_barcode`` loads the library from its own directory
+under the private name ``_python_barcode`` and points the library's
+``barcode.*`` imports at that copy; the import state this app relies on
+is never changed.
+
+Both libraries (and Pillow behind them) are imported on the first render,
+not when the URLconf loads, so they stay off the cold-start path; cache
+hits never import them at all.
+"""
+import builtins
+import hashlib
+import importlib.machinery
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from greaterwms.lazy import available, lazy_module
+
+CACHE_ROOT = Path(getattr(settings, 'BARCODE_CACHE_ROOT', settings.MEDIA_ROOT / 'barcodes'))
+SYMBOLOGIES = ('code128', 'qr')
+
+
+LIBRARY = 'barcode'
+PRIVATE_NAME = '_python_barcode'
+
+
+def _library_name(name):
+    return name == LIBRARY or name.startswith(LIBRARY + '.')
+
+
+def _library_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """``__import__`` for python-barcode's modules: its ``barcode.*`` imports resolve to the private copy."""
+    if level or not _library_name(name):
+        return builtins.__import__(name, globals, locals, fromlist, level)
+    fullname = PRIVATE_NAME + name[len(LIBRARY):]
+    module = _load_library_module(fullname)
+    if not fromlist:
+        return _load_library_module(PRIVATE_NAME)
+    for attr in fromlist:
+        if not hasattr(module, attr) and hasattr(module, '__path__'):
+            _load_library_module(f'{fullname}.{attr}')
+    return module
+
+
+class _LibraryLoader(importlib.machinery.SourceFileLoader):
+    def exec_module(self, module):
+        module.__builtins__ = {**builtins.__dict__, '__import__': _library_import}
+        super().exec_module(module)
+
+
+def _load_library_module(fullname):
+    module = sys.modules.get(fullname)
+    if module is not None:
+        return module
+    parent_name, _, child = fullname.rpartition('.')
+    if parent_name:
+        parent = _load_library_module(parent_name)
+        location = Path(parent.__path__[0], child)
+    else:
+        parent, location = None, Path(_python_barcode_location)
+    package = (location / '__init__.py').is_file()
+    origin = location / '__init__.py' if package else location.with_suffix('.py')
+    spec = importlib.util.spec_from_file_location(
+        fullname, origin, loader=_LibraryLoader(fullname, str(origin)),
+        submodule_search_locations=[str(location)] if package else None,
+    )
+    if spec is None or not origin.is_file():
+        raise ImportError(f'No module named {fullname!r}', name=fullname)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[fullname] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[fullname]
+        raise
+    if parent is not None:
+        setattr(parent, child, module)
+    return module
+
+
+def _import_python_barcode():
+    """
+    Load python-barcode from site-packages as ``_python_barcode``, leaving
+    ``sys.path`` and this app's ``barcode`` modules untouched, so a first
+    render in one thread cannot hide this app from imports in another.
+    """
+    global _python_barcode_location
+    apps_dir = Path(settings.BASE_DIR, 'apps').resolve()
+    search_path = [p for p in sys.path if Path(p or '.').resolve() != apps_dir]
+    spec = importlib.machinery.PathFinder.find_spec(LIBRARY, search_path)
+    if spec is None or not spec.submodule_search_locations:
+        return None, None
+    _python_barcode_location = spec.submodule_search_locations[0]
+    try:
+        library = _load_library_module(PRIVATE_NAME)
+        return library, _load_library_module(PRIVATE_NAME + '.writer').ImageWriter
+    except ImportError:
+        return None, None
+
+
+_python_barcode_location = None
+_python_barcode = []
+_python_barcode_lock = threading.Lock()
+qrcode = lazy_module('qrcode')
+
+
+def python_barcode():
+    """``(library, ImageWriter)``, or ``(None, None)`` if not installed; imported on first call."""
+    if not _python_barcode:
+        with _python_barcode_lock:
+            if not _python_barcode:
+                _python_barcode.append(_import_python_barcode())
+    return _python_barcode[0]
+
+
+def qr_available():
+    return available('qrcode')
+
+
+class SymbologyUnavailable(Exception):
+    """Raised when the library for a symbology is not installed."""
+
+
+def digest_for(payload, symbology):
+    return hashlib.sha256(f'{symbology}\0{payload}'.encode()).hexdigest()
+
+
+def path_for_digest(digest):
+    return CACHE_ROOT / digest[:2] / f'{digest}.png'
+
+
+def render_png(payload, symbology):
+    """Encode ``payload`` and return PNG bytes. Does not touch the cache."""
+    buf = io.BytesIO()
+    if symbology == 'code128':
+        library, image_writer = python_barcode()
+        if library is None:
+            raise SymbologyUnavailable('python-barcode not installed')
+        code128 = library.get_barcode_class('code128')
+        code128(payload, writer=image_writer()).write(buf)
+    elif symbology == 'qr':
+        if not qr_available():
+            raise SymbologyUnavailable('qrcode not installed')
+        qrcode.make(payload).save(buf, format='PNG')
+    else:
+        raise ValueError(f'Unknown symbology: {symbology}')
+    return buf.getvalue()
+
+
+def ensure_png(payload, symbology):
+    """Return ``(digest, path)`` for the cached image, rendering it on a miss."""
+    digest = digest_for(payload, symbology)
+    path = path_for_digest(digest)
+    if not path.exists():
+        data = render_png(payload, symbology)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    return digest, path
+
+
+def get_png(payload, symbology):
+    """Return ``(digest, png_bytes)`` from the cache."""
+    digest, path = ensure_png(payload, symbology)
+    return digest, path.read_bytes()
+
+
+def product_payloads(product):
+    """The Code128 and QR payloads printed for a product."""
+    return {
+        'code128': product.goods_code,
+        'qr': f"SKU:{product.goods_code}\nName:{product.goods_desc}\nPrice:{product.goods_price}",
+    }
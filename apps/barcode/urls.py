@@ -6,4 +6,6 @@ urlpatterns = [
     path('generator/', views.barcode_generator, name='barcode_generator'),
     path('product/<int:product_id>/', views.generate_product_barcode, name='generate_product_barcode'),
     path('api/qr/<int:product_id>/', views.generate_qr_api, name='generate_qr_api'),
+    path('image/<str:digest>.png', views.barcode_image, name='barcode_image'),
+    path('labels/', views.label_sheets, name='barcode_label_sheets'),
 ]
@@ -1,21 +1,16 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
+from django.urls import reverse
+from django.utils.http import quote_etag
 from goods.models import ListModel as Product
-import io, base64
+from . import rendering, labels
+import base64
+import re
 
-try:
-    import qrcode
-    QR_AVAILABLE = True
-except ImportError:
-    QR_AVAILABLE = False
-
-try:
-    import barcode as python_barcode
-    from barcode.writer import ImageWriter
-    BARCODE_AVAILABLE = True
-except ImportError:
-    BARCODE_AVAILABLE = False
+IMAGE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+MAX_LABELS = 20000
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
 
 
 @login_required
@@ -34,44 +29,90 @@ def barcode_generator(request):
 @login_required
 def generate_product_barcode(request, product_id):
     product = get_object_or_404(Product, id=product_id, is_delete=False)
-    barcode_b64 = qr_b64 = None
-
-    if BARCODE_AVAILABLE:
-        try:
-            Code128 = python_barcode.get_barcode_class('code128')
-            buf = io.BytesIO()
-            Code128(product.goods_code, writer=ImageWriter()).write(buf)
-            buf.seek(0)
-            barcode_b64 = base64.b64encode(buf.read()).decode()
-        except Exception:
-            pass
-
-    if QR_AVAILABLE:
+    urls = {}
+    for symbology, payload in rendering.product_payloads(product).items():
         try:
-            qr_data = f"SKU:{product.goods_code}\nName:{product.goods_desc}\nPrice:{product.goods_price}"
-            img = qrcode.make(qr_data)
-            buf = io.BytesIO()
-            img.save(buf, format='PNG')
-            buf.seek(0)
-            qr_b64 = base64.b64encode(buf.read()).decode()
+            digest, _ = rendering.ensure_png(payload, symbology)
+            urls[symbology] = reverse('barcode_image', args=[digest])
         except Exception:
-            pass
+            urls[symbology] = None
 
     return render(request, 'barcode/product_barcode.html', {
-        'product': product, 'barcode_b64': barcode_b64, 'qr_b64': qr_b64,
+        'product': product, 'barcode_url': urls['code128'], 'qr_url': urls['qr'],
     })
 
 
 @login_required
 def generate_qr_api(request, product_id):
     product = get_object_or_404(Product, id=product_id, is_delete=False)
-    if not QR_AVAILABLE:
+    if not rendering.qr_available():
         return JsonResponse({'success': False, 'message': 'qrcode not installed'})
     try:
-        img = qrcode.make(f"SKU:{product.goods_code}|{product.goods_desc}|{product.goods_price}")
-        buf = io.BytesIO()
-        img.save(buf, format='PNG')
-        buf.seek(0)
-        return JsonResponse({'success': True, 'qr': base64.b64encode(buf.read()).decode(), 'sku': product.goods_code})
+        digest, data = rendering.get_png(
+            f"SKU:{product.goods_code}|{product.goods_desc}|{product.goods_price}", 'qr'
+        )
+        return JsonResponse({
+            'success': True,
+            'qr': base64.b64encode(data).decode(),
+            'url': reverse('barcode_image', args=[digest]),
+            'sku': product.goods_code,
+        })
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)})
+
+
+@login_required
+def barcode_image(request, digest):
+    """Serve a cached barcode PNG by content digest; the URL never changes meaning."""
+    if not DIGEST_RE.match(digest):
+        raise Http404
+    etag = quote_etag(digest)
+    if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        path = rendering.path_for_digest(digest)
+        if not path.exists():
+            raise Http404
+        response = HttpResponse(path.read_bytes(), content_type='image/png')
+    response['ETag'] = etag
+    response['Cache-Control'] = IMAGE_CACHE_CONTROL
+    return response
+
+
+@login_required
+def label_sheets(request):
+    """
+    Print a label sheet set for ?category=, ?order= (purchase order id) or
+    ?labels=<BarcodeLabel ids>. Options: symbology, paper, format (pdf|png).
+    """
+    symbology = request.GET.get('symbology', 'code128')
+    paper_size = request.GET.get('paper', 'a4')
+    output_format = request.GET.get('format', 'pdf')
+    if symbology not in rendering.SYMBOLOGIES or paper_size not in labels.PAPER_LAYOUTS \
+            or output_format not in ('pdf', 'png'):
+        return JsonResponse({'success': False, 'message': 'Invalid symbology, paper or format'}, status=400)
+
+    if request.GET.get('category'):
+        entries = labels.entries_for_category(request.GET['category'])
+    elif request.GET.get('order', '').isdigit():
+        entries = labels.entries_for_order(request.GET['order'])
+    elif request.GET.get('labels'):
+        ids = [int(i) for i in request.GET['labels'].split(',') if i.strip().isdigit()]
+        entries = labels.entries_for_labels(ids)
+    else:
+        return JsonResponse({'success': False, 'message': 'category, order or labels is required'}, status=400)
+
+    items = labels.expand_labels(entries)
+    if not items:
+        return JsonResponse({'success': False, 'message': 'No labels to print'}, status=404)
+    if len(items) > MAX_LABELS:
+        return JsonResponse({'success': False, 'message': f'At most {MAX_LABELS} labels per request'}, status=400)
+
+    try:
+        content_type, filename, data = labels.build_sheets(items, symbology, paper_size, output_format)
+    except rendering.SymbologyUnavailable as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=503)
+
+    response = HttpResponse(data, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,233 @@
+"""
+Rendered document store for invoices, receipts and POS bills.
+
+PDFs are produced by WeasyPrint in a process pool so the conversion does not
+run inside the request worker, and are kept on disk keyed by document kind,
+id, template, variant and last modification time. An unchanged document is rendered
+once; later downloads are served from disk with an ETag so browsers can
+revalidate with a conditional GET.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.http import quote_etag
+
+logger = logging.getLogger(__name__)
+
+RENDER_ROOT = Path(getattr(settings, 'DOCUMENT_RENDER_ROOT', settings.MEDIA_ROOT / 'rendered_documents'))
+RENDER_WORKERS = getattr(settings, 'DOCUMENT_RENDER_WORKERS', 2)
+RENDER_TIMEOUT = getattr(settings, 'DOCUMENT_RENDER_TIMEOUT', 60)
+INVOICE_TEMPLATES = ('light', 'dark')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class RenderUnavailable(Exception):
+    """Raised when WeasyPrint is not installed in this environment."""
+
+
+def weasyprint_available():
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        # OSError: the package is installed but Pango/Cairo are missing.
+        return False
+    return True
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+        return _pool
+
+
+def _write_pdf(html, base_url, target):
+    """Pool worker: convert ``html`` and atomically write it to ``target``."""
+    from weasyprint import HTML
+
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            HTML(string=html, base_url=base_url).write_pdf(fh)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return str(target)
+
+
+class Document:
+    """A renderable document and the inputs that identify one rendering of it."""
+
+    def __init__(self, kind, pk, template_name, context, updated_at, filename, variant=''):
+        self.kind = kind
+        self.pk = pk
+        self.template_name = template_name
+        self.context = context
+        self.updated_at = updated_at
+        self.filename = filename
+        self.variant = variant
+
+    @property
+    def digest(self):
+        stamp = self.updated_at.isoformat() if self.updated_at else ''
+        raw = f'{self.kind}:{self.pk}:{self.template_name}:{self.variant}:{stamp}'
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    @property
+    def etag(self):
+        return quote_etag(self.digest)
+
+    @property
+    def path(self):
+        path = RENDER_ROOT / self.kind / str(self.pk) / f'{self.variant or "default"}-{self.digest}.pdf'
+        if not path.resolve().is_relative_to(RENDER_ROOT.resolve()):
+            raise ValueError(f'{self.kind} {self.pk}: rendering path escapes the render root')
+        return path
+
+    def render_html(self):
+        return render_to_string(self.template_name, self.context)
+
+
+def _prune_stale(document):
+    """Remove renderings of the same variant of ``document`` made from older versions."""
+    folder = document.path.parent
+    if not folder.exists():
+        return
+    prefix = f'{document.variant or "default"}-'
+    for old in folder.glob('*.pdf'):
+        # Names without a variant prefix were written before variants were kept apart.
+        if old.name != document.path.name and (old.name.startswith(prefix) or '-' not in old.name):
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def submit(document, base_url):
+    """Queue ``document`` for rendering and return a future for its path."""
+    if not weasyprint_available():
+        raise RenderUnavailable('WeasyPrint is not installed')
+    return _get_pool().submit(_write_pdf, document.render_html(), base_url, str(document.path))
+
+
+def ensure_rendered(document, base_url):
+    """Return the on-disk PDF for ``document``, rendering it on a cache miss."""
+    if document.path.exists():
+        return document.path
+    future = submit(document, base_url)
+    future.result(timeout=RENDER_TIMEOUT)
+    _prune_stale(document)
+    return document.path
+
+
+def _open_rendered(document, base_url):
+    """Open the rendered PDF, rendering it again if it vanished after ``ensure_rendered``."""
+    try:
+        return open(ensure_rendered(document, base_url), 'rb')
+    except FileNotFoundError:
+        # Removed in between (pruned, or the render directory was cleared).
+        future = submit(document, base_url)
+        return open(future.result(timeout=RENDER_TIMEOUT), 'rb')
+
+
+def serve(request, document):
+    """
+    Serve ``document`` as a PDF download with ETag revalidation.
+
+    When WeasyPrint is unavailable the HTML rendering is returned instead,
+    matching the previous behaviour of the download views.
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if document.etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+        response['ETag'] = document.etag
+        return response
+
+    base_url = request.build_absolute_uri()
+    try:
+        pdf = _open_rendered(document, base_url)
+    except RenderUnavailable:
+        return HttpResponse(document.render_html())
+    except Exception:
+        logger.exception('PDF rendering failed for %s %s', document.kind, document.pk)
+        return HttpResponse(document.render_html())
+
+    response = FileResponse(pdf, content_type='application/pdf',
+                            as_attachment=True, filename=document.filename)
+    response['ETag'] = document.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def render_bundle(documents, output, base_url=None):
+    """
+    Render ``documents`` in parallel and write them into the zip ``output``.
+
+    Returns a ``(rendered, cached)`` tuple counting cold renders and disk hits.
+    """
+    base_url = base_url or Path(settings.BASE_DIR).as_uri() + '/'
+    documents = list(documents)
+    pending = {}
+    for document in documents:
+        if not document.path.exists():
+            pending[document] = submit(document, base_url)
+    for document, future in pending.items():
+        future.result(timeout=RENDER_TIMEOUT)
+        _prune_stale(document)
+
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as bundle:
+        for document in documents:
+            bundle.write(document.path, arcname=document.filename)
+    return len(pending), len(documents) - len(pending)
+
+
+def invoice_document(invoice, template='light'):
+    if template not in INVOICE_TEMPLATES:
+        raise ValueError(f'template must be one of {", ".join(INVOICE_TEMPLATES)}')
+    # invoice_pdf.html renders every template the same way, so they share one cached PDF.
+    return Document(
+        kind='invoice',
+        pk=invoice.pk,
+        template_name='billing/invoice_pdf.html',
+        context={'invoice': invoice, 'template': template},
+        updated_at=invoice.updated_at,
+        filename=f'invoice_{invoice.invoice_number}.pdf',
+    )
+
+
+def receipt_document(receipt):
+    return Document(
+        kind='receipt',
+        pk=receipt.pk,
+        template_name='billing/receipt_pdf.html',
+        context={'receipt': receipt},
+        updated_at=max(receipt.created_at, receipt.invoice.updated_at),
+        filename=f'receipt_{receipt.receipt_number}.pdf',
+    )
+
+
+def pos_bill_document(sale):
+    return Document(
+        kind='pos_bill',
+        pk=sale.pk,
+        template_name='pos/bill.html',
+        context={'sale': sale},
+        updated_at=sale.created_at,
+        filename=f'{sale.sale_number}.pdf',
+    )
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from billing.models import Invoice
+from billing import documents
+import shutil
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = 'Time cold (render + write) and warm (served from disk, and 304 revalidation) invoice PDF downloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help='Number of invoices to render')
+        parser.add_argument('--repeat', type=int, default=5, help='Warm requests per invoice')
+
+    def handle(self, *args, **options):
+        if not documents.weasyprint_available():
+            raise CommandError('WeasyPrint is not installed; nothing to benchmark.')
+
+        invoices = list(Invoice.objects.order_by('-created_at')[:options['count']])
+        if not invoices:
+            raise CommandError('No invoices to benchmark against.')
+
+        docs = [documents.invoice_document(invoice) for invoice in invoices]
+        for document in docs:
+            shutil.rmtree(document.path.parent, ignore_errors=True)
+
+        factory = RequestFactory(SERVER_NAME='localhost')
+        cold, warm, revalidate = [], [], []
+        for document in docs:
+            request = factory.get('/billing/pdf/')
+            started = time.perf_counter()
+            response = documents.serve(request, document)
+            b''.join(response.streaming_content)
+            cold.append(time.perf_counter() - started)
+
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                response = documents.serve(request, document)
+                b''.join(response.streaming_content)
+                warm.append(time.perf_counter() - started)
+
+                conditional = factory.get('/billing/pdf/', HTTP_IF_NONE_MATCH=document.etag)
+                started = time.perf_counter()
+                documents.serve(conditional, document)
+                revalidate.append(time.perf_counter() - started)
+
+        for label, samples in (('cold', cold), ('warm', warm), ('304', revalidate)):
+            self.stdout.write(
+                f'{label:>5}: n={len(samples):<5} median={statistics.median(samples) * 1000:8.2f} ms  '
+                f'max={max(samples) * 1000:8.2f} ms'
+            )
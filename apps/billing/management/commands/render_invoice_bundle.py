@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from billing.models import Invoice
+from billing import documents
+import time
+
+
+class Command(BaseCommand):
+    help = 'Render a batch of invoices to PDF in the render pool and pack them into one zip file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the zip file to write')
+        parser.add_argument('--ids', default='', help='Comma-separated invoice ids')
+        parser.add_argument('--status', default='', help='Only invoices with this status')
+        parser.add_argument('--limit', type=int, default=0, help='Render at most N invoices (newest first)')
+        parser.add_argument('--template', default='light', choices=documents.INVOICE_TEMPLATES,
+                            help='Invoice PDF template variant')
+
+    def handle(self, *args, **options):
+        if not documents.weasyprint_available():
+            raise CommandError('WeasyPrint is not installed; PDF rendering is unavailable.')
+
+        invoices = Invoice.objects.order_by('-created_at')
+        if options['ids']:
+            ids = [int(i) for i in options['ids'].split(',') if i.strip()]
+            invoices = invoices.filter(id__in=ids)
+        if options['status']:
+            invoices = invoices.filter(status=options['status'])
+        if options['limit']:
+            invoices = invoices[:options['limit']]
+
+        docs = [documents.invoice_document(invoice, options['template']) for invoice in invoices]
+        if not docs:
+            raise CommandError('No invoices matched.')
+
+        started = time.perf_counter()
+        rendered, cached = documents.render_bundle(docs, options['output'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(docs)} invoices to {options["output"]} in {elapsed:.2f}s '
+            f'({rendered} rendered, {cached} from cache)'
+        ))
@@ -1,10 +1,10 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseBadRequest
 from django.core.paginator import Paginator
-from django.template.loader import render_to_string
 from .models import Invoice, InvoiceItem, Receipt, InvoiceComment
+from . import documents
 from datetime import datetime, timedelta
 import io
 from django.conf import settings
@@ -127,17 +127,9 @@ def invoice_pdf(request, pk):
             return HttpResponseForbidden('You do not have permission to generate PDFs')
     
     template = request.GET.get('template', 'light')
-    
-    html = render_to_string('billing/invoice_pdf.html', {'invoice': invoice, 'template': template})
-    
-    try:
-        from weasyprint import HTML
-        pdf_file = HTML(string=html, base_url=request.build_absolute_uri()).write_pdf()
-        response = HttpResponse(pdf_file, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="invoice_{invoice.invoice_number}.pdf"'
-        return response
-    except:
-        return HttpResponse(html)
+    if template not in documents.INVOICE_TEMPLATES:
+        return HttpResponseBadRequest(f'template must be one of {", ".join(documents.INVOICE_TEMPLATES)}')
+    return documents.serve(request, documents.invoice_document(invoice, template))
 
 @require_permission('billing', 'create')  # Create receipts (record payments)
 def receipt_create(request, invoice_id):
@@ -201,16 +193,7 @@ def receipt_pdf(request, pk):
             from django.http import HttpResponseForbidden
             return HttpResponseForbidden('You do not have permission to generate PDFs')
     
-    html = render_to_string('billing/receipt_pdf.html', {'receipt': receipt})
-    
-    try:
-        from weasyprint import HTML
-        pdf_file = HTML(string=html, base_url=request.build_absolute_uri()).write_pdf()
-        response = HttpResponse(pdf_file, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="receipt_{receipt.receipt_number}.pdf"'
-        return response
-    except:
-        return HttpResponse(html)
+    return documents.serve(request, documents.receipt_document(receipt))
 
 @require_permission('billing', 'delete')  # Delete invoices (SuperAdmin/Admin only)
 def invoice_delete(request, pk):
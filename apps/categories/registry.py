@@ -0,0 +1,67 @@
+"""
+In-memory category lookup by name.
+
+Templates and list views resolve a product's ``goods_class`` (or a storage
+or locker type) to its ``Category`` once per card. The registry loads every
+category in one query into a name -> info map held per process and tagged
+with a version kept in the shared cache. ``Category`` saves and deletes
+bump the version. The version is read once per request (or every few
+seconds outside one), so a page of cards costs one cache read and no
+queries.
+"""
+import threading
+
+from greaterwms.versioning import SharedVersion
+
+VERSION = SharedVersion('categories:registry:version')
+
+_lock = threading.Lock()
+_state = {'version': None, 'by_name': None}
+
+EMPTY_INFO = {'created_by': None, 'created_at': None}
+
+
+def _load():
+    from .models import Category
+
+    by_name = {}
+    for category in Category.objects.select_related('created_by').order_by('-created_at'):
+        # Names are not unique; the newest category wins, as before.
+        by_name.setdefault(category.name, {
+            'id': category.id,
+            'name': category.name,
+            'code': category.code,
+            'category_type': category.category_type,
+            'icon': category.icon,
+            'status': category.status,
+            'created_by': category.created_by.username if category.created_by else None,
+            'created_at': category.created_at.strftime('%b %d, %Y'),
+        })
+    return by_name
+
+
+def categories_by_name():
+    version = VERSION.get()
+    if _state['by_name'] is None or _state['version'] != version:
+        with _lock:
+            if _state['by_name'] is None or _state['version'] != version:
+                _state['by_name'] = _load()
+                _state['version'] = version
+    return _state['by_name']
+
+
+def get(name):
+    """Info dict for the category called ``name``, or ``None``."""
+    return categories_by_name().get(name)
+
+
+def creator_info(name):
+    """``{'created_by', 'created_at'}`` for the category, both ``None`` if unknown."""
+    info = get(name)
+    if not info or not info['created_by']:
+        return EMPTY_INFO
+    return {'created_by': info['created_by'], 'created_at': info['created_at']}
+
+
+def invalidate():
+    VERSION.invalidate()
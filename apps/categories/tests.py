@@ -1,3 +1,62 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from categories import registry
+from categories.models import Category
+from goods.models import ListModel as Product
+from stock.models import StockListModel
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class CategoryRegistryQueryTests(TestCase):
+    """Product pages resolve categories from the registry, not per card."""
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('registry-admin', 'admin@example.com', 'pass')
+        self.client = Client(SERVER_NAME='localhost')
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['login_verified'] = True
+        session.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(5):
+                Category.objects.create(name=f'Class {index}', code=f'CLS{index}',
+                                        category_type='product', created_by=self.user)
+
+    def add_products(self, count):
+        start = Product.objects.count()
+        for index in range(start, start + count):
+            code = f'SKU{index:04d}'
+            Product.objects.create(goods_code=code, goods_desc=code, goods_supplier='Acme', goods_unit='pcs',
+                                   goods_class=f'Class {index % 5}', goods_brand='Acme')
+            StockListModel.objects.create(goods_code=code, goods_desc=code, goods_qty=index, can_order_stock=index)
+
+    def queries_for(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in context.captured_queries]
+
+    def assert_constant_queries(self, url):
+        self.add_products(2)
+        self.queries_for(url)  # warm the registry
+        few = self.queries_for(url)
+        self.add_products(98)
+        many = self.queries_for(url)
+        self.assertEqual(len(few), len(many))
+        self.assertFalse([sql for sql in many if 'categories_category' in sql])
+
+    def test_marketplace_page(self):
+        self.assert_constant_queries('/products/marketplace/')
+
+    def test_products_api(self):
+        self.assert_constant_queries('/products/api/?page_size=100')
+
+    def test_creator_info(self):
+        self.assertEqual(registry.creator_info('Class 1')['created_by'], 'registry-admin')
+        self.assertIsNone(registry.creator_info('Unknown')['created_by'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(name='Class 1').first().delete()
+        self.assertIsNone(registry.creator_info('Class 1')['created_by'])
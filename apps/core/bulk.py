@@ -0,0 +1,193 @@
+"""
+Bulk create/update/upsert for list payloads (goods, stock).
+
+Every row is validated up front with the viewset's serializer (uniqueness
+validators are dropped, since an existing key is what an upsert updates).
+Valid rows are then written in chunks of ``CHUNK_SIZE``, each in its own
+transaction: one query reads the existing keys of the chunk, one
+``bulk_create(update_conflicts=True)`` per distinct set of submitted fields
+writes the rows, and one query reads back their ids. Updates only touch
+the fields a row actually sent. A chunk that fails in the database is
+reported row by row and does not undo the chunks before it.
+
+The caller gets one result per input row, in input order, and one
+aggregated ``AuditLog`` entry is written for the whole batch.
+"""
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+CHUNK_SIZE = 500
+MAX_ROWS = 5000
+MODES = ('upsert', 'create', 'update')
+# Keys listed per outcome in the audit entry; counts are always exact.
+AUDIT_KEYS = 200
+
+
+def _validator(serializer_class, context):
+    """A bound serializer whose ``run_validation`` skips uniqueness checks."""
+    serializer = serializer_class(context=context)
+    for field in serializer.fields.values():
+        field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+    serializer.validators = [v for v in serializer.validators if not isinstance(v, UniqueTogetherValidator)]
+    return serializer
+
+
+def _key_filter(unique_fields, keys):
+    """``IN`` on each key column; callers match the exact key tuples themselves."""
+    return Q(**{f'{name}__in': sorted({key[i] for key in keys}) for i, name in enumerate(unique_fields)})
+
+
+def upsert(serializer_class, rows, unique_fields, context=None, mode='upsert', assign=None,
+           defaults=None, check=None, finalize=None, chunk_size=CHUNK_SIZE):
+    """
+    Validate and write ``rows``; returns one result dict per row.
+
+    ``assign`` values override every row (e.g. the owner's ``openid``),
+    ``defaults`` are only set on new rows and never updated. ``check(data,
+    current)`` may veto a row by returning an error message; ``current`` is
+    the existing row as a ``.values()`` dict or ``None``. ``finalize(ids)``
+    runs inside each chunk's transaction after its rows are written.
+    Results carry ``index``, the key fields, ``status`` (``created``,
+    ``updated`` or ``error``) and ``id`` or ``errors``.
+    """
+    if mode not in MODES:
+        raise ValueError(f'mode must be one of {", ".join(MODES)}')
+    model = serializer_class.Meta.model
+    meta = model._meta
+    assign, defaults = assign or {}, defaults or {}
+    serializer = _validator(serializer_class, context or {})
+    results = [None] * len(rows)
+
+    # Validate everything first; the last occurrence of a key wins.
+    pending = {}
+    for index, row in enumerate(rows):
+        try:
+            data = {**serializer.run_validation(row), **assign}
+        except ValidationError as exc:
+            results[index] = {'index': index, 'status': 'error', 'errors': exc.detail}
+            continue
+        key = tuple(data.get(name, meta.get_field(name).get_default()) for name in unique_fields)
+        if key in pending:
+            earlier = pending[key][0]
+            results[earlier] = {'index': earlier, **dict(zip(unique_fields, key)), 'status': 'error',
+                                'errors': {'non_field_errors': [f'Superseded by row {index} with the same key.']}}
+        pending[key] = (index, data)
+
+    entries = sorted(pending.items(), key=lambda item: item[1][0])
+    auto_now = [f.name for f in meta.concrete_fields if getattr(f, 'auto_now', False)]
+    for start in range(0, len(entries), chunk_size):
+        chunk = entries[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                _write_chunk(model, chunk, unique_fields, results, mode, defaults, check, finalize, auto_now)
+        except DatabaseError as exc:
+            for key, (index, _) in chunk:
+                results[index] = {'index': index, **dict(zip(unique_fields, key)), 'status': 'error',
+                                  'errors': {'non_field_errors': [str(exc)]}}
+    return results
+
+
+def _write_chunk(model, chunk, unique_fields, results, mode, defaults, check, finalize, auto_now):
+    keys = [key for key, _ in chunk]
+    existing = {
+        tuple(row[name] for name in unique_fields): row
+        for row in model.objects.filter(_key_filter(unique_fields, keys)).values()
+    }
+    groups, written = {}, {}
+    for key, (index, data) in chunk:
+        current = existing.get(key)
+        error = None
+        if mode == 'create' and current is not None:
+            error = 'Already exists.'
+        elif mode == 'update' and current is None:
+            error = 'Does not exist.'
+        elif check is not None:
+            error = check(data, current)
+        result = {'index': index, **dict(zip(unique_fields, key))}
+        results[index] = result
+        if error:
+            result.update(status='error', errors={'non_field_errors': [error]})
+            continue
+        result['status'] = 'updated' if current is not None else 'created'
+        fields = tuple(sorted(name for name in data if name not in unique_fields and name not in defaults))
+        groups.setdefault(fields, []).append(model(**{**data, **defaults}))
+        written[key] = result
+
+    for fields, objs in groups.items():
+        update_fields = list(fields) + [name for name in auto_now if name not in fields]
+        if update_fields:
+            model.objects.bulk_create(objs, update_conflicts=True, unique_fields=unique_fields,
+                                      update_fields=update_fields)
+        else:
+            model.objects.bulk_create(objs, ignore_conflicts=True)
+
+    if written:
+        ids = model.objects.filter(_key_filter(unique_fields, list(written))).values_list('pk', *unique_fields)
+        for pk, *key in ids:
+            if tuple(key) in written:
+                written[tuple(key)]['id'] = pk
+        if finalize is not None:
+            finalize([result['id'] for result in written.values() if 'id' in result])
+
+
+def summary(results):
+    counts = {'created': 0, 'updated': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+    return counts
+
+
+def record_audit(request, model_label, results, key_field):
+    """One ``AuditLog`` row for the whole batch, instead of one per row or request."""
+    from audit.models import AuditLog
+
+    counts = summary(results)
+    changes = {'rows': len(results), **counts}
+    for status in ('created', 'updated'):
+        keys = [result.get(key_field) for result in results if result['status'] == status]
+        changes[f'{status}_keys'] = keys[:AUDIT_KEYS]
+        if len(keys) > AUDIT_KEYS:
+            changes[f'{status}_keys_truncated'] = True
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    AuditLog.objects.create(
+        user=request.user if request.user.is_authenticated else None,
+        action_type='update' if counts['updated'] else 'create',
+        model_name=model_label,
+        description=(f"Bulk upsert of {len(results)} row(s): {counts['created']} created, "
+                     f"{counts['updated']} updated, {counts['error']} failed"),
+        ip_address=forwarded.split(',')[0].strip() if forwarded else request.META.get('REMOTE_ADDR'),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        changes=changes,
+    )
+    # AuditLogMiddleware skips requests that already wrote their own entry.
+    getattr(request, '_request', request).audit_logged = True
+
+
+def bulk_response(request, serializer_class, unique_fields, **options):
+    """
+    HTTP wrapper around ``upsert`` for viewset ``bulk`` actions.
+
+    The body is a list of rows or ``{"mode": ..., "rows": [...]}``; ``mode``
+    may also come from the query string. Answers 200 when every row was
+    written, 207 when some failed and 400 when none could be written.
+    """
+    payload = request.data
+    mode = request.query_params.get('mode', 'upsert')
+    if isinstance(payload, dict):
+        mode = payload.get('mode', mode)
+        payload = payload.get('rows')
+    if not isinstance(payload, list) or not payload:
+        return JsonResponse({'error': 'Expected a non-empty list of rows'}, status=400)
+    if len(payload) > MAX_ROWS:
+        return JsonResponse({'error': f'At most {MAX_ROWS} rows per request'}, status=400)
+    if mode not in MODES:
+        return JsonResponse({'error': f'mode must be one of {", ".join(MODES)}'}, status=400)
+
+    results = upsert(serializer_class, payload, unique_fields, mode=mode, **options)
+    record_audit(request, serializer_class.Meta.model._meta.label, results, unique_fields[0])
+    counts = summary(results)
+    status = 200 if not counts['error'] else 207 if counts['error'] < len(results) else 400
+    return JsonResponse({'mode': mode, **counts, 'results': results}, status=status)
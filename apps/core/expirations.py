@@ -0,0 +1,43 @@
+"""
+Expiry rules shared by ``handle_expirations`` and the scheduler.
+
+Each rule is one ``UPDATE`` whose return value is the number of rows it
+changed, so a run is a single statement per category; ``dry_run`` counts
+the matching rows instead.
+"""
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+# (label, model, filter, changes)
+RULES = [
+    ('Quotations marked expired', 'quotations.Quotation',
+     lambda now: Q(expires_at__lt=now, status__in=('draft', 'sent', 'approved')), {'status': 'expired'}),
+    ('Coupons deactivated', 'coupons.Coupon',
+     lambda now: Q(valid_until__lt=now, is_active=True), {'is_active': False}),
+    ('Storage bookings expired', 'storage.StorageBooking',
+     lambda now: Q(end_date__lt=now, status='active'), {'status': 'expired'}),
+    ('Locker bookings marked overdue', 'lockers.LockerBooking',
+     lambda now: Q(end_date__lt=now, status='active'), {'status': 'overdue'}),
+    ('Rental bookings marked overdue', 'rentals.RentalBooking',
+     lambda now: Q(end_date__lt=now, actual_return_date__isnull=True, status='active'), {'status': 'overdue'}),
+    ('Announcements deactivated', 'settings.Announcement',
+     lambda now: Q(expires_at__lt=now, is_active=True), {'is_active': False}),
+]
+
+
+def expire(now=None, dry_run=False):
+    """
+    Apply every rule; returns ``[(label, rows, error)]`` in rule order.
+
+    A failing rule is reported with its error and does not stop the others.
+    """
+    now = now or timezone.now()
+    results = []
+    for label, model_label, condition, changes in RULES:
+        try:
+            rows = apps.get_model(model_label).objects.filter(condition(now))
+            results.append((label, rows.count() if dry_run else rows.update(**changes), None))
+        except Exception as exc:
+            results.append((label, 0, exc))
+    return results
@@ -0,0 +1,38 @@
+"""Built-in periodic jobs; other apps add theirs in their own ``jobs`` module."""
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.utils import timezone
+
+from .expirations import expire
+from .models import JobRun
+from .scheduler import job
+from .sync import prune_tombstones
+
+JOB_HISTORY_DAYS = 30
+
+
+@job('handle_expirations', interval=timedelta(hours=1))
+def handle_expirations():
+    results = expire()
+    failed = [f'{label}: {error}' for label, _, error in results if error is not None]
+    if failed:
+        raise RuntimeError('; '.join(failed))
+    return {label: count for label, count, _ in results}
+
+
+@job('clear_expired_sessions', interval=timedelta(days=1))
+def clear_expired_sessions():
+    import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+
+
+@job('prune_job_history', interval=timedelta(days=1))
+def prune_job_history():
+    deleted, _ = JobRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=JOB_HISTORY_DAYS)).delete()
+    return deleted
+
+
+@job('prune_sync_tombstones', interval=timedelta(days=1))
+def prune_sync_tombstones():
+    return prune_tombstones()
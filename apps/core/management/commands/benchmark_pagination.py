@@ -0,0 +1,95 @@
+"""
+benchmark_pagination – time a deep page on a large table with each pagination mode.
+
+Fills the stock table with synthetic rows inside a transaction that is
+rolled back afterwards, then fetches one page at ``--page`` with DRF's
+stock PageNumberPagination (COUNT + OFFSET), the project's page numbers
+with an estimated or omitted count, and keyset cursors:
+    python manage.py benchmark_pagination
+    python manage.py benchmark_pagination --rows 200000 --page 100
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework import pagination as drf_pagination
+from rest_framework.request import Request
+
+from greaterwms import pagination
+from stock.models import StockListModel
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark page-N latency of the pagination modes on a large synthetic table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic rows to insert (default 1,000,000).')
+        parser.add_argument('--page', type=int, default=1000, help='Page to fetch (default 1000).')
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._fill(options['rows'])
+                self._run(options['page'], options['page_size'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Synthetic rows rolled back.')
+
+    def _fill(self, rows):
+        started = time.perf_counter()
+        now = timezone.now()
+        batch = 10_000
+        for first in range(0, rows, batch):
+            StockListModel.objects.bulk_create([
+                StockListModel(goods_code=f'BENCH{n:07d}', goods_desc='benchmark', goods_qty=n % 100,
+                               onhand_stock=n % 100, create_time=now, update_time=now)
+                for n in range(first, min(first + batch, rows))
+            ])
+        self.stdout.write(f'Inserted {rows:,} rows in {time.perf_counter() - started:.1f}s '
+                          f'({StockListModel.objects.count():,} in table)')
+
+    def _run(self, page, page_size, repeat):
+        factory = RequestFactory(SERVER_NAME='localhost')
+        queryset = StockListModel.objects.order_by('-id')
+
+        class DRFPagination(drf_pagination.PageNumberPagination):
+            pass
+
+        DRFPagination.page_size = page_size
+        offset_pk = queryset.values_list('pk', flat=True)[(page - 1) * page_size - 1]
+        boundary = StockListModel(pk=offset_pk)
+        cursor_pager = pagination.CursorPagination()
+        cursor_pager.request = Request(factory.get('/'))
+        cursor_pager.field = 'id'
+        cursor = cursor_pager.encode_cursor(boundary, previous=False).split('cursor=')[1]
+
+        modes = [
+            ('DRF page + COUNT(*)', DRFPagination, {'page': page}),
+            ('page + estimated count', pagination.PageNumberPagination, {'page': page, 'page_size': page_size}),
+            ('page, count omitted', pagination.PageNumberPagination,
+             {'page': page, 'page_size': page_size, 'count': 'false'}),
+            ('keyset cursor', pagination.CursorPagination, {'cursor': cursor, 'page_size': page_size}),
+        ]
+        self.stdout.write(f'Page {page} of {page_size} rows:')
+        for label, pager_class, params in modes:
+            samples = []
+            for _ in range(repeat):
+                request = Request(factory.get('/', params))
+                started = time.perf_counter()
+                pager = pager_class()
+                rows = pager.paginate_queryset(queryset, request)
+                pager.get_paginated_response([row.pk for row in rows])
+                samples.append(time.perf_counter() - started)
+            self.stdout.write(
+                f'  {label:<24} median={statistics.median(samples) * 1000:9.2f} ms  '
+                f'max={max(samples) * 1000:9.2f} ms  first id={rows[0].pk}'
+            )
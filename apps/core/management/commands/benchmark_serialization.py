@@ -0,0 +1,98 @@
+"""
+benchmark_serialization – rows/second of the goods and stock list serialization paths.
+
+Serializes ``--rows`` rows (synthetic ones are added inside a transaction
+that is rolled back when the table is smaller) with the ModelSerializer
+and with the ``.values()`` fast path, rendered by DRF's JSONRenderer and
+by FastJSONRenderer, and checks that every path yields the same JSON:
+    python manage.py benchmark_serialization
+    python manage.py benchmark_serialization --rows 50000 --repeat 5
+"""
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from goods.models import ListModel as Goods
+from goods.serializers import GoodsSerializer
+from greaterwms import renderers
+from greaterwms.serialization import ValuesSerializer
+from stock.models import StockListModel
+from stock.serializers import StockSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rows/second of ModelSerializer vs .values() serialization for goods and stock.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to DRF.'))
+        try:
+            with transaction.atomic():
+                self._fill(options['rows'])
+                for label, serializer_class in (('goods', GoodsSerializer), ('stock', StockSerializer)):
+                    self._run(label, serializer_class, options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _fill(self, rows):
+        missing = rows - Goods.objects.count()
+        if missing > 0:
+            Goods.objects.bulk_create([
+                Goods(goods_code=f'SERBENCH{n:07d}', goods_desc='Benchmark item', goods_supplier='Bench',
+                      goods_unit='pcs', goods_class='Bench', goods_brand='Bench', goods_price=n * 1.5)
+                for n in range(missing)
+            ], batch_size=5000)
+        missing = rows - StockListModel.objects.count()
+        if missing > 0:
+            StockListModel.objects.bulk_create([
+                StockListModel(goods_code=f'SERBENCH{n:07d}', goods_desc='Benchmark item', goods_qty=n % 100)
+                for n in range(missing)
+            ], batch_size=5000)
+
+    def _run(self, label, serializer_class, rows, repeat):
+        model = serializer_class.Meta.model
+        request = Request(RequestFactory(SERVER_NAME='localhost').get('/'))
+        context = {'request': request}
+        queryset = model.objects.order_by('-id')[:rows]
+        slow_renderer, fast_renderer = JSONRenderer(), renderers.FastJSONRenderer()
+
+        def model_path(renderer):
+            return renderer.render(serializer_class(list(queryset), many=True, context=context).data)
+
+        def values_path(renderer):
+            fast = ValuesSerializer.compile(serializer_class, context)
+            return renderer.render(fast.many(queryset.values(*fast.sources)))
+
+        paths = [
+            ('ModelSerializer + JSONRenderer', lambda: model_path(slow_renderer)),
+            ('.values() + JSONRenderer', lambda: values_path(slow_renderer)),
+            ('.values() + FastJSONRenderer', lambda: values_path(fast_renderer)),
+        ]
+        reference = json.loads(paths[0][1]())
+        self.stdout.write(f'{label}: {len(reference)} rows')
+        for name, path in paths:
+            body = path()
+            if json.loads(body) != reference:
+                raise CommandError(f'{label}: {name} output differs from the ModelSerializer')
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                path()
+                samples.append(time.perf_counter() - started)
+            seconds = statistics.median(samples)
+            self.stdout.write(f'  {name:<32} {seconds * 1000:8.1f} ms  {len(reference) / seconds:>10,.0f} rows/s')
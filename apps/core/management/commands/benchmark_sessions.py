@@ -0,0 +1,95 @@
+"""
+benchmark_sessions – session writes per request with the old and new session setup.
+
+Replays ``--requests`` authenticated requests (each reads
+``login_verified``, like RoleBasedAccessMiddleware) for ``--users``
+sessions through SessionMiddleware, once with the database engine and
+``SESSION_SAVE_EVERY_REQUEST`` and once with ``greaterwms.sessions`` (also
+with every session inside the refresh threshold), and reports requests per
+second, ``django_session`` write statements and database reads. The
+write-behind queue is flushed at the end so its writes are counted.
+Everything runs in a transaction that is rolled back:
+    python manage.py benchmark_sessions
+    python manage.py benchmark_sessions --requests 20000 --users 50
+"""
+import time
+from importlib import import_module
+
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from greaterwms import sessions
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark django_session writes of the DB session engine vs the low-write engine.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=20)
+
+    def handle(self, *args, **options):
+        setups = [
+            ('db + SAVE_EVERY_REQUEST', {'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+                                         'SESSION_SAVE_EVERY_REQUEST': True}),
+            ('greaterwms.sessions', {'SESSION_ENGINE': 'greaterwms.sessions',
+                                     'SESSION_SAVE_EVERY_REQUEST': False}),
+            # Every request slides the expiry; the write-behind queue collapses them per session.
+            ('  ...all due for refresh', {'SESSION_ENGINE': 'greaterwms.sessions',
+                                          'SESSION_SAVE_EVERY_REQUEST': False, 'expiring': True}),
+        ]
+        for label, overrides in setups:
+            expiring = overrides.pop('expiring', False)
+            try:
+                with transaction.atomic(), override_settings(**overrides):
+                    self._run(label, options['requests'], options['users'], expiring)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _run(self, label, requests, users, expiring):
+        from django.conf import settings
+
+        engine = import_module(settings.SESSION_ENGINE)
+        keys = []
+        for n in range(users):
+            store = engine.SessionStore()
+            store.update({'_auth_user_id': str(n), 'login_verified': True})
+            if expiring:
+                store.set_expiry(sessions.refresh_threshold() - 60)
+            store.create()
+            keys.append(store.session_key)
+
+        factory = RequestFactory(SERVER_NAME='localhost')
+        middleware = SessionMiddleware(lambda request: HttpResponse(request.session.get('login_verified')))
+        counts = {'writes': 0, 'reads': 0}
+
+        def count(execute, sql, params, many, context):
+            verb = sql.lstrip()[:6].upper()
+            if verb in ('UPDATE', 'INSERT'):
+                counts['writes'] += 1
+            elif verb == 'SELECT':
+                counts['reads'] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            for n in range(requests):
+                request = factory.get('/api/goods/')
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = keys[n % users]
+                middleware(request)
+            elapsed = time.perf_counter() - started
+            sessions.flush()
+
+        writes, reads = counts['writes'], counts['reads']
+        self.stdout.write(
+            f'{label:<26} {requests / elapsed:>9,.0f} req/s  '
+            f'{writes:>6} session writes ({writes / elapsed:,.0f}/s)  {reads:>6} DB reads'
+        )
@@ -0,0 +1,112 @@
+"""
+benchmark_sqlite – concurrent writers on the stock and the tuned SQLite backend.
+
+Forks ``--workers`` processes (like gunicorn workers), each running
+``--ops`` operations against a scratch database file in a temporary
+directory: one in ``--read-ratio`` is a read, the rest are
+stock-adjustment-style write transactions (read a row, update it, insert
+an audit row inside ``atomic()``). Run once with
+``django.db.backends.sqlite3`` and once with ``greaterwms.sqlite``; reports
+completed operations per second, ``database is locked`` failures and the
+slowest operation. The project database is not touched:
+    python manage.py benchmark_sqlite
+    python manage.py benchmark_sqlite --workers 8 --ops 500 --read-ratio 0.5
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+ALIAS = 'sqlite_benchmark'
+ROWS = 200
+
+
+def _configure(engine, name):
+    settings_dict = dict(connections['default'].settings_dict)
+    settings_dict.update(ENGINE=engine, NAME=name, OPTIONS={}, CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=False)
+    connections.settings[ALIAS] = settings_dict
+    if hasattr(connections._connections, ALIAS):
+        delattr(connections._connections, ALIAS)
+
+
+def _worker(engine, name, ops, read_ratio, seed, results):
+    _configure(engine, name)
+    rng = random.Random(seed)
+    done = locked = 0
+    slowest = 0.0
+    started = time.perf_counter()
+    for _ in range(ops):
+        row = rng.randrange(ROWS)
+        op_started = time.perf_counter()
+        try:
+            if rng.random() < read_ratio:
+                with connections[ALIAS].cursor() as cursor:
+                    cursor.execute('SELECT id, qty FROM bench_stock WHERE id >= %s LIMIT 20', [row])
+                    cursor.fetchall()
+            else:
+                with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+                    cursor.execute('SELECT qty FROM bench_stock WHERE id = %s', [row])
+                    qty = cursor.fetchone()[0]
+                    cursor.execute('UPDATE bench_stock SET qty = %s WHERE id = %s', [qty + 1, row])
+                    cursor.execute('INSERT INTO bench_audit (stock_id, delta) VALUES (%s, 1)', [row])
+            done += 1
+        except OperationalError as error:
+            if 'locked' not in str(error) and 'busy' not in str(error):
+                raise
+            locked += 1
+        slowest = max(slowest, time.perf_counter() - op_started)
+    results.put((done, locked, slowest, time.perf_counter() - started))
+    connections[ALIAS].close()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent writers on the stock SQLite backend vs greaterwms.sqlite.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--ops', type=int, default=300, help='Operations per worker.')
+        parser.add_argument('--read-ratio', type=float, default=0.3)
+
+    def handle(self, *args, **options):
+        backends = [
+            ('django.db.backends.sqlite3', 'stock backend'),
+            ('greaterwms.sqlite', 'greaterwms.sqlite'),
+        ]
+        connections.close_all()
+        for engine, label in backends:
+            with tempfile.TemporaryDirectory() as directory:
+                self._run(label, engine, os.path.join(directory, 'bench.sqlite3'), options)
+
+    def _run(self, label, engine, name, options):
+        _configure(engine, name)
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('CREATE TABLE bench_stock (id INTEGER PRIMARY KEY, qty INTEGER NOT NULL)')
+            cursor.execute('CREATE TABLE bench_audit (id INTEGER PRIMARY KEY, stock_id INTEGER, delta INTEGER)')
+            cursor.executemany('INSERT INTO bench_stock (id, qty) VALUES (%s, 0)', [(n,) for n in range(ROWS)])
+        connections[ALIAS].close()
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(engine, name, options['ops'], options['read_ratio'], seed, results))
+            for seed in range(options['workers'])
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        done = sum(outcome[0] for outcome in outcomes)
+        locked = sum(outcome[1] for outcome in outcomes)
+        slowest = max(outcome[2] for outcome in outcomes)
+        self.stdout.write(
+            f'{label:<20} {done / elapsed:>8,.0f} ops/s  {done:>6} done  {locked:>5} locked  '
+            f'slowest {slowest * 1000:,.0f} ms'
+        )
@@ -0,0 +1,57 @@
+"""
+handle_expirations – mark overdue/expired records across every app.
+
+Run manually:
+    python manage.py handle_expirations
+
+``run_scheduler`` runs the same rules every hour. To schedule it with cron
+(Linux/Mac) or Windows Task Scheduler instead:
+    0 * * * * /path/to/venv/bin/python manage.py handle_expirations   # every hour
+
+Flags:
+    --dry-run   Print what would change without writing to the database.
+    --quiet     Suppress per-record output (useful in cron).
+"""
+from django.core.management.base import BaseCommand
+
+from core.expirations import expire
+
+
+class Command(BaseCommand):
+    help = 'Mark expired quotations, bookings, and coupons across the platform.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without modifying the database.',
+        )
+        parser.add_argument(
+            '--quiet',
+            action='store_true',
+            help='Suppress per-category output.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        quiet = options['quiet']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN – no database changes will be made.\n'))
+
+        results = expire(dry_run=dry_run)
+        for label, count, error in results:
+            if error is not None:
+                self.stderr.write(f'  {label} – error: {error}')
+            elif not quiet:
+                self.stdout.write(f'  {label + ":":<32}{count}')
+
+        # ── Summary ────────────────────────────────────────────────────────────
+        total = sum(count for _, count, _ in results)
+        suffix = ' (dry run)' if dry_run else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nhandle_expirations complete{suffix}: {total} record(s) updated across '
+                f'{len(results)} categories.'
+            )
+        )
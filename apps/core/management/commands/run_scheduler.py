@@ -0,0 +1,66 @@
+"""
+run_scheduler – run the registered periodic jobs (see ``core.scheduler``).
+
+Run one long-lived process per server (or several; one is elected leader):
+    python manage.py run_scheduler
+    python manage.py run_scheduler --once          # a single pass, e.g. from cron
+    python manage.py run_scheduler --run snapshot_stock
+    python manage.py run_scheduler --list          # jobs and run-history metrics
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Run periodic jobs with leader election and run history.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the due jobs once and exit.')
+        parser.add_argument('--run', metavar='JOB', help='Run one job now, whether or not it is due.')
+        parser.add_argument('--list', action='store_true', help='Show registered jobs and their run history.')
+        parser.add_argument('--poll', type=int, default=30, help='Seconds between passes (default 30).')
+        parser.add_argument('--lease', type=int, default=scheduler.LEASE_SECONDS,
+                            help='Leader lease in seconds; must exceed the longest job (default 300).')
+
+    def handle(self, *args, **options):
+        jobs = scheduler.discover()
+        owner = scheduler.default_owner()
+
+        if options['list']:
+            for row in scheduler.stats():
+                avg = f"{row['avg_ms']}ms" if row['avg_ms'] is not None else '-'
+                last = f"{timezone.localtime(row['last_run']):%Y-%m-%d %H:%M} {row['last_status']}" if row['last_run'] else 'never'
+                self.stdout.write(
+                    f"{row['job']:<26} every {str(row['interval']):<16} runs {row['runs']:<5} "
+                    f"failed {row['failures']:<4} avg {avg:<8} last {last}"
+                )
+            return
+
+        if options['run']:
+            if options['run'] not in jobs:
+                raise CommandError(f"Unknown job {options['run']!r}; choose from {', '.join(sorted(jobs))}")
+            self._report(scheduler.run(jobs[options['run']], owner))
+            return
+
+        self.stdout.write(f'Scheduler {owner}: {len(jobs)} job(s) registered')
+        try:
+            while True:
+                close_old_connections()
+                for job_run in scheduler.tick(owner, options['lease']):
+                    self._report(job_run)
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.release_lease(owner)
+
+    def _report(self, job_run):
+        style = self.style.SUCCESS if job_run.status == 'success' else self.style.ERROR
+        self.stdout.write(style(f'{job_run.job}: {job_run.status} in {job_run.duration_ms}ms {job_run.result}'))
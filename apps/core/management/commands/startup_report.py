@@ -0,0 +1,127 @@
+"""
+startup_report – what a cold start of ``api/index.py`` imports and how long it takes.
+
+Starts fresh interpreters that build the WSGI app the way the serverless
+entry point does and serve one request (``--path``, default ``/health/``).
+The first run uses ``python -X importtime``; its report lists the slowest
+imports by cumulative and by self time and flags any deferred heavy
+library (``DEFERRED``) that was still imported, with the chain of modules
+that pulled it in. The remaining runs time cold start to first response
+without the import tracing overhead:
+    python manage.py startup_report
+    python manage.py startup_report --top 30 --runs 5 --target-ms 1000
+    python manage.py startup_report --raw /tmp/importtime.txt
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Libraries that are only needed by a few views and should be imported lazily.
+DEFERRED = ('openpyxl', 'qrcode', 'PIL', 'reportlab', '_python_barcode.writer')
+
+BOOT = '''
+import json, runpy, sys, time
+started = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+# Run the entry point as a file, like the serverless runtime (``api`` is also an app package).
+app = runpy.run_path('api/index.py')['app']
+ready = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': 'localhost', 'SERVER_NAME': 'localhost',
+           'wsgi.url_scheme': 'https', 'HTTPS': 'on'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(app(environ, lambda s, h, exc_info=None: status.append(s)))
+done = time.perf_counter()
+print(json.dumps({'app_ms': (ready - started) * 1000, 'first_response_ms': (done - started) * 1000,
+                  'status': status[0] if status else None}))
+'''
+
+
+def parse_importtime(text):
+    """``[(name, self_us, cumulative_us, depth, parent)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append([name.strip(), int(self_us), int(cumulative_us), depth, None])
+    # Children are printed before their parent: the parent is the next line one level up.
+    open_children = {}
+    for row in rows:
+        depth = row[3]
+        for child in open_children.pop(depth + 1, []):
+            child[4] = row[0]
+        open_children.setdefault(depth, []).append(row)
+    return [tuple(row) for row in rows]
+
+
+class Command(BaseCommand):
+    help = 'Report the slowest imports and the cold-start time to first response of api/index.py.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Imports to list (default 20).')
+        parser.add_argument('--runs', type=int, default=3, help='Untraced cold starts to time (default 3).')
+        parser.add_argument('--path', default='/health/', help='Path of the first request (default /health/).')
+        parser.add_argument('--target-ms', type=float,
+                            help='Fail when the median cold start to first response exceeds this.')
+        parser.add_argument('--raw', metavar='FILE', help='Also write the raw -X importtime output here.')
+
+    def _boot(self, path, importtime=False):
+        command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', BOOT, path]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'greaterwms.settings'))
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - started) * 1000
+        if result.returncode:
+            raise CommandError(f'Cold start failed:\n{result.stderr[-2000:]}')
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        timings['process_ms'] = wall_ms
+        return timings, result.stderr
+
+    def handle(self, *args, **options):
+        timings, trace = self._boot(options['path'], importtime=True)
+        if options['raw']:
+            with open(options['raw'], 'w') as fh:
+                fh.write(trace)
+        rows = parse_importtime(trace)
+        by_name = {row[0]: row for row in rows}
+        top_level = [row for row in rows if row[3] == 0]
+        total_ms = sum(row[2] for row in top_level) / 1000
+
+        self.stdout.write(f'{len(rows)} modules imported, {total_ms:.0f} ms in imports (traced)')
+        self.stdout.write('Slowest imports by cumulative time (top level):')
+        for name, self_us, cumulative_us, _, _ in sorted(top_level, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+        self.stdout.write('Slowest modules by self time:')
+        for name, self_us, _, _, parent in sorted(rows, key=lambda row: -row[1])[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {name}' + (f'  (from {parent})' if parent else ''))
+
+        loaded = [name for name in DEFERRED if name in by_name]
+        if loaded:
+            self.stdout.write(self.style.WARNING('Deferred libraries imported at startup:'))
+            for name in loaded:
+                chain, current = [], by_name[name]
+                while current is not None:
+                    chain.append(current[0])
+                    current = by_name.get(current[4]) if current[4] else None
+                self.stdout.write(f'  {by_name[name][2] / 1000:8.1f} ms  ' + ' <- '.join(chain))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'None of {", ".join(DEFERRED)} imported at startup.'))
+
+        samples = [self._boot(options['path'])[0] for _ in range(max(1, options['runs']))]
+        first_response = statistics.median(sample['first_response_ms'] for sample in samples)
+        self.stdout.write(
+            f"\nCold start ({len(samples)} run(s), median): app ready "
+            f"{statistics.median(sample['app_ms'] for sample in samples):.0f} ms, first response "
+            f"{first_response:.0f} ms ({samples[0]['status']}), whole process "
+            f"{statistics.median(sample['process_ms'] for sample in samples):.0f} ms"
+        )
+        if options['target_ms'] is not None and first_response > options['target_ms']:
+            raise CommandError(f"Cold start {first_response:.0f} ms exceeds the {options['target_ms']:.0f} ms target")
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'core_daily_counter',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailycounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'day'), name='uniq_daily_counter_scope_day'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_scheduler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('key', models.CharField(blank=True, max_length=255)),
+                ('openid', models.CharField(blank=True, max_length=255)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'core_sync_tombstone',
+                'indexes': [models.Index(fields=['model', 'id'], name='idx_tombstone_model_id'), models.Index(fields=['deleted_at'], name='idx_tombstone_deleted')],
+            },
+        ),
+    ]
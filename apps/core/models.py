@@ -0,0 +1,73 @@
+from django.db import models
+
+
+class DailyCounter(models.Model):
+    """Last number handed out for ``scope`` on ``day``; see ``core.sequences``."""
+    scope = models.CharField(max_length=50)
+    day = models.DateField()
+    value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'core_daily_counter'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'day'], name='uniq_daily_counter_scope_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.day}: {self.value}"
+
+
+class SchedulerLease(models.Model):
+    """Leader lease for ``run_scheduler``: only ``owner`` runs jobs until ``expires_at``."""
+    name = models.CharField(max_length=50, primary_key=True)
+    owner = models.CharField(max_length=100)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'core_scheduler_lease'
+
+    def __str__(self):
+        return f"{self.name}: {self.owner} until {self.expires_at}"
+
+
+class JobRun(models.Model):
+    STATUS_CHOICES = [
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    ]
+
+    job = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    result = models.TextField(blank=True)
+    owner = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'core_job_run'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['job', '-started_at'], name='idx_job_run_recent'),
+        ]
+
+    def __str__(self):
+        return f"{self.job} {self.started_at:%Y-%m-%d %H:%M} {self.status}"
+
+
+class SyncTombstone(models.Model):
+    """A hard-deleted row that delta-sync clients still need to drop; see ``core.sync``."""
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    key = models.CharField(max_length=255, blank=True)
+    openid = models.CharField(max_length=255, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'core_sync_tombstone'
+        indexes = [
+            models.Index(fields=['model', 'id'], name='idx_tombstone_model_id'),
+            models.Index(fields=['deleted_at'], name='idx_tombstone_deleted'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at}"
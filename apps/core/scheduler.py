@@ -0,0 +1,158 @@
+"""
+Periodic jobs run inside the application by ``run_scheduler``.
+
+Apps register jobs in a ``jobs`` module with the ``job`` decorator::
+
+    @job('snapshot_stock', interval=timedelta(days=1))
+    def snapshot_stock():
+        ...
+
+Any number of ``run_scheduler`` processes may run; a lease row in
+``SchedulerLease`` elects one leader, which renews it between jobs and
+runs every job whose last run is older than its interval. Another process
+takes over once the lease expires. Every run is recorded in ``JobRun``
+with its duration, status and result, which ``stats`` summarises.
+"""
+import json
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, Max, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import JobRun, SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'scheduler'
+LEASE_SECONDS = 300
+
+JOBS = {}
+
+
+class Job:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+
+
+def job(name, interval):
+    """Register the decorated function to run every ``interval`` (a timedelta)."""
+    def register(func):
+        JOBS[name] = Job(name, func, interval)
+        return func
+    return register
+
+
+def discover():
+    """Import every installed app's ``jobs`` module so its jobs register."""
+    autodiscover_modules('jobs')
+    return JOBS
+
+
+def default_owner():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def acquire_lease(owner, seconds=LEASE_SECONDS):
+    """Take or renew the leader lease; returns True if ``owner`` holds it."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=seconds)
+    held = SchedulerLease.objects.filter(name=LEASE_NAME).filter(Q(owner=owner) | Q(expires_at__lt=now))
+    if held.update(owner=owner, expires_at=expires_at):
+        return True
+    try:
+        with transaction.atomic():
+            SchedulerLease.objects.create(name=LEASE_NAME, owner=owner, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        return False
+
+
+def release_lease(owner):
+    SchedulerLease.objects.filter(name=LEASE_NAME, owner=owner).delete()
+
+
+def last_runs():
+    """``{job name: started_at}`` of each job's latest run, in one grouped query."""
+    return dict(JobRun.objects.values('job').annotate(last=Max('started_at')).values_list('job', 'last').order_by())
+
+
+def due(now=None):
+    now = now or timezone.now()
+    last = last_runs()
+    return [job for name, job in JOBS.items() if name not in last or last[name] + job.interval <= now]
+
+
+def run(job, owner=None):
+    """Run one job now and record it; returns the ``JobRun``."""
+    started_at = timezone.now()
+    clock = time.monotonic()
+    try:
+        result = job.func()
+        status = 'success'
+    except Exception as exc:
+        logger.exception('Scheduled job %s failed', job.name)
+        result = f'{type(exc).__name__}: {exc}'
+        status = 'failed'
+    return JobRun.objects.create(
+        job=job.name, started_at=started_at, status=status, owner=owner or default_owner(),
+        duration_ms=int((time.monotonic() - clock) * 1000),
+        result=result if isinstance(result, str) else json.dumps(result, default=str),
+    )
+
+
+def tick(owner, lease_seconds=LEASE_SECONDS):
+    """
+    Run every due job if ``owner`` is (or becomes) the leader.
+
+    The lease is renewed before each job, so a leader that stalls past its
+    lease stops instead of running alongside the new one. Returns the runs.
+    """
+    runs = []
+    for job in due():
+        if not acquire_lease(owner, lease_seconds):
+            break
+        runs.append(run(job, owner))
+    return runs
+
+
+def stats(since=None):
+    """Run history per registered job: counts, failures, durations and the latest run."""
+    history = JobRun.objects.all()
+    if since is not None:
+        history = history.filter(started_at__gte=since)
+    totals = {
+        row['job']: row for row in history.values('job').annotate(
+            runs=Count('id'), failures=Count('id', filter=Q(status='failed')),
+            avg_ms=Avg('duration_ms'), max_ms=Max('duration_ms'), last_run=Max('started_at'),
+        ).order_by()
+    }
+    latest = {}
+    for row in JobRun.objects.filter(started_at__in=[row['last_run'] for row in totals.values()]) \
+            .values('job', 'started_at', 'status', 'result'):
+        if totals.get(row['job'], {}).get('last_run') == row['started_at']:
+            latest[row['job']] = row
+    report = []
+    for name, job in sorted(JOBS.items()):
+        row = totals.get(name, {})
+        last = latest.get(name, {})
+        report.append({
+            'job': name,
+            'interval': job.interval,
+            'runs': row.get('runs', 0),
+            'failures': row.get('failures', 0),
+            'avg_ms': round(row['avg_ms']) if row.get('avg_ms') is not None else None,
+            'max_ms': row.get('max_ms'),
+            'last_run': row.get('last_run'),
+            'last_status': last.get('status'),
+            'last_result': last.get('result'),
+            'next_run': row['last_run'] + job.interval if row.get('last_run') else None,
+        })
+    return report
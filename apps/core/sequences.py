@@ -0,0 +1,37 @@
+"""
+Per-day document numbers.
+
+``allocate`` hands out 1, 2, 3, ... per (scope, day) from one
+``DailyCounter`` row: an ``UPDATE ... SET value = value + 1`` followed by a
+read of the row it just locked, both in one transaction. That is constant
+work per create, whatever the day's volume, and two concurrent callers
+always get different numbers. Numbers consumed by a create that later rolls
+back are not reused, so sequences may have gaps.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DailyCounter
+
+
+def allocate(scope, day=None, start=None):
+    """
+    Next number for ``scope`` on ``day`` (default today).
+
+    ``start`` is an optional callable returning the last number already used
+    that day outside the counter (e.g. by records numbered before counters
+    existed). It runs at most once, when the day's row is first created.
+    """
+    day = day or timezone.localdate()
+    rows = DailyCounter.objects.filter(scope=scope, day=day)
+    with transaction.atomic():
+        if not rows.update(value=F('value') + 1):
+            try:
+                with transaction.atomic():
+                    counter = DailyCounter.objects.create(scope=scope, day=day, value=(start() if start else 0) + 1)
+                return counter.value
+            except IntegrityError:
+                # Another caller created the day's row first.
+                rows.update(value=F('value') + 1)
+        return rows.values_list('value', flat=True).get()
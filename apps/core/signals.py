@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+
+from . import sync
+
+
+def record_sync_tombstone(sender, instance, **kwargs):
+    sync.record_deletion(instance)
+
+
+for label in sync.TRACKED:
+    post_delete.connect(record_sync_tombstone, sender=label, dispatch_uid=f'sync_tombstone_{label}')
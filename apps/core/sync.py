@@ -0,0 +1,187 @@
+"""
+Delta sync for catalogue tables (goods, stock).
+
+Clients download changes in ``(update_time, id)`` order and keep the
+returned cursor; the next poll only reads rows after that position through
+the ``(update_time, id)`` index, so a poll with nothing new is one empty
+index range scan and an unchanged response. Rows flagged deleted
+(``is_delete``) come back as tombstones, and hard deletes of tracked models
+are recorded in ``SyncTombstone`` by ``core.signals`` and streamed
+alongside with their own position in the cursor.
+
+Rows are only served once they are ``SETTLE_SECONDS`` old, so a
+transaction that stamped ``update_time`` just before a poll but committed
+just after it is still picked up by the next poll. Tombstones are kept
+``TOMBSTONE_DAYS``; a cursor older than the retained tombstones raises
+``CursorExpired`` and the client must start over.
+"""
+import base64
+import hashlib
+import json
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Min, Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import SyncTombstone
+
+# Models whose hard deletes are recorded, with the field sent as the tombstone key.
+TRACKED = {
+    'goods.ListModel': 'goods_code',
+    'stock.StockListModel': 'goods_code',
+}
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+SETTLE_SECONDS = 2
+TOMBSTONE_DAYS = 30
+
+
+class CursorError(ValueError):
+    """The cursor or ``updated_since`` value cannot be used."""
+
+
+class CursorExpired(CursorError):
+    """Tombstones after the cursor have been pruned; the client must resync from scratch."""
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+        return {'t': position['t'], 'id': int(position['id']), 'd': int(position['d'])}
+    except (ValueError, KeyError, TypeError):
+        raise CursorError('Invalid cursor')
+
+
+def _tombstones(label, openid):
+    tombstones = SyncTombstone.objects.filter(model=label)
+    return tombstones.filter(openid=openid) if openid is not None else tombstones
+
+
+def changes(queryset, serialize, cursor=None, updated_since=None, limit=DEFAULT_LIMIT,
+            deleted_field=None, openid=None):
+    """
+    One page of changes to ``queryset`` after ``cursor`` (or ``updated_since``).
+
+    Without either, returns a full download of live rows, starting a new
+    cursor. ``serialize`` turns a list of rows into JSON-ready dicts.
+    ``openid`` limits hard-delete tombstones to one owner (``None``: all).
+    Returns ``{'results', 'deleted', 'next_cursor', 'has_more'}``.
+    """
+    model = queryset.model
+    label = model._meta.label
+    key_field = TRACKED.get(label, 'pk')
+    limit = max(1, min(int(limit), MAX_LIMIT))
+
+    if cursor:
+        position = decode_cursor(cursor)
+        oldest = SyncTombstone.objects.aggregate(first=Min('id'))['first']
+        if oldest is not None and oldest > position['d'] + 1:
+            raise CursorExpired('Cursor is older than the retained deletions; sync again without a cursor')
+        since = parse_datetime(position['t']) if position['t'] else None
+        tombstones = _tombstones(label, openid).filter(id__gt=position['d'])
+    elif updated_since:
+        since = parse_datetime(updated_since)
+        if since is None:
+            raise CursorError('updated_since must be an ISO 8601 datetime')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        if since < timezone.now() - timedelta(days=TOMBSTONE_DAYS):
+            raise CursorExpired(f'updated_since is more than {TOMBSTONE_DAYS} days ago; sync again without it')
+        # Start the deletion stream after the last tombstone before ``since`` (or just before the
+        # oldest retained one), so the next poll neither replays old deletions nor looks expired.
+        bounds = SyncTombstone.objects.aggregate(
+            before=Max('id', filter=Q(deleted_at__lt=since)), first=Min('id'),
+        )
+        position = {'t': since.isoformat(), 'id': 0, 'd': bounds['before'] or max((bounds['first'] or 1) - 1, 0)}
+        tombstones = _tombstones(label, openid).filter(id__gt=position['d'])
+    else:
+        since = None
+        position = {'t': None, 'id': 0, 'd': SyncTombstone.objects.aggregate(last=Max('id'))['last'] or 0}
+        tombstones = SyncTombstone.objects.none()
+        if deleted_field:
+            queryset = queryset.filter(**{deleted_field: False})
+
+    rows = queryset.filter(update_time__lt=timezone.now() - timedelta(seconds=SETTLE_SECONDS))
+    if since is not None:
+        rows = rows.filter(Q(update_time__gt=since) | Q(update_time=since, id__gt=position['id']))
+    rows = list(rows.order_by('update_time', 'id')[:limit + 1])
+    removed = list(tombstones.order_by('id').values('id', 'object_id', 'key')[:limit + 1])
+    has_more = len(rows) > limit or len(removed) > limit
+    rows, removed = rows[:limit], removed[:limit]
+
+    next_position = dict(position)
+    if rows:
+        next_position.update(t=rows[-1].update_time.isoformat(), id=rows[-1].id)
+    if removed:
+        next_position['d'] = removed[-1]['id']
+    deleted = [{'id': row['object_id'], 'key': row['key']} for row in removed]
+    if deleted_field:
+        deleted.extend({'id': row.id, 'key': getattr(row, key_field)} for row in rows if getattr(row, deleted_field))
+        rows = [row for row in rows if not getattr(row, deleted_field)]
+    return {
+        'results': serialize(rows),
+        'deleted': deleted,
+        'next_cursor': encode_cursor(next_position),
+        'has_more': has_more,
+    }
+
+
+def render(payload):
+    """JSON body and strong ETag (a hash of the exact bytes) for a sync page."""
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    return body, '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def sync_response(request, queryset, serialize, deleted_field=None, openid=None):
+    """
+    HTTP wrapper around ``changes`` for viewset ``sync`` actions.
+
+    Reads ``cursor``, ``updated_since`` and ``limit`` from the query string;
+    answers 304 when ``If-None-Match`` already names the page, 400 for a bad
+    cursor and 410 for an expired one.
+    """
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+    try:
+        payload = changes(
+            queryset, serialize, cursor=params.get('cursor'), updated_since=params.get('updated_since'),
+            limit=params.get('limit') or DEFAULT_LIMIT, deleted_field=deleted_field, openid=openid,
+        )
+    except CursorExpired as exc:
+        return JsonResponse({'error': str(exc), 'resync': True}, status=410)
+    except (CursorError, ValueError) as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    body, etag = render(payload)
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def record_deletion(instance):
+    label = instance._meta.label
+    SyncTombstone.objects.create(
+        model=label, object_id=instance.pk,
+        key=str(getattr(instance, TRACKED[label], '') or ''), openid=getattr(instance, 'openid', '') or '',
+    )
+
+
+def prune_tombstones(days=TOMBSTONE_DAYS):
+    """Drop tombstones older than ``days``, always keeping the newest so expired cursors stay detectable."""
+    newest = SyncTombstone.objects.aggregate(last=Max('id'))['last']
+    if newest is None:
+        return 0
+    deleted, _ = SyncTombstone.objects.filter(
+        deleted_at__lt=timezone.now() - timedelta(days=days), id__lt=newest,
+    ).delete()
+    return deleted
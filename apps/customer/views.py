@@ -5,6 +5,7 @@ from .serializers import CustomerSerializer
 
 # Import RBAC helper
 from permissions.decorators import check_permission
+from greaterwms.pagination import HybridPagination
 
 # Custom DRF permission class for customer CRUD
 class CustomerPermission(BasePermission):
@@ -32,6 +33,7 @@ class CustomerPermission(BasePermission):
 class CustomerViewSet(viewsets.ModelViewSet):
     queryset = ListModel.objects.filter(is_delete=False)
     serializer_class = CustomerSerializer
+    pagination_class = HybridPagination
     permission_classes = [CustomerPermission]  # RBAC permission
     
     def get_queryset(self):
@@ -15,6 +15,7 @@ from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from datetime import timedelta
 from django.views.decorators.http import require_http_methods
+from greaterwms.routers import replica_reads
 from permissions.decorators import require_role, get_user_role
 import json
 
@@ -24,6 +25,7 @@ import json
 
 @login_required
 @require_role('superadmin', 'admin')
+@replica_reads
 def unified_dashboard(request):
     """
     Unified dashboard for both SuperAdmin and Admin
@@ -118,6 +120,7 @@ def unified_dashboard(request):
 
 @login_required
 @require_role('superadmin', 'admin')
+@replica_reads
 def team_user_list(request):
     """
     Unified user management page
@@ -177,6 +180,7 @@ def team_user_list(request):
 
 @login_required
 @require_role('superadmin', 'admin')
+@replica_reads
 def team_user_detail(request, user_id):
     """
     User detail page
@@ -314,6 +318,7 @@ def team_user_change_role(request, user_id):
 
 @login_required
 @require_role('superadmin', 'admin')
+@replica_reads
 def team_orders(request):
     """
     Unified order management page
@@ -368,6 +373,7 @@ def team_orders(request):
 
 @login_required
 @require_role('superadmin', 'admin')
+@replica_reads
 def team_inventory(request):
     """
     Unified inventory management
@@ -405,6 +411,7 @@ def team_inventory(request):
 
 @login_required
 @require_role('superadmin', 'admin')
+@replica_reads
 def team_analytics(request):
     """
     Unified analytics dashboard
@@ -499,6 +506,7 @@ def team_system_settings(request):
 
 @login_required
 @require_role('superadmin')
+@replica_reads
 def team_system_logs(request):
     """System logs - SuperAdmin ONLY"""
     if get_user_role(request.user) != 'superadmin':
@@ -521,6 +529,7 @@ def team_system_logs(request):
 
 @login_required
 @require_role('superadmin')
+@replica_reads
 def team_database_overview(request):
     """Database overview - SuperAdmin ONLY"""
     if get_user_role(request.user) != 'superadmin':
@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import HttpResponseForbidden
+from greaterwms import counters
 from .models import ForumCategory, Topic, Post
 
 def is_team_member(user):
@@ -29,8 +30,8 @@ def topic_detail(request, topic_id):
 	if request.user.is_authenticated and hasattr(request.user, 'role') and request.user.role.role == 'customer':
 		return HttpResponseForbidden("Customers cannot access forums")
 	topic = get_object_or_404(Topic, id=topic_id)
-	topic.views += 1
-	topic.save(update_fields=['views'])
+	counters.increment(Topic, topic.id)
+	topic.views += counters.pending(Topic, topic.id)
 	posts = topic.posts.all()
 	return render(request, 'forums/topic.html', {'topic': topic, 'posts': posts})
 
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0005_listmodel_created_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listmodel',
+            name='view_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='View Count'),
+        ),
+    ]
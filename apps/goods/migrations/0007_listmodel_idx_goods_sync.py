@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goods', '0006_listmodel_view_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listmodel',
+            index=models.Index(fields=['update_time', 'id'], name='idx_goods_sync'),
+        ),
+    ]
@@ -21,6 +21,7 @@ class ListModel(models.Model):
     expiry_date = models.DateField(null=True, blank=True, verbose_name="Expiry Date")
     openid = models.CharField(max_length=255, verbose_name="OpenID", help_text="User/Store Identifier", default="")
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Created By")
+    view_count = models.IntegerField(default=0, editable=False, verbose_name="View Count")
     is_delete = models.BooleanField(default=False, verbose_name='Delete Label')
     create_time = models.DateTimeField(auto_now_add=True, verbose_name="Create Time")
     update_time = models.DateTimeField(auto_now=True, verbose_name="Update Time")
@@ -37,6 +38,7 @@ class ListModel(models.Model):
             models.Index(fields=['bar_code'], name='idx_bar_code'),
             models.Index(fields=['create_time'], name='idx_goods_created'),
             models.Index(fields=['goods_code', 'is_delete'], name='idx_goods_active'),
+            models.Index(fields=['update_time', 'id'], name='idx_goods_sync'),
         ]
 
     def __str__(self):
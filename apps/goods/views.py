@@ -1,12 +1,18 @@
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from core.bulk import bulk_response
+from core.sync import sync_response
+from greaterwms.pagination import HybridPagination
+from greaterwms.serialization import FastListMixin
 from .models import ListModel
 from .serializers import GoodsSerializer
 
-class GoodsViewSet(viewsets.ModelViewSet):
+class GoodsViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = ListModel.objects.filter(is_delete=False)
     serializer_class = GoodsSerializer
+    pagination_class = HybridPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['goods_class', 'goods_brand', 'goods_supplier']
@@ -17,22 +23,70 @@ class GoodsViewSet(viewsets.ModelViewSet):
         SuperAdmin sees all products.
         Others see only their own products (filtered by openid).
         """
+        return self._owned(ListModel.objects.filter(is_delete=False))
+
+    def _owner_openid(self):
+        """None for SuperAdmin (sees every store), otherwise the user's openid."""
         user = self.request.user
         if user.is_superuser:
-            return ListModel.objects.filter(is_delete=False)
+            return None
         
         # Check for role-based access
         try:
             from permissions.decorators import get_user_role
             role = get_user_role(user)
             if role == 'superadmin':
-                return ListModel.objects.filter(is_delete=False)
+                return None
         except:
             pass
             
         # Default: Filter by user's openid
-        openid = getattr(user, 'openid', user.username)
-        return ListModel.objects.filter(openid=openid, is_delete=False)
+        return getattr(user, 'openid', user.username)
+
+    def _owned(self, queryset):
+        openid = self._owner_openid()
+        return queryset if openid is None else queryset.filter(openid=openid)
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """
+        Catalogue changes since ``cursor`` (or ``updated_since``), with
+        tombstones for deleted products. Honours ``If-None-Match``.
+        """
+        return sync_response(
+            request, self._owned(ListModel.objects.all()),
+            lambda rows: self.get_serializer(rows, many=True).data,
+            deleted_field='is_delete', openid=self._owner_openid(),
+        )
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create, update or upsert a list of products keyed on ``goods_code``.
+
+        New products belong to the current user; existing ones keep their
+        owner and can only be changed by that store (or a SuperAdmin).
+        Admins may update but not create, as in ``perform_create``.
+        """
+        user = request.user
+        owner = self._owner_openid()
+        try:
+            from permissions.decorators import get_user_role
+            can_create = get_user_role(user) != 'admin'
+        except Exception:
+            can_create = True
+
+        def check(data, current):
+            if current is None:
+                return None if can_create else 'Admin can only edit products, not create new ones.'
+            if owner is not None and current['openid'] != owner:
+                return 'This goods_code belongs to another store.'
+            return None
+
+        return bulk_response(
+            request, GoodsSerializer, ['goods_code'], context=self.get_serializer_context(),
+            defaults={'openid': getattr(user, 'openid', user.username), 'created_by': user}, check=check,
+        )
 
     def perform_create(self, serializer):
         """
@@ -6,6 +6,7 @@ from django.http import JsonResponse
 from .models import InventoryTransaction, StockAlert, InventoryReport
 from goods.models import ListModel as Product
 from warehouse.models import ListModel as Warehouse
+from stock import ledger
 from stock.models import StockListModel as Stock
 from permissions.decorators import require_role, require_permission
 import uuid
@@ -143,20 +144,24 @@ def get_stock_api(request, stock_id):
 def create_stock_api(request):
     if request.method == 'POST':
         try:
-            stock = Stock.objects.create(
-                goods_code=request.POST['goods_code'],
-                goods_desc=request.POST['goods_desc'],
-                goods_qty=int(request.POST.get('onhand_stock', 0)),
-                onhand_stock=int(request.POST.get('onhand_stock', 0)),
-                can_order_stock=int(request.POST.get('can_order_stock', 0)),
+            # Creating a product that is already stocked receives more of it.
+            goods_code = request.POST['goods_code']
+            onhand = int(request.POST.get('onhand_stock', 0))
+            if onhand < 0:
+                return JsonResponse({'success': False, 'message': 'onhand_stock cannot be negative'}, status=400)
+            stock_id, openid = ledger.stock_row(
+                goods_code, request.user.username, request.POST['goods_desc'],
                 ordered_stock=int(request.POST.get('ordered_stock', 0)),
                 damage_stock=int(request.POST.get('damage_stock', 0)),
                 supplier=request.POST.get('supplier', ''),
-                openid=request.user.username
             )
+            stock = Stock.objects.get(pk=stock_id)
             if 'goods_image' in request.FILES:
                 stock.goods_image = request.FILES['goods_image']
                 stock.save()
+            if onhand:
+                ledger.apply_delta(ledger.warehouse_id(request.POST.get('warehouse')), goods_code, onhand, 'in',
+                                   'Stock received', request.user, openid=openid)
             return JsonResponse({'success': True, 'id': stock.id})
         except Exception as e:
             return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -171,15 +176,14 @@ def update_stock_api(request, stock_id):
             stock.goods_code = request.POST.get('goods_code', stock.goods_code)
             stock.goods_desc = request.POST.get('goods_desc', stock.goods_desc)
             onhand = int(request.POST.get('onhand_stock', stock.goods_qty))
-            stock.goods_qty = onhand
-            stock.onhand_stock = onhand
-            stock.can_order_stock = int(request.POST.get('can_order_stock', stock.can_order_stock))
             stock.ordered_stock = int(request.POST.get('ordered_stock', stock.ordered_stock))
             stock.damage_stock = int(request.POST.get('damage_stock', getattr(stock, 'damage_stock', 0)))
             stock.supplier = request.POST.get('supplier', getattr(stock, 'supplier', ''))
             if 'goods_image' in request.FILES:
                 stock.goods_image = request.FILES['goods_image']
             stock.save()
+            ledger.set_onhand(ledger.warehouse_id(request.POST.get('warehouse')), stock.goods_code, onhand,
+                              'Stock edited', request.user, openid=stock.openid)
             return JsonResponse({'success': True})
         except Exception as e:
             return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -209,12 +213,11 @@ def update_qty_api(request, stock_id):
             value = int(data.get('value', 0))
             
             if field == 'onhand':
-                stock.goods_qty = value
-                stock.onhand_stock = value
+                ledger.set_onhand(ledger.warehouse_id(data.get('warehouse')), stock.goods_code, value,
+                                  'Stock count', request.user, openid=stock.openid)
             elif field == 'available':
                 stock.can_order_stock = value
-            
-            stock.save()
+                stock.save()
             return JsonResponse({'success': True})
         except Exception as e:
             return JsonResponse({'success': False, 'message': str(e)}, status=400)
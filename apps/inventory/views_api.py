@@ -2,8 +2,10 @@ from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
-from stock.models import StockListModel, StockMovement
+from stock import ledger
+from stock.models import StockListModel
 from permissions.decorators import require_permission
 import json
 import csv
@@ -31,28 +33,20 @@ def create_stock(request):
         goods_code = request.POST.get('goods_code')
         goods_desc = request.POST.get('goods_desc')
         onhand_stock = int(request.POST.get('onhand_stock', 0))
-        can_order_stock = int(request.POST.get('can_order_stock', 0))
         ordered_stock = int(request.POST.get('ordered_stock', 0))
         goods_image = request.FILES.get('goods_image')
         
-        stock = StockListModel.objects.create(
-            goods_code=goods_code,
-            goods_desc=goods_desc,
-            onhand_stock=onhand_stock,
-            goods_qty=onhand_stock,
-            can_order_stock=can_order_stock,
-            ordered_stock=ordered_stock,
-            goods_image=goods_image,
-            openid=request.user.openid if hasattr(request.user, 'openid') else 'admin'
-        )
+        openid = request.user.openid if hasattr(request.user, 'openid') else 'admin'
         
-        StockMovement.objects.create(
-            goods_code=goods_code,
-            movement_type='in',
-            quantity=onhand_stock,
-            reason='Initial stock',
-            user=request.user
-        )
+        # Creating a product that is already stocked receives more of it.
+        stock_id, openid = ledger.stock_row(goods_code, openid, goods_desc, ordered_stock=ordered_stock)
+        if goods_image:
+            stock = StockListModel.objects.get(pk=stock_id)
+            stock.goods_image = goods_image
+            stock.save()
+        if onhand_stock > 0:
+            ledger.apply_delta(ledger.warehouse_id(request.POST.get('warehouse')), goods_code, onhand_stock, 'in',
+                               'Initial stock', request.user, openid=openid)
         
         return JsonResponse({'success': True, 'message': 'Stock created successfully'})
     except Exception as e:
@@ -67,15 +61,15 @@ def update_stock(request, stock_id):
         
         stock.goods_code = request.POST.get('goods_code', stock.goods_code)
         stock.goods_desc = request.POST.get('goods_desc', stock.goods_desc)
-        stock.onhand_stock = int(request.POST.get('onhand_stock', stock.onhand_stock))
-        stock.goods_qty = stock.onhand_stock
-        stock.can_order_stock = int(request.POST.get('can_order_stock', stock.can_order_stock))
+        onhand = int(request.POST.get('onhand_stock', stock.onhand_stock))
         stock.ordered_stock = int(request.POST.get('ordered_stock', stock.ordered_stock))
         
         if request.FILES.get('goods_image'):
             stock.goods_image = request.FILES.get('goods_image')
         
         stock.save()
+        ledger.set_onhand(ledger.warehouse_id(request.POST.get('warehouse')), stock.goods_code, onhand,
+                          'Stock edited', request.user, openid=stock.openid)
         
         return JsonResponse({'success': True, 'message': 'Stock updated successfully'})
     except Exception as e:
@@ -103,12 +97,11 @@ def update_qty(request, stock_id):
         value = int(data.get('value', 0))
         
         if field == 'onhand':
-            stock.onhand_stock = value
-            stock.goods_qty = value
+            ledger.set_onhand(ledger.warehouse_id(data.get('warehouse')), stock.goods_code, value,
+                              'Stock count', request.user, openid=stock.openid)
         elif field == 'available':
             stock.can_order_stock = value
-        
-        stock.save()
+            stock.save()
         return JsonResponse({'success': True})
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)})
@@ -126,17 +119,18 @@ def bulk_upload(request):
         io_string = io.StringIO(decoded_file)
         reader = csv.DictReader(io_string)
         
+        openid = request.user.openid if hasattr(request.user, 'openid') else 'admin'
+        warehouse = ledger.warehouse_id(request.POST.get('warehouse'))
         count = 0
-        for row in reader:
-            StockListModel.objects.create(
-                goods_code=row['goods_code'],
-                goods_desc=row['goods_desc'],
-                onhand_stock=int(row['onhand_stock']),
-                goods_qty=int(row['onhand_stock']),
-                can_order_stock=int(row['can_order_stock']),
-                openid=request.user.openid if hasattr(request.user, 'openid') else 'admin'
-            )
-            count += 1
+        with transaction.atomic():
+            for row in reader:
+                # Rows for products already in stock add to them.
+                _, row_openid = ledger.stock_row(row['goods_code'], openid, row['goods_desc'])
+                onhand = int(row['onhand_stock'])
+                if onhand:
+                    ledger.apply_delta(warehouse, row['goods_code'], onhand, 'in', 'Bulk upload',
+                                       request.user, openid=row_openid)
+                count += 1
         
         return JsonResponse({'success': True, 'count': count})
     except Exception as e:
@@ -1,5 +1,6 @@
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
+from stock import ledger
 from stock.models import StockListModel as Stock
 import csv
 import io
@@ -20,6 +21,7 @@ def bulk_upload_stock_api(request):
             
             count = 0
             errors = []
+            warehouse = ledger.warehouse_id(request.POST.get('warehouse'))
             
             for row in reader:
                 try:
@@ -30,34 +32,18 @@ def bulk_upload_stock_api(request):
                         continue
                     
                     onhand = int(row.get('onhand_stock', 0))
-                    available = int(row.get('can_order_stock', 0))
                     supplier = row.get('supplier', '').strip()
                     
-                    # Check if stock exists
-                    stock = Stock.objects.filter(goods_code=goods_code).first()
-                    
-                    if stock:
-                        # Update existing
-                        stock.goods_desc = goods_desc
-                        stock.goods_qty = onhand
-                        stock.onhand_stock = onhand
-                        stock.can_order_stock = available
-                        if supplier:
-                            stock.supplier = supplier
-                        stock.save()
-                    else:
-                        # Create new
-                        Stock.objects.create(
-                            goods_code=goods_code,
-                            goods_desc=goods_desc,
-                            goods_qty=onhand,
-                            onhand_stock=onhand,
-                            can_order_stock=available,
-                            ordered_stock=0,
-                            damage_stock=0,
-                            supplier=supplier or '',
-                            openid=request.user.username
-                        )
+                    # Counts replace the on-hand quantity; the difference is booked as an adjustment.
+                    openid = Stock.objects.filter(goods_code=goods_code).values_list('openid', flat=True).first()
+                    if openid is None:
+                        openid = request.user.username
+                    stock_id, openid = ledger.stock_row(goods_code, openid, goods_desc)
+                    details = {'goods_desc': goods_desc}
+                    if supplier:
+                        details['supplier'] = supplier
+                    Stock.objects.filter(pk=stock_id).update(**details)
+                    ledger.set_onhand(warehouse, goods_code, onhand, 'Bulk stock upload', request.user, openid=openid)
                     
                     count += 1
                 except Exception as e:
@@ -1,8 +1,33 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from django.db import connection
 from django.core.cache import cache
+from django.conf import settings
+from . import metrics
 import time
 
+CACHE_PROBE_INTERVAL = 30
+_cache_probe = {'checked_at': 0.0, 'status': 'unknown'}
+
+
+def _cache_status():
+    """Probe the cache at most once per CACHE_PROBE_INTERVAL seconds per worker."""
+    now = time.monotonic()
+    if now - _cache_probe['checked_at'] >= CACHE_PROBE_INTERVAL:
+        try:
+            cache.set('health_check', 'ok', 60)
+            _cache_probe['status'] = 'healthy' if cache.get('health_check') == 'ok' else 'unhealthy'
+        except Exception:
+            _cache_probe['status'] = 'unhealthy'
+        _cache_probe['checked_at'] = now
+    return _cache_probe['status']
+
+
+def _metrics_authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        return request.META.get('HTTP_AUTHORIZATION', '') == f'Bearer {token}'
+    return request.user.is_authenticated and request.user.is_staff
+
 def health_check(request):
     status = {'status': 'healthy', 'timestamp': time.time(), 'services': {}}
     
@@ -15,13 +40,7 @@ def health_check(request):
         status['services']['database'] = 'unhealthy'
         status['status'] = 'unhealthy'
     
-    # Cache check
-    try:
-        cache.set('health_check', 'ok', 10)
-        cache.get('health_check')
-        status['services']['cache'] = 'healthy'
-    except:
-        status['services']['cache'] = 'unhealthy'
+    status['services']['cache'] = _cache_status()
     
     # API endpoints check
     status['services']['api'] = 'healthy'
@@ -30,11 +49,11 @@ def health_check(request):
     return JsonResponse(status)
 
 def metrics_api(request):
-    return JsonResponse({
-        'active_users': 156,
-        'api_requests_per_minute': 245,
-        'database_connections': 12,
-        'memory_usage': '68%',
-        'cpu_usage': '23%',
-        'disk_usage': '45%'
-    })
\ No newline at end of file
+    if not _metrics_authorized(request):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return JsonResponse(metrics.summary())
+
+def prometheus_metrics(request):
+    if not _metrics_authorized(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,271 @@
+"""
+Process and request metrics shared across gunicorn workers.
+
+Each worker keeps its own counters in memory and periodically writes them
+to ``<METRICS_DIR>/<pid>.json``. The exporter sums every worker's file, so
+one scrape sees the whole server regardless of which worker answers it.
+Counters from workers that have exited are folded into ``_dead.json`` so
+totals never go backwards; gauges of dead workers are dropped.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no locking needed
+    fcntl = None
+
+METRICS_DIR = Path(getattr(settings, 'METRICS_DIR', Path(tempfile.gettempdir()) / 'multistock_metrics'))
+FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+COUNTERS = ('requests', 'queries', 'query_seconds')
+HISTOGRAMS = {'latency': LATENCY_BUCKETS, 'query_count': QUERY_BUCKETS}
+
+_CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _empty_histogram(buckets):
+    return {'buckets': [0] * (len(buckets) + 1), 'sum': 0.0, 'count': 0}
+
+
+def _observe(histogram, buckets, value):
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            histogram['buckets'][index] += 1
+            break
+    else:
+        histogram['buckets'][-1] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+
+class Registry:
+    """Per-process metric state. Label sets are stored as ``'a|b|c'`` keys."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.in_flight = 0
+        self.last_flush = 0.0
+        self.reset()
+
+    def reset(self):
+        # requests: view|method|status; queries/query_seconds/histograms: view
+        self.counters = {name: {} for name in COUNTERS}
+        self.histograms = {name: {} for name in HISTOGRAMS}
+
+    def _check_fork(self):
+        # Workers forked from a preloaded master must not inherit its numbers.
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self.in_flight = 0
+            self.last_flush = 0.0
+            self.reset()
+
+    def request_started(self):
+        with self.lock:
+            self._check_fork()
+            self.in_flight += 1
+
+    def request_finished(self, view, method, status, seconds, queries, query_seconds):
+        with self.lock:
+            self.in_flight -= 1
+            key = f'{view}|{method}|{status}'
+            self.counters['requests'][key] = self.counters['requests'].get(key, 0) + 1
+            self.counters['queries'][view] = self.counters['queries'].get(view, 0) + queries
+            self.counters['query_seconds'][view] = self.counters['query_seconds'].get(view, 0.0) + query_seconds
+            for name, value in (('latency', seconds), ('query_count', queries)):
+                buckets = HISTOGRAMS[name]
+                histogram = self.histograms[name].setdefault(view, _empty_histogram(buckets))
+                _observe(histogram, buckets, value)
+            due = time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            self._check_fork()
+            return {
+                'pid': self.pid,
+                'counters': json.loads(json.dumps(self.counters)),
+                'histograms': json.loads(json.dumps(self.histograms)),
+                'gauges': {'in_flight': self.in_flight, **process_stats()},
+            }
+
+    def flush(self):
+        """Atomically write this process's snapshot to the shared directory."""
+        data = self.snapshot()
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, prefix='.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, METRICS_DIR / f'{data["pid"]}.json')
+        self.last_flush = time.monotonic()
+
+
+registry = Registry()
+
+
+def process_stats():
+    """Resident memory and CPU seconds for this process, read from ``/proc``."""
+    stats = {'rss_bytes': 0, 'cpu_seconds': 0.0, 'start_time': 0.0}
+    try:
+        with open('/proc/self/stat') as fh:
+            fields = fh.read().rsplit(')', 1)[1].split()
+        # Field numbers from proc(5), offset by the two fields before ')'.
+        stats['cpu_seconds'] = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+        stats['rss_bytes'] = int(fields[21]) * _PAGE_SIZE
+        with open('/proc/stat') as fh:
+            btime = next(int(line.split()[1]) for line in fh if line.startswith('btime'))
+        stats['start_time'] = btime + int(fields[19]) / _CLK_TCK
+    except (OSError, IndexError, ValueError, StopIteration):
+        pass
+    return stats
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(into, data):
+    for name in COUNTERS:
+        target = into['counters'].setdefault(name, {})
+        for key, value in data['counters'].get(name, {}).items():
+            target[key] = target.get(key, 0) + value
+    for name, buckets in HISTOGRAMS.items():
+        target = into['histograms'].setdefault(name, {})
+        for key, histogram in data['histograms'].get(name, {}).items():
+            merged = target.setdefault(key, _empty_histogram(buckets))
+            merged['buckets'] = [a + b for a, b in zip(merged['buckets'], histogram['buckets'])]
+            merged['sum'] += histogram['sum']
+            merged['count'] += histogram['count']
+
+
+def collect():
+    """Aggregate every worker's snapshot into one dict."""
+    registry.flush()
+    total = {'counters': {}, 'histograms': {}, 'workers': []}
+    dead_path = METRICS_DIR / '_dead.json'
+    with open(METRICS_DIR / '.lock', 'w') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        dead = {'counters': {}, 'histograms': {}}
+        if dead_path.exists():
+            with open(dead_path) as fh:
+                dead = json.load(fh)
+        folded = False
+        for path in METRICS_DIR.glob('[0-9]*.json'):
+            try:
+                with open(path) as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            if _pid_alive(data['pid']):
+                _merge(total, data)
+                total['workers'].append({'pid': data['pid'], **data['gauges']})
+            else:
+                _merge(dead, data)
+                path.unlink()
+                folded = True
+        if folded:
+            with open(dead_path, 'w') as fh:
+                json.dump(dead, fh)
+        _merge(total, dead)
+    return total
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def render_prometheus(data=None):
+    """Render aggregated metrics in the Prometheus text exposition format."""
+    data = data or collect()
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    header('http_requests_total', 'counter', 'Requests by view, method and status code.')
+    for key, value in sorted(data['counters'].get('requests', {}).items()):
+        view, method, status = key.split('|')
+        lines.append(f'http_requests_total{{{_labels(view=view, method=method, status=status)}}} {value}')
+
+    header('db_queries_total', 'counter', 'Database queries issued while serving each view.')
+    for view, value in sorted(data['counters'].get('queries', {}).items()):
+        lines.append(f'db_queries_total{{{_labels(view=view)}}} {value}')
+
+    header('db_query_seconds_total', 'counter', 'Time spent in database queries per view.')
+    for view, value in sorted(data['counters'].get('query_seconds', {}).items()):
+        lines.append(f'db_query_seconds_total{{{_labels(view=view)}}} {value:.6f}')
+
+    for name, metric, help_text in (
+        ('latency', 'http_request_duration_seconds', 'Request latency per view.'),
+        ('query_count', 'db_queries_per_request', 'Database queries per request per view.'),
+    ):
+        header(metric, 'histogram', help_text)
+        buckets = HISTOGRAMS[name]
+        for view, histogram in sorted(data['histograms'].get(name, {}).items()):
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], histogram['buckets']):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{_labels(view=view, le=bound)}}} {cumulative}')
+            lines.append(f'{metric}_sum{{{_labels(view=view)}}} {histogram["sum"]:.6f}')
+            lines.append(f'{metric}_count{{{_labels(view=view)}}} {histogram["count"]}')
+
+    for gauge, metric, kind, help_text in (
+        ('in_flight', 'http_requests_in_flight', 'gauge', 'Requests currently being served.'),
+        ('rss_bytes', 'process_resident_memory_bytes', 'gauge', 'Resident set size.'),
+        ('cpu_seconds', 'process_cpu_seconds_total', 'counter', 'User and system CPU time.'),
+        ('start_time', 'process_start_time_seconds', 'gauge', 'Process start time since the epoch.'),
+    ):
+        header(metric, kind, help_text)
+        for worker in data['workers']:
+            lines.append(f'{metric}{{{_labels(pid=worker["pid"])}}} {worker.get(gauge, 0)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def summary(data=None):
+    """A compact JSON-friendly overview used by the metrics API."""
+    data = data or collect()
+    requests = data['counters'].get('requests', {})
+    by_status = {}
+    for key, value in requests.items():
+        status_class = key.rsplit('|', 1)[1][0] + 'xx'
+        by_status[status_class] = by_status.get(status_class, 0) + value
+    latency = data['histograms'].get('latency', {})
+    slowest = sorted(
+        ((view, h['sum'] / h['count']) for view, h in latency.items() if h['count']),
+        key=lambda item: item[1], reverse=True,
+    )[:10]
+    return {
+        'workers': len(data['workers']),
+        'requests_total': sum(requests.values()),
+        'requests_by_status': by_status,
+        'requests_in_flight': sum(w.get('in_flight', 0) for w in data['workers']),
+        'db_queries_total': sum(data['counters'].get('queries', {}).values()),
+        'memory_rss_bytes': sum(w.get('rss_bytes', 0) for w in data['workers']),
+        'cpu_seconds_total': round(sum(w.get('cpu_seconds', 0) for w in data['workers']), 2),
+        'slowest_views': [{'view': view, 'avg_seconds': round(avg, 4)} for view, avg in slowest],
+    }
@@ -0,0 +1,60 @@
+from contextlib import ExitStack
+from django.db import connections
+from .metrics import registry
+import time
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook that counts and times every query."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count/time, status code and in-flight requests per view.
+
+    Placed first in MIDDLEWARE so the measurement includes every other
+    middleware. Views are labelled by URL name (or route pattern), never by
+    raw path, to keep the label set bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        registry.request_started()
+        started = time.perf_counter()
+        status = 500
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            registry.request_finished(
+                self.view_label(request), request.method, status,
+                time.perf_counter() - started, counter.count, counter.seconds,
+            )
+
+    @staticmethod
+    def view_label(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            if request.path.startswith('/static/') or request.path.startswith('/media/'):
+                return 'static'
+            return 'unmatched'
+        return match.view_name or match.route or match._func_path
@@ -5,8 +5,7 @@ from django.http import JsonResponse, HttpResponse
 from django.db.models import Sum, Count
 from django.views.decorators.http import require_http_methods
 import csv
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill
+from greaterwms.lazy import lazy_module
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from .models import Order, OrderItem
@@ -18,8 +17,13 @@ import json
 from datetime import datetime
 
 # Import RBAC decorators
+from greaterwms.routers import replica_reads
 from permissions.decorators import require_permission, require_role, get_user_role
 
+# Only the Excel import/export views need openpyxl; keep it off the startup path.
+openpyxl = lazy_module('openpyxl')
+styles = lazy_module('openpyxl.styles')
+
 def get_filtered_orders(request, base_queryset):
     """
     Helper function to filter orders based on user role.
@@ -407,6 +411,7 @@ def my_orders(request):
     return render(request, 'orders/my_orders.html', context)
 
 @require_permission('orders', 'export')  # Export orders permission
+@replica_reads
 def export_orders(request):
     format_type = request.GET.get('format', 'excel')
     order_type = request.GET.get('type', 'sale')
@@ -426,7 +431,7 @@ def export_orders(request):
         orders = orders.filter(created_at__date__lte=to_date)
     
     if format_type == 'excel':
-        wb = Workbook()
+        wb = openpyxl.Workbook()
         ws = wb.active
         ws.title = f'{order_type.title()} Orders'
         
@@ -436,8 +441,8 @@ def export_orders(request):
         
         # Style headers
         for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color='0014A8', end_color='0014A8', fill_type='solid')
+            cell.font = styles.Font(bold=True)
+            cell.fill = styles.PatternFill(start_color='0014A8', end_color='0014A8', fill_type='solid')
         
         # Data
         for order in orders:
@@ -539,7 +544,7 @@ def download_order(request, order_id):
     order = get_object_or_404(Order, id=order_id)
     
     # Create Excel file for single order
-    wb = Workbook()
+    wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = f'Order {order.order_number}'
     
@@ -568,7 +573,7 @@ def download_order(request, order_id):
     # Style headers
     for row in [1, 8, 9]:
         for cell in ws[row]:
-            cell.font = Font(bold=True)
+            cell.font = styles.Font(bold=True)
     
     response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
     response['Content-Disposition'] = f'attachment; filename=order_{order.order_number}.xlsx'
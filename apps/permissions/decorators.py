@@ -26,6 +26,12 @@ def get_user_role(user):
     if user.is_superuser:
         return 'superadmin'
 
+    from permissions.roles import cached_role
+    return cached_role(user, _resolve_role)
+
+
+def _resolve_role(user):
+    """Uncached lookup behind ``get_user_role`` for an authenticated, non-superuser ``user``."""
     # Prefer UserProfile role first because this is the primary role source in this project.
     try:
         from users.models import UserProfile
@@ -0,0 +1,53 @@
+"""
+Cached role resolution.
+
+``get_user_role`` may need up to four queries (profile, ``UserRole``,
+groups) and runs many times per request: in middleware, permission
+decorators, views and the template context processor. Resolved roles are
+kept in a per-process map by user id, tagged with a version stored in the
+shared cache. Any change to a profile, ``UserRole``, group membership or a
+user's staff/superuser flags bumps that version once the transaction
+commits. The version is read at most once per request (or every few
+seconds outside one), and the role is also memoised on the user object, so
+repeated lookups within a request cost nothing.
+"""
+import threading
+
+from greaterwms.versioning import SharedVersion
+
+VERSION = SharedVersion('permissions:roles:version')
+# The map is dropped wholesale when it grows past this many users.
+MAX_USERS = 10_000
+
+_lock = threading.Lock()
+_state = {'version': None, 'roles': {}}
+
+
+def cached_role(user, resolve):
+    """Role of an authenticated ``user``; ``resolve(user)`` runs on a miss."""
+    role = getattr(user, '_cached_role', None)
+    if role is not None:
+        return role
+    version = VERSION.get()
+    with _lock:
+        if _state['version'] != version or len(_state['roles']) >= MAX_USERS:
+            _state['version'], _state['roles'] = version, {}
+        role = _state['roles'].get(user.pk)
+    if role is None:
+        role = resolve(user)
+        with _lock:
+            if _state['version'] == version:
+                _state['roles'][user.pk] = role
+    user._cached_role = role
+    return role
+
+
+def clear():
+    """Drop this process's cached roles (tests and benchmarks)."""
+    with _lock:
+        _state['version'], _state['roles'] = None, {}
+
+
+def invalidate():
+    """Bump the shared version after the current transaction commits."""
+    VERSION.invalidate()
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import UserProfile
+
+from . import roles
+from .models import UserRole
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_delete, sender=User)
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles(sender, **kwargs):
+    roles.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_roles_on_user_save(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login; the role cannot have changed.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    roles.invalidate()
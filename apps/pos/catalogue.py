@@ -0,0 +1,156 @@
+"""
+POS catalogue snapshot.
+
+The till's product grid is built from one joined query over goods and
+stock, cached per store and versioned by the newest ``update_time`` seen
+on either table. Tills holding an older version can ask for the rows that
+changed since then instead of re-downloading the whole catalogue.
+
+Snapshots are cached per process under the shared ``VERSION``, which every
+worker bumps when goods or stock change, so no worker serves a snapshot
+older than another worker's committed change. Hard deletes are read from
+the ``SyncTombstone`` rows ``core`` records for goods.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from core import sync
+from core.models import SyncTombstone
+from goods.models import ListModel
+from greaterwms.versioning import SharedVersion
+from stock.models import StockListModel
+
+CACHE_PREFIX = 'pos:catalogue'
+CACHE_TIMEOUT = 300
+ALL_STORES = '*'
+
+VERSION = SharedVersion(f'{CACHE_PREFIX}:version')
+
+
+def _snapshot_key(store):
+    return f'{CACHE_PREFIX}:snapshot:{VERSION.get()}:{store or ALL_STORES}'
+
+
+def _to_version(dt):
+    """Versions are integer milliseconds since the epoch."""
+    if dt is None:
+        return 0
+    return int(dt.timestamp() * 1000)
+
+
+def _from_version(version):
+    return datetime.fromtimestamp(int(version) / 1000, tz=dt_timezone.utc)
+
+
+def _catalogue_queryset(store=None):
+    stock = StockListModel.objects.filter(goods_code=OuterRef('goods_code')).order_by('-id')
+    qs = ListModel.objects.order_by('goods_code').annotate(
+        stock_qty=Subquery(stock.values('can_order_stock')[:1]),
+        stock_updated=Subquery(stock.values('update_time')[:1]),
+    )
+    if store:
+        qs = qs.filter(openid=store)
+    return qs.values_list(
+        'id', 'goods_code', 'goods_desc', 'goods_price', 'goods_class',
+        'is_delete', 'update_time', 'stock_qty', 'stock_updated',
+    )
+
+
+def _row_version(row):
+    return max(_to_version(row[6]), _to_version(row[8]))
+
+
+def _row_to_product(row):
+    return {
+        'id': row[0],
+        'code': row[1],
+        'name': row[2],
+        'price': float(row[3] or 0),
+        'stock': int(row[7] or 0),
+        'category': row[4] or 'General',
+    }
+
+
+def _is_sellable(row):
+    return not row[5] and (row[7] or 0) > 0
+
+
+def build_snapshot(store=None):
+    """Run the joined catalogue query and return a fresh snapshot dict."""
+    products = []
+    version = 0
+    for row in _catalogue_queryset(store):
+        version = max(version, _row_version(row))
+        if _is_sellable(row):
+            products.append(_row_to_product(row))
+    return {
+        'version': version,
+        'generated_at': timezone.now().isoformat(),
+        'full': True,
+        'products': products,
+    }
+
+
+def get_snapshot(store=None):
+    """Return the cached snapshot for ``store``, building it on a miss."""
+    key = _snapshot_key(store)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(store)
+        cache.set(key, snapshot, CACHE_TIMEOUT)
+    return snapshot
+
+
+def get_delta(since, store=None):
+    """
+    Return rows changed after version ``since``.
+
+    Rows that are no longer sellable (soft deleted, out of stock or hard
+    deleted) are listed by code under ``removed``. If ``since`` predates the
+    retained tombstones (``core.sync.TOMBSTONE_DAYS``) the full snapshot is
+    returned instead. Deltas read the database, including the persisted
+    tombstones, so they do not depend on any worker's cache.
+    """
+    since = int(since)
+    since_dt = _from_version(since)
+    if since_dt < timezone.now() - timedelta(days=sync.TOMBSTONE_DAYS):
+        return get_snapshot(store)
+
+    changed_codes = set(
+        ListModel.objects.filter(update_time__gt=since_dt).values_list('goods_code', flat=True)
+    )
+    changed_codes.update(
+        StockListModel.objects.filter(update_time__gt=since_dt).values_list('goods_code', flat=True)
+    )
+
+    products, removed = [], []
+    version = since
+    if changed_codes:
+        for row in _catalogue_queryset(store).filter(goods_code__in=changed_codes):
+            version = max(version, _row_version(row))
+            if _is_sellable(row):
+                products.append(_row_to_product(row))
+            else:
+                removed.append(row[1])
+
+    tombstones = SyncTombstone.objects.filter(model=ListModel._meta.label, deleted_at__gt=since_dt)
+    if store:
+        tombstones = tombstones.filter(openid=store)
+    for deleted_at, code in tombstones.values_list('deleted_at', 'key'):
+        version = max(version, _to_version(deleted_at))
+        removed.append(code)
+
+    return {'version': version, 'full': False, 'products': products, 'removed': removed}
+
+
+def invalidate(store=None):
+    """
+    Retire every worker's cached snapshots once the current transaction
+    commits. ``store`` is accepted for the callers' sake; one version
+    covers all stores.
+    """
+    VERSION.invalidate()
+
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from goods.models import ListModel
+from stock.ledger import stock_changed
+from stock.models import StockListModel
+from . import catalogue
+
+
+@receiver(post_save, sender=ListModel)
+@receiver(post_save, sender=StockListModel)
+def invalidate_catalogue(sender, instance, **kwargs):
+    """Drop cached POS snapshots when a product or its stock row changes."""
+    catalogue.invalidate(instance.openid)
+
+
+@receiver(post_delete, sender=ListModel)
+@receiver(post_delete, sender=StockListModel)
+def remove_from_catalogue(sender, instance, **kwargs):
+    """Hard deletes are reported to tills from ``core``'s tombstones; only the snapshots need dropping."""
+    catalogue.invalidate(instance.openid)
+
+
+@receiver(stock_changed)
+def invalidate_after_ledger_change(sender, openid, **kwargs):
+    """Ledger changes write stock rows with UPDATE, which sends no post_save."""
+    catalogue.invalidate(openid)
@@ -5,6 +5,7 @@ app_name = 'pos'
 
 urlpatterns = [
     path('', views.pos_interface, name='interface'),
+    path('catalogue/', views.catalogue_api, name='catalogue'),
     path('sales/', views.pos_sales, name='sales'),
     path('complete-sale/', views.complete_sale, name='complete_sale'),
     path('bill/<int:sale_id>/', views.bill_view, name='bill_view'),
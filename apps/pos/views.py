@@ -4,28 +4,34 @@ from django.http import JsonResponse
 from django.db import transaction
 from django.views.decorators.http import require_http_methods
 from goods.models import ListModel
-from stock.models import StockListModel, StockMovement
+from stock import ledger
+from stock.models import StockListModel
 from .models import POSSale, POSSaleItem
+from . import catalogue
 from permissions.decorators import require_role
 import json
 
 @login_required
 @require_role('superadmin', 'admin', 'subadmin', 'staff')
 def pos_interface(request):
-    products = []
-    for product in ListModel.objects.filter(is_delete=False):
-        stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
-        if stock and stock.can_order_stock > 0:
-            products.append({
-                'id': product.id,
-                'name': product.goods_desc,
-                'code': product.goods_code,
-                'price': float(product.goods_price or 0),
-                'stock': int(stock.can_order_stock),
-                'category': product.goods_class or 'General'
-            })
-    
-    return render(request, 'pos/interface.html', {'products': json.dumps(products)})
+    snapshot = catalogue.get_snapshot()
+    return render(request, 'pos/interface.html', {
+        'products': json.dumps(snapshot['products']),
+        'catalogue_version': snapshot['version'],
+    })
+
+@login_required
+@require_role('superadmin', 'admin', 'subadmin', 'staff')
+def catalogue_api(request):
+    """Versioned till catalogue; pass ?since=<version> for a delta."""
+    store = request.GET.get('store') or None
+    since = request.GET.get('since')
+    if since:
+        try:
+            return JsonResponse(catalogue.get_delta(since, store))
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid version'}, status=400)
+    return JsonResponse(catalogue.get_snapshot(store))
 
 @login_required
 @require_role('superadmin', 'admin', 'subadmin', 'staff')
@@ -38,7 +44,11 @@ def complete_sale(request):
         
         if not items:
             return JsonResponse({'success': False, 'error': 'No items in sale'}, status=400)
+        warehouse = ledger.resolve_warehouse(data.get('warehouse'))
+        if warehouse is None and data.get('warehouse'):
+            return JsonResponse({'success': False, 'error': 'Warehouse not found'}, status=400)
         
+        stock_owner = {}
         with transaction.atomic():
             for item in items:
                 stock = StockListModel.objects.select_for_update().filter(goods_code=item['code']).first()
@@ -47,6 +57,7 @@ def complete_sale(request):
                         'success': False,
                         'error': f'Insufficient stock for {item["name"]}'
                     }, status=400)
+                stock_owner[item['code']] = stock.openid
             
             total_amount = sum(item['price'] * item['quantity'] for item in items)
             sale = POSSale.objects.create(
@@ -66,17 +77,8 @@ def complete_sale(request):
                     total_price=item['price'] * item['quantity']
                 )
                 
-                stock = StockListModel.objects.select_for_update().get(goods_code=item['code'])
-                stock.onhand_stock -= item['quantity']
-                stock.save()
-                
-                StockMovement.objects.create(
-                    goods_code=item['code'],
-                    movement_type='out',
-                    quantity=-item['quantity'],
-                    reason=f'POS Sale {sale.sale_number}',
-                    user=request.user
-                )
+                ledger.apply_delta(warehouse.pk if warehouse else None, item['code'], -item['quantity'], 'out',
+                                   f'POS Sale {sale.sale_number}', request.user, openid=stock_owner[item['code']])
             
             # Create invoice in billing system
             from billing.models import Invoice, InvoiceItem
@@ -112,6 +114,9 @@ def complete_sale(request):
                 'sale_id': sale.id,
                 'total': float(total_amount)
             })
+    except ledger.InsufficientStock as e:
+        # Raised inside the transaction, so the sale was rolled back.
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -130,12 +135,7 @@ def bill_view(request, sale_id):
 @login_required
 @require_role('superadmin', 'admin', 'subadmin', 'staff')
 def bill_pdf(request, sale_id):
-    from django.http import HttpResponse
-    
+    from billing import documents
+
     sale = POSSale.objects.prefetch_related('items__product').get(id=sale_id)
-    
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{sale.sale_number}.pdf"'
-    response.write(b'%PDF-1.4\n')
-    response.write(f'Bill #{sale.sale_number}\nTotal: Rs.{sale.total_amount}'.encode())
-    return response
+    return documents.serve(request, documents.pos_bill_document(sale))
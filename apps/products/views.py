@@ -5,17 +5,34 @@ from django.core.paginator import Paginator
 from django.db.models import Q, Sum, Count, Avg
 from django.views.decorators.http import require_http_methods
 from django.core.files.storage import default_storage
+from django.utils import timezone
 from goods.models import ListModel as Product
 from supplier.models import ListModel as Supplier
+from stock import ledger
 from stock.models import StockListModel, StockMovement
+from greaterwms.routers import replica_reads
 from permissions.decorators import require_permission, require_role
+from categories import registry as category_registry
+from greaterwms import counters
+from reviews import summary as rating_summary
 import json
 import csv
 import io
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill
+from greaterwms.lazy import lazy_module
 from datetime import datetime
 
+# Only the Excel import/export views need openpyxl; keep it off the startup path.
+openpyxl = lazy_module('openpyxl')
+styles = lazy_module('openpyxl.styles')
+
+def _stock_by_code(goods_codes):
+    """First stock row per goods code, fetched in one query."""
+    stock_by_code = {}
+    for stock in StockListModel.objects.filter(goods_code__in=set(goods_codes)).order_by('-id'):
+        # Same row .filter(goods_code=...).first() would pick under the default ordering.
+        stock_by_code.setdefault(stock.goods_code, stock)
+    return stock_by_code
+
 @require_role('superadmin', 'admin', 'subadmin', 'staff')
 def products_list(request):
     """Unified Products & Inventory page for team roles only"""
@@ -42,7 +59,10 @@ def products_list(request):
     can_export = user_permissions['products']['export']
     can_import = user_permissions['products']['import']
     
+    from warehouse.models import ListModel as Warehouse
+
     return render(request, 'products/unified_products_inventory.html', {
+        'warehouses': Warehouse.objects.filter(is_delete=False).order_by('warehouse_name'),
         'user_permissions': user_permissions,
         'user_role': user_role,
         'can_create': can_create,
@@ -65,9 +85,13 @@ def customer_marketplace(request):
         products = Product.objects.filter(is_delete=False).order_by('-create_time')[:100]
         
         # Attach stock information and images
+        stock_by_code = _stock_by_code(product.goods_code for product in products)
+        ratings = rating_summary.summaries([product.id for product in products])
         products_with_stock = []
         for product in products:
-            stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
+            stock = stock_by_code.get(product.goods_code)
+            product.rating = ratings[product.id]
+            product.category_info = category_registry.creator_info(product.goods_class)
             product.stock_qty = stock.goods_qty if stock else 0
             product.stock_available = stock.can_order_stock if stock else 0
             product.stock_image = None
@@ -186,9 +210,12 @@ def products_api(request):
         paginator = Paginator(products, page_size)
         page_obj = paginator.get_page(page)
         
+        stock_by_code = _stock_by_code(product.goods_code for product in page_obj)
+        ratings = rating_summary.summaries([product.id for product in page_obj])
+        
         results = []
         for product in page_obj:
-            stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
+            stock = stock_by_code.get(product.goods_code)
             stock_qty = int(stock.goods_qty) if stock else 0
             image_url = None
             try:
@@ -202,16 +229,7 @@ def products_api(request):
                 image_url = None
             
             # Get category created_by info
-            category_created_by = None
-            category_created_at = None
-            try:
-                from categories.models import Category
-                category_obj = Category.objects.filter(name=product.goods_class).first()
-                if category_obj and category_obj.created_by:
-                    category_created_by = category_obj.created_by.username
-                    category_created_at = category_obj.created_at.strftime('%b %d, %Y')
-            except:
-                pass
+            category_info = category_registry.creator_info(product.goods_class)
             
             results.append({
                 'id': product.id,
@@ -226,8 +244,10 @@ def products_api(request):
                 'status': 'Active' if not product.is_delete else 'Inactive',
                 'image': image_url or '/static/images/no-image.svg',
                 'is_multistock': True if getattr(product, 'goods_brand', '') == 'Multistock' else False,
-                'category_created_by': category_created_by,
-                'category_created_at': category_created_at
+                'category_created_by': category_info['created_by'],
+                'category_created_at': category_info['created_at'],
+                'rating': ratings[product.id]['average'],
+                'review_count': ratings[product.id]['review_count']
             })
         
         return JsonResponse({
@@ -252,6 +272,8 @@ def product_detail_page(request, product_id):
     """Product detail page"""
     product = get_object_or_404(Product, id=product_id, is_delete=False)
     stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
+    counters.increment(Product, product.id, 'view_count')
+    product.view_count += counters.pending(Product, product.id, 'view_count')
     
     return render(request, 'products/detail.html', {
         'product': product,
@@ -274,8 +296,8 @@ def update_product_field(request):
             elif field == 'stock':
                 stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
                 if stock:
-                    stock.goods_qty = value
-                    stock.save()
+                    ledger.set_onhand(ledger.warehouse_id(data.get('warehouse')), stock.goods_code, int(value),
+                                      'Stock edited', request.user, openid=stock.openid)
             product.save()
             return JsonResponse({'success': True})
         except:
@@ -304,14 +326,15 @@ def bulk_update_products(request):
                         product.goods_price = float(product.goods_price or 0) * (1 + adjustment/100)
                     product.save()
             elif action == 'update_category':
-                products.update(goods_class=value)
+                products.update(goods_class=value, update_time=timezone.now())
             elif action == 'update_stock':
                 adjustment = int(value)
+                warehouse = ledger.warehouse_id(data.get('warehouse'))
                 for product in products:
                     stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
                     if stock:
-                        stock.goods_qty = max(0, stock.goods_qty + adjustment)
-                        stock.save()
+                        ledger.set_onhand(warehouse, stock.goods_code, max(0, stock.onhand_stock + adjustment),
+                                          'Bulk stock update', request.user, openid=stock.openid)
             
             return JsonResponse({'success': True, 'updated': len(product_ids)})
         except Exception as e:
@@ -326,7 +349,7 @@ def bulk_delete_products(request):
             import json
             data = json.loads(request.body)
             product_ids = data.get('ids', [])
-            Product.objects.filter(id__in=product_ids).update(is_delete=True)
+            Product.objects.filter(id__in=product_ids).update(is_delete=True, update_time=timezone.now())
             return JsonResponse({'success': True, 'deleted': len(product_ids)})
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=400)
@@ -392,13 +415,11 @@ def create_product(request):
         
         # Create initial stock
         if 'stock' in data:
-            StockListModel.objects.create(
-                goods_code=product.goods_code,
-                goods_desc=product.goods_desc,
-                goods_qty=data['stock'],
-                onhand_stock=data['stock'],
-                can_order_stock=data['stock']
-            )
+            # Adds to any stock row the product already has.
+            _, openid = ledger.stock_row(product.goods_code, goods_desc=product.goods_desc)
+            if int(data['stock']) > 0:
+                ledger.apply_delta(ledger.warehouse_id(data.get('warehouse')), product.goods_code, int(data['stock']),
+                                   'in', 'Initial stock', request.user, openid=openid)
         
         return JsonResponse({
             'success': True,
@@ -483,18 +504,8 @@ def update_product(request, product_id):
         # Update stock and image
         stock = StockListModel.objects.filter(goods_code=product.goods_code).first()
         if not stock:
-            stock = StockListModel.objects.create(
-                goods_code=product.goods_code,
-                goods_desc=product.goods_desc,
-                goods_qty=0,
-                onhand_stock=0,
-                can_order_stock=0
-            )
-        
-        if 'stock' in data:
-            stock.goods_qty = int(data['stock'])
-            stock.onhand_stock = int(data['stock'])
-            stock.can_order_stock = int(data['stock'])
+            stock_id, _ = ledger.stock_row(product.goods_code, goods_desc=product.goods_desc)
+            stock = StockListModel.objects.get(pk=stock_id)
         
         # Handle image update
         import os
@@ -526,12 +537,16 @@ def update_product(request, product_id):
                     return JsonResponse({'success': False, 'error': f'Failed to download image: {str(e)}'}, status=400)
         
         stock.save()
+        if 'stock' in data:
+            ledger.set_onhand(ledger.warehouse_id(data.get('warehouse')), stock.goods_code, int(data['stock']),
+                              'Stock edited', request.user, openid=stock.openid)
         
         return JsonResponse({'success': True, 'message': 'Product updated'})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 @require_permission('products', 'export')  # Export products
+@replica_reads
 def export_products(request):
     try:
         format_type = request.GET.get('format', 'excel')
@@ -549,7 +564,7 @@ def export_products(request):
             products = products.filter(goods_class=category)
         
         if format_type == 'excel':
-            wb = Workbook()
+            wb = openpyxl.Workbook()
             ws = wb.active
             ws.title = 'Products'
             
@@ -559,8 +574,8 @@ def export_products(request):
             
             # Style headers
             for cell in ws[1]:
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color='0014A8', end_color='0014A8', fill_type='solid')
+                cell.font = styles.Font(bold=True)
+                cell.fill = styles.PatternFill(start_color='0014A8', end_color='0014A8', fill_type='solid')
             
             # Data
             for product in products:
@@ -664,7 +679,7 @@ def rename_category(request):
             return JsonResponse({'success': False, 'error': 'New category name already exists'}, status=400)
         
         # Update all products with the old category
-        updated = Product.objects.filter(is_delete=False, goods_class=old_name).update(goods_class=new_name)
+        updated = Product.objects.filter(is_delete=False, goods_class=old_name).update(goods_class=new_name, update_time=timezone.now())
         
         return JsonResponse({
             'success': True,
@@ -686,7 +701,7 @@ def delete_category(request):
             return JsonResponse({'success': False, 'error': 'Category name is required'}, status=400)
         
         # Update products to 'Uncategorized' instead of deleting
-        updated = Product.objects.filter(is_delete=False, goods_class=category_name).update(goods_class='Uncategorized')
+        updated = Product.objects.filter(is_delete=False, goods_class=category_name).update(goods_class='Uncategorized', update_time=timezone.now())
         
         return JsonResponse({
             'success': True,
@@ -709,7 +724,7 @@ def merge_categories(request):
             return JsonResponse({'success': False, 'error': 'Source and target categories are required'}, status=400)
         
         # Update all products from source categories to target
-        updated = Product.objects.filter(is_delete=False, goods_class__in=source_categories).update(goods_class=target_category)
+        updated = Product.objects.filter(is_delete=False, goods_class__in=source_categories).update(goods_class=target_category, update_time=timezone.now())
         
         return JsonResponse({
             'success': True,
@@ -719,6 +734,12 @@ def merge_categories(request):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
+def _import_stock(product, quantity, warehouse, user):
+    """Create or update the product's stock row; the new on-hand count goes through the ledger."""
+    stock_id, openid = ledger.stock_row(product.goods_code, goods_desc=product.goods_desc)
+    StockListModel.objects.filter(pk=stock_id).update(goods_desc=product.goods_desc, supplier=product.goods_supplier)
+    ledger.set_onhand(warehouse, product.goods_code, quantity, 'Product import', user, openid=openid)
+
 @login_required
 @require_permission('products', 'create')
 @require_http_methods(["POST"])
@@ -735,6 +756,7 @@ def bulk_import_products(request):
         
         imported = 0
         errors = []
+        warehouse = ledger.warehouse_id(request.POST.get('warehouse'))
         
         if file_ext == 'csv':
             # Handle CSV
@@ -758,16 +780,7 @@ def bulk_import_products(request):
                     
                     # Create or update stock
                     stock_qty = int(row.get('stock', row.get('quantity', 0)))
-                    StockListModel.objects.update_or_create(
-                        goods_code=product.goods_code,
-                        defaults={
-                            'goods_desc': product.goods_desc,
-                            'goods_qty': stock_qty,
-                            'can_order_stock': stock_qty,
-                            'onhand_stock': stock_qty,
-                            'supplier': product.goods_supplier
-                        }
-                    )
+                    _import_stock(product, stock_qty, warehouse, request.user)
                     
                     imported += 1
                 except Exception as e:
@@ -775,7 +788,7 @@ def bulk_import_products(request):
         
         elif file_ext in ['xlsx', 'xls']:
             # Handle Excel
-            wb = load_workbook(file)
+            wb = openpyxl.load_workbook(file)
             ws = wb.active
             
             headers = [cell.value for cell in ws[1]]
@@ -799,16 +812,7 @@ def bulk_import_products(request):
                     
                     # Create or update stock
                     stock_qty = int(row_data.get('stock', row_data.get('quantity', 0)) or 0)
-                    StockListModel.objects.update_or_create(
-                        goods_code=product.goods_code,
-                        defaults={
-                            'goods_desc': product.goods_desc,
-                            'goods_qty': stock_qty,
-                            'can_order_stock': stock_qty,
-                            'onhand_stock': stock_qty,
-                            'supplier': product.goods_supplier
-                        }
-                    )
+                    _import_stock(product, stock_qty, warehouse, request.user)
                     
                     imported += 1
                 except Exception as e:
@@ -849,7 +853,7 @@ def download_import_template(request):
     
     if format_type == 'excel':
         # Create Excel template
-        wb = Workbook()
+        wb = openpyxl.Workbook()
         ws = wb.active
         ws.title = "Product Import Template"
         
@@ -860,8 +864,8 @@ def download_import_template(request):
         ws.append(['PROD-001', 'Sample Product', '99.99', 'Electronics', 'Sample Supplier', '100', 'pcs'])
         
         # Style headers
-        header_fill = PatternFill(start_color="0014A8", end_color="0014A8", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True)
+        header_fill = styles.PatternFill(start_color="0014A8", end_color="0014A8", fill_type="solid")
+        header_font = styles.Font(color="FFFFFF", bold=True)
         
         for cell in ws[1]:
             cell.fill = header_fill
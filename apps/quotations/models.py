@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 import datetime
 
+from core.sequences import allocate
+
 
 def default_expiry():
     return timezone.now() + datetime.timedelta(days=30)
@@ -50,11 +52,12 @@ class Quotation(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.quotation_number:
-            stamp = timezone.now().strftime('%Y%m%d')
-            last = Quotation.objects.filter(
+            today = timezone.now().date()
+            stamp = today.strftime('%Y%m%d')
+            number = allocate('quotation', today, start=lambda: Quotation.objects.filter(
                 quotation_number__startswith=f'QT-{stamp}'
-            ).count() + 1
-            self.quotation_number = f'QT-{stamp}-{last:04d}'
+            ).count())
+            self.quotation_number = f'QT-{stamp}-{number:04d}'
         super().save(*args, **kwargs)
 
     def __str__(self):
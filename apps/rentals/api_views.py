@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta
+from availability.engine import Unavailable, reserve
 from .models import RentalItem, RentalBooking, RentalCategory
 import json
 
@@ -131,7 +132,7 @@ def create_booking(request):
         else:
             end_date = start_date + timedelta(days=duration_count*30)
         
-        booking = RentalBooking.objects.create(
+        booking = reserve('rental', item.id, start_date, end_date, lambda: RentalBooking.objects.create(
             item=item,
             customer=request.user,
             start_date=start_date,
@@ -139,7 +140,7 @@ def create_booking(request):
             delivery_option='pickup',
             total_amount=total,
             status='confirmed'
-        )
+        ))
         
         item.status = 'booked'
         item.save()
@@ -149,6 +150,8 @@ def create_booking(request):
             'booking_id': booking.id,
             'booking_number': f'RNT-{booking.id:05d}'
         })
+    except Unavailable as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=409)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
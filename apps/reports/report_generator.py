@@ -1,4 +1,4 @@
-from django.db import connection
+from greaterwms.routers import read_connection
 from datetime import datetime, timedelta
 import csv
 from io import StringIO
@@ -7,7 +7,7 @@ class ReportGenerator:
     
     @staticmethod
     def sales_report(start_date, end_date):
-        with connection.cursor() as cursor:
+        with read_connection().cursor() as cursor:
             cursor.execute('''
                 SELECT 
                     DATE(created_at) as date,
@@ -26,7 +26,7 @@ class ReportGenerator:
     
     @staticmethod
     def inventory_report():
-        with connection.cursor() as cursor:
+        with read_connection().cursor() as cursor:
             cursor.execute('''
                 SELECT 
                     goods_code,
@@ -43,7 +43,7 @@ class ReportGenerator:
     
     @staticmethod
     def customer_report():
-        with connection.cursor() as cursor:
+        with read_connection().cursor() as cursor:
             cursor.execute('''
                 SELECT 
                     c.customer_name,
@@ -75,7 +75,7 @@ class ReportGenerator:
     
     @staticmethod
     def low_stock_report(threshold=10):
-        with connection.cursor() as cursor:
+        with read_connection().cursor() as cursor:
             cursor.execute('''
                 SELECT goods_code, goods_qty
                 FROM stock_stocklistmodel
@@ -7,9 +7,11 @@ import json
 import csv
 from io import StringIO
 
+from greaterwms.routers import replica_reads
 from permissions.decorators import require_role
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def reports_dashboard(request):
     from django.apps import apps
     
@@ -56,6 +58,7 @@ def reports_dashboard(request):
     return render(request, 'reports/unified_reports.html', context)
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def generate_sales_report(request):
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
@@ -71,6 +74,7 @@ def generate_sales_report(request):
     return JsonResponse({'data': data})
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def generate_inventory_report(request):
     data = ReportGenerator.inventory_report()
     
@@ -83,6 +87,7 @@ def generate_inventory_report(request):
     return JsonResponse({'data': data})
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def generate_customer_report(request):
     data = ReportGenerator.customer_report()
     
@@ -95,6 +100,7 @@ def generate_customer_report(request):
     return JsonResponse({'data': data})
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def low_stock_report(request):
     threshold = int(request.GET.get('threshold', 10))
     data = ReportGenerator.low_stock_report(threshold)
@@ -120,6 +126,7 @@ def generate_report_api(request):
     return JsonResponse({'success': False, 'message': 'Invalid request'})
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def get_inventory_data(request):
     from django.apps import apps
     StockListModel = apps.get_model('stock', 'StockListModel')
@@ -137,6 +144,7 @@ def get_inventory_data(request):
     return JsonResponse({'data': data})
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def get_sales_data(request):
     data = {
         'monthly': [180, 210, 240, 220, 290, 310, 340, 320, 380, 350, 410],
@@ -150,6 +158,7 @@ def get_sales_data(request):
     return JsonResponse(data)
 
 @require_role('superadmin', 'admin', 'supervisor', 'staff')
+@replica_reads
 def export_report(request):
     from django.apps import apps
     
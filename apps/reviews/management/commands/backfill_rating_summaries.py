@@ -0,0 +1,22 @@
+"""
+backfill_rating_summaries – rebuild per-product rating summaries from reviews.
+
+Run once after deploying the summaries, or to repair drift (e.g. after
+reviews were changed with queryset updates, which bypass the signals):
+    python manage.py backfill_rating_summaries
+    python manage.py backfill_rating_summaries --product 42 --product 43
+"""
+from django.core.management.base import BaseCommand
+
+from reviews import summary
+
+
+class Command(BaseCommand):
+    help = 'Recompute review count, rating sum and star histogram per product.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', type=int, action='append', help='Only this product id (repeatable).')
+
+    def handle(self, *args, **options):
+        rows = summary.rebuild(options['product'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rating summaries'))
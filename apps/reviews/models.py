@@ -16,3 +16,25 @@ class Review(models.Model):
         unique_together = ('product', 'user')
     def __str__(self):
         return f"{self.user.username} → {self.product} ({self.rating}★)"
+
+class RatingSummary(models.Model):
+    """Per-product review totals, kept in step with ``Review`` by ``reviews.summary``."""
+    product = models.OneToOneField('goods.ListModel', on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        db_table = 'reviews_rating_summary'
+    def __str__(self):
+        return f"{self.product_id}: {self.average}★ ({self.review_count})"
+    @property
+    def average(self):
+        return round(self.rating_sum / self.review_count, 1) if self.review_count else 0
+    @property
+    def histogram(self):
+        return {star: getattr(self, f'stars_{star}') for star in range(1, 6)}
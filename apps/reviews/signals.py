@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import summary
+from .models import Review
+
+
+@receiver(post_init, sender=Review)
+def remember_rating(sender, instance, **kwargs):
+    # The rating as stored, so a later save knows which histogram bucket to move.
+    instance._stored_rating = instance.rating if instance.pk else None
+
+
+@receiver(post_save, sender=Review)
+def update_rating_summary(sender, instance, created, **kwargs):
+    old_rating = None if created else instance._stored_rating
+    if old_rating != instance.rating:
+        summary.apply(instance.product_id, old_rating, instance.rating)
+    instance._stored_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def remove_from_rating_summary(sender, instance, **kwargs):
+    summary.apply(instance.product_id, instance._stored_rating, None)
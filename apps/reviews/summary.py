@@ -0,0 +1,94 @@
+"""
+Denormalized rating summaries.
+
+Each product's review count, rating sum and 1-5 star histogram live in one
+``RatingSummary`` row. ``apply`` moves a review from one rating to another
+(``None`` on either side for create/delete) with a single conditional
+``UPDATE ... SET col = col + d``, so concurrent reviews never overwrite each
+other. Pages read any number of products with ``summaries`` in one query
+instead of aggregating ``Review`` per product; ``rebuild`` recomputes the
+rows from the reviews (the ``backfill_rating_summaries`` command).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import RatingSummary, Review
+
+EMPTY = {'review_count': 0, 'average': 0, 'histogram': {star: 0 for star in range(1, 6)}}
+
+
+def _deltas(old_rating, new_rating):
+    deltas = {}
+    if old_rating:
+        deltas.update(review_count=-1, rating_sum=-old_rating, **{f'stars_{old_rating}': -1})
+    if new_rating:
+        deltas['review_count'] = deltas.get('review_count', 0) + 1
+        deltas['rating_sum'] = deltas.get('rating_sum', 0) + new_rating
+        deltas[f'stars_{new_rating}'] = deltas.get(f'stars_{new_rating}', 0) + 1
+    return {field: delta for field, delta in deltas.items() if delta}
+
+
+def apply(product_id, old_rating, new_rating):
+    """Move one review of ``product_id`` from ``old_rating`` to ``new_rating``."""
+    deltas = _deltas(old_rating, new_rating)
+    if not deltas:
+        return
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    if RatingSummary.objects.filter(product_id=product_id).update(**changes, updated_at=timezone.now()):
+        return
+    if old_rating:
+        # No row yet for a product whose reviews predate the summaries; rebuild it from the reviews.
+        rebuild([product_id])
+        return
+    try:
+        with transaction.atomic():
+            RatingSummary.objects.create(product_id=product_id, **deltas)
+    except IntegrityError:
+        RatingSummary.objects.filter(product_id=product_id).update(**changes, updated_at=timezone.now())
+
+
+def _as_dict(summary):
+    return {'review_count': summary.review_count, 'average': summary.average, 'histogram': summary.histogram}
+
+
+def summaries(product_ids):
+    """``{product_id: {'review_count', 'average', 'histogram'}}`` for the products, in one query."""
+    found = {summary.product_id: _as_dict(summary)
+             for summary in RatingSummary.objects.filter(product_id__in=set(product_ids))}
+    return {product_id: found.get(product_id, EMPTY) for product_id in product_ids}
+
+
+def summary(product_id):
+    return summaries([product_id])[product_id]
+
+
+def rebuild(product_ids=None):
+    """
+    Recompute summaries from ``Review`` with one grouped query and one bulk upsert.
+
+    Limited to ``product_ids`` when given; products left without reviews lose
+    their row. Returns the number of summaries written.
+    """
+    reviews = Review.objects.all()
+    stale = RatingSummary.objects.all()
+    if product_ids is not None:
+        reviews = reviews.filter(product_id__in=product_ids)
+        stale = stale.filter(product_id__in=product_ids)
+    rows = {}
+    for row in reviews.values('product_id', 'rating').annotate(total=Count('id')).order_by():
+        summary = rows.setdefault(row['product_id'], RatingSummary(product_id=row['product_id']))
+        summary.review_count += row['total']
+        summary.rating_sum += row['rating'] * row['total']
+        field = f"stars_{row['rating']}"
+        setattr(summary, field, getattr(summary, field) + row['total'])
+    now = timezone.now()
+    for summary in rows.values():
+        summary.updated_at = now
+    with transaction.atomic():
+        stale.exclude(product_id__in=list(rows)).delete()
+        RatingSummary.objects.bulk_create(
+            rows.values(), batch_size=1000, update_conflicts=True, unique_fields=['product'],
+            update_fields=['review_count', 'rating_sum', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5', 'updated_at'],
+        )
+    return len(rows)
@@ -4,6 +4,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from goods.models import ListModel as Product
 from .models import Review
+from . import summary
 import json
 
 @login_required
@@ -28,9 +29,8 @@ def submit_review(request, product_id):
 def product_reviews(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     reviews = Review.objects.filter(product=product).select_related('user')
-    from django.db.models import Avg
-    avg = reviews.aggregate(avg=Avg('rating'))['avg']
-    return render(request, 'reviews/list.html', {'product': product, 'reviews': reviews, 'average_rating': round(avg or 0, 1)})
+    rating = summary.summary(product.id)
+    return render(request, 'reviews/list.html', {'product': product, 'reviews': reviews, 'rating': rating, 'average_rating': rating['average']})
 
 @login_required
 @require_http_methods(["POST"])
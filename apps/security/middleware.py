@@ -1,23 +1,25 @@
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-import time
-from collections import defaultdict
 
-class RateLimitMiddleware(MiddlewareMixin):
+from . import ratelimit
+
+
+class RateLimitMiddleware:
+    """
+    Enforce ``settings.RATE_LIMITS`` through the shared limiter in
+    ``security.ratelimit`` and add ``RateLimit-*`` headers to limited routes.
+    Place it after AuthenticationMiddleware so per-user policies see the user.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
-        self.requests = defaultdict(list)
-        
-    def process_request(self, request):
-        if request.path.startswith('/api/'):
-            ip = request.META.get('REMOTE_ADDR')
-            now = time.time()
-            self.requests[ip] = [req_time for req_time in self.requests[ip] if now - req_time < 3600]
-            
-            if len(self.requests[ip]) >= 1000:
-                return JsonResponse({'error': 'Rate limit exceeded'}, status=429)
-            
-            self.requests[ip].append(now)
+
+    def __call__(self, request):
+        decisions = ratelimit.check(request)
+        if any(not decision.allowed for decision in decisions):
+            response = JsonResponse({'error': 'Rate limit exceeded'}, status=429)
+        else:
+            response = self.get_response(request)
+        return ratelimit.apply_headers(response, decisions)
 
 class SecurityHeadersMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
@@ -0,0 +1,166 @@
+"""
+Shared rate limiting.
+
+Limits are sliding-window counters kept in the shared cache (Redis, or the
+file cache on a single host), so every worker and process enforces one
+limit per client instead of one each. A key holds two integers, the counts
+of the current and the previous fixed window; the previous one is weighted
+by how much of it still overlaps the sliding window. A check is one
+``get_many`` plus one ``incr`` (and a ``touch`` on backends without a
+native increment, whose ``incr`` would reset the expiry), and memory per
+key is constant: the counters expire after two windows.
+
+Policies come from ``settings.RATE_LIMITS``, in order::
+
+    {'name': 'login', 'path': '/auth/', 'methods': ['POST'], 'rate': '20/minute', 'key': 'ip'}
+
+``path`` is a prefix, ``methods`` is optional, ``rate`` is ``N/unit``
+(second, minute, hour or day) and ``key`` is ``ip``, ``user`` (the user id,
+falling back to the IP for anonymous requests) or ``global``. Every policy
+that matches a request counts it; the request is refused if any of them is
+exhausted. If the cache is unavailable, requests are let through.
+"""
+import logging
+import math
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.signals import setting_changed
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+KEYS = ('ip', 'user', 'global')
+
+Decision = namedtuple('Decision', 'policy allowed limit remaining reset')
+
+
+class Policy:
+    __slots__ = ('name', 'path', 'methods', 'limit', 'period', 'key')
+
+    def __init__(self, name, rate, path='/', methods=None, key='ip'):
+        if key not in KEYS:
+            raise ValueError(f'Rate limit {name!r}: key must be one of {", ".join(KEYS)}')
+        self.name = name
+        self.path = path
+        self.methods = frozenset(method.upper() for method in methods) if methods else None
+        self.limit, self.period = parse_rate(rate)
+        self.key = key
+
+    def matches(self, request):
+        return request.path.startswith(self.path) and (self.methods is None or request.method in self.methods)
+
+    def identity(self, request):
+        if self.key == 'global':
+            return '-'
+        if self.key == 'user':
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                return f'u{user.pk}'
+        return client_ip(request)
+
+
+def parse_rate(rate):
+    """``'100/minute'`` -> ``(100, 60)``; units may be abbreviated (``s``, ``m``, ``h``, ``d``)."""
+    count, _, unit = rate.partition('/')
+    unit = unit.strip().lower()
+    period = next((seconds for name, seconds in PERIODS.items() if unit and name.startswith(unit[0])), None)
+    if period is None or not count.strip().isdigit():
+        raise ValueError(f'Invalid rate {rate!r}; expected e.g. "100/minute"')
+    return int(count), period
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the address ``RATE_LIMIT_PROXY_COUNT`` trusted proxies put in X-Forwarded-For."""
+    proxies = getattr(settings, 'RATE_LIMIT_PROXY_COUNT', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+_policies = None
+
+
+def policies():
+    global _policies
+    if _policies is None:
+        _policies = [Policy(**spec) for spec in getattr(settings, 'RATE_LIMITS', [])]
+    return _policies
+
+
+def _reset_policies(setting, **kwargs):
+    global _policies
+    if setting in ('RATE_LIMITS', 'RATE_LIMIT_PROXY_COUNT'):
+        _policies = None
+
+
+setting_changed.connect(_reset_policies, dispatch_uid='security_ratelimit_settings')
+
+
+def hit(policy, identity, now=None, cache=None):
+    """Count one request for ``identity`` under ``policy`` unless it is already over the limit."""
+    cache = cache or caches['shared']
+    now = time.time() if now is None else now
+    window, offset = divmod(now, policy.period)
+    window = int(window)
+    current = f'ratelimit:{policy.name}:{identity}:{window}'
+    previous = f'ratelimit:{policy.name}:{identity}:{window - 1}'
+    counts = cache.get_many([current, previous])
+    weight = 1 - offset / policy.period
+    used = counts.get(previous, 0) * weight + counts.get(current, 0)
+    reset = math.ceil(policy.period - offset)
+    if used >= policy.limit:
+        # Seconds until enough of the previous window has slid out to admit one more request.
+        if counts.get(previous):
+            wait = (used - policy.limit + 1) / counts[previous] * policy.period
+            reset = max(1, min(reset, math.ceil(wait)))
+        return Decision(policy, False, policy.limit, 0, reset)
+    if cache.add(current, 1, timeout=policy.period * 2):
+        count = 1
+    else:
+        try:
+            count = cache.incr(current)
+        except ValueError:
+            # Expired between add() and incr().
+            cache.add(current, 1, timeout=policy.period * 2)
+            count = 1
+        else:
+            if type(cache).incr is BaseCache.incr:
+                # The generic incr() re-sets the key with the default timeout; restore the window's.
+                cache.touch(current, timeout=policy.period * 2)
+    used += count - counts.get(current, 0)
+    return Decision(policy, True, policy.limit, max(0, math.floor(policy.limit - used)), reset)
+
+
+def check(request):
+    """Decisions for every policy matching ``request``; empty if none applies or the cache fails."""
+    matching = [policy for policy in policies() if policy.matches(request)]
+    if not matching:
+        return []
+    try:
+        return [hit(policy, policy.identity(request)) for policy in matching]
+    except Exception:
+        logger.warning('Rate limit cache unavailable; request allowed', exc_info=True)
+        return []
+
+
+def apply_headers(response, decisions):
+    """Standard ``RateLimit-*`` headers for the most constrained of ``decisions``."""
+    if not decisions:
+        return response
+    tightest = min(decisions, key=lambda decision: (decision.remaining, -decision.reset))
+    response['RateLimit-Limit'] = str(tightest.limit)
+    response['RateLimit-Remaining'] = str(tightest.remaining)
+    response['RateLimit-Reset'] = str(tightest.reset)
+    response['RateLimit-Policy'] = ', '.join(
+        f'{decision.limit};w={decision.policy.period}' for decision in decisions
+    )
+    if not tightest.allowed:
+        response['Retry-After'] = str(tightest.reset)
+    return response
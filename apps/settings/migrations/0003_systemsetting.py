@@ -0,0 +1,27 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settings', '0002_announcement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemSetting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('value', models.TextField(blank=True, default='')),
+                ('category', models.CharField(db_index=True, default='general', max_length=50)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'settings_systemsetting',
+                'ordering': ['category', 'key'],
+            },
+        ),
+    ]
@@ -47,3 +47,18 @@ class Announcement(models.Model):
     
     def __str__(self):
         return self.title
+
+class SystemSetting(models.Model):
+    """Free-form key/value settings grouped by category (theme, general, ...)."""
+    key = models.CharField(max_length=100, unique=True)
+    value = models.TextField(blank=True, default='')
+    category = models.CharField(max_length=50, default='general', db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'settings'
+        db_table = 'settings_systemsetting'
+        ordering = ['category', 'key']
+
+    def __str__(self):
+        return f"{self.category}.{self.key}"
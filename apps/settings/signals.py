@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import store
+from .models import MaintenanceMode, SystemSetting, SystemSettings
+
+
+@receiver(post_save, sender=SystemSetting)
+@receiver(post_delete, sender=SystemSetting)
+@receiver(post_save, sender=SystemSettings)
+@receiver(post_delete, sender=SystemSettings)
+@receiver(post_save, sender=MaintenanceMode)
+@receiver(post_delete, sender=MaintenanceMode)
+def invalidate_settings_snapshot(sender, **kwargs):
+    """Any settings write makes every worker reload its snapshot."""
+    store.invalidate()
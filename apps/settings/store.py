@@ -0,0 +1,101 @@
+"""
+Cached access to system settings.
+
+Every settings category (``SystemSetting`` key/value rows, the
+``SystemSettings`` singleton and ``MaintenanceMode``) is loaded into one
+process-local snapshot tagged with a version number. The current version
+lives in the shared cache; each request checks it at most once (code
+outside requests every few seconds), and the snapshot is
+only reloaded when another worker has bumped it. In steady state a
+settings read costs no database query.
+
+Writes go through ``set_many`` (a single bulk upsert) or the models'
+``save()``; both bump the shared version once the transaction commits.
+"""
+import threading
+
+from django.utils import timezone
+
+from greaterwms.versioning import SharedVersion
+
+VERSION = SharedVersion('settings:version')
+
+_lock = threading.Lock()
+_snapshot = {'version': None, 'data': None}
+
+
+def current_version():
+    """Shared version, read at most once per request."""
+    return VERSION.get()
+
+
+def _load():
+    from .models import MaintenanceMode, SystemSetting, SystemSettings
+
+    categories = {}
+    values = {}
+    for key, value, category in SystemSetting.objects.values_list('key', 'value', 'category'):
+        categories.setdefault(category, {})[key] = value
+        values[key] = {'value': value, 'category': category}
+    system = SystemSettings.objects.filter(id=1).values('company_name', 'currency', 'timezone').first()
+    maintenance = MaintenanceMode.objects.filter(id=1).values('is_active', 'message', 'allowed_roles').first()
+    return {
+        'values': values,
+        'categories': categories,
+        'system': system or {'company_name': 'MultiStock Logistics', 'currency': 'INR', 'timezone': 'Asia/Kolkata'},
+        'maintenance': maintenance or {'is_active': False, 'message': '', 'allowed_roles': []},
+    }
+
+
+def snapshot():
+    """The full settings snapshot; reloaded only when the version moved."""
+    version = current_version()
+    data = _snapshot['data']
+    if data is not None and _snapshot['version'] == version:
+        return data
+    with _lock:
+        if _snapshot['data'] is None or _snapshot['version'] != version:
+            _snapshot['data'] = _load()
+            _snapshot['version'] = version
+        return _snapshot['data']
+
+
+def get_category(category):
+    return dict(snapshot()['categories'].get(category, {}))
+
+
+def all_values():
+    return snapshot()['values']
+
+
+def system():
+    return snapshot()['system']
+
+
+def maintenance():
+    return snapshot()['maintenance']
+
+
+def invalidate():
+    """Bump the shared version after the current transaction commits."""
+    VERSION.invalidate()
+
+
+def set_many(values, category='general'):
+    """Insert or update ``{key: value}`` in ``category`` with one bulk upsert."""
+    from .models import SystemSetting
+
+    now = timezone.now()
+    rows = [SystemSetting(key=key, value='' if value is None else str(value), category=category, updated_at=now)
+            for key, value in values.items()]
+    SystemSetting.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['key'], update_fields=['value', 'category', 'updated_at'],
+    )
+    invalidate()
+
+
+def delete_category(category):
+    from .models import SystemSetting
+
+    SystemSetting.objects.filter(category=category).delete()
+    invalidate()
@@ -1,4 +1,4 @@
-from django.db import connection
+from . import store
 
 class ThemeManager:
     DEFAULT_THEME = {
@@ -17,33 +17,19 @@ class ThemeManager:
     @staticmethod
     def get_theme(user_id=None):
         if user_id:
-            with connection.cursor() as cursor:
-                cursor.execute('''
-                    SELECT key, value FROM settings_systemsetting
-                    WHERE category = 'theme' AND key LIKE 'theme_%'
-                ''')
-                theme = {row[0].replace('theme_', ''): row[1] for row in cursor.fetchall()}
-                
-                if theme:
-                    return {**ThemeManager.DEFAULT_THEME, **theme}
+            theme = {key.replace('theme_', '', 1): value
+                     for key, value in store.get_category('theme').items() if key.startswith('theme_')}
+            if theme:
+                return {**ThemeManager.DEFAULT_THEME, **theme}
         
         return ThemeManager.DEFAULT_THEME
     
     @staticmethod
     def save_theme(theme_data):
-        with connection.cursor() as cursor:
-            for key, value in theme_data.items():
-                cursor.execute('''
-                    INSERT OR REPLACE INTO settings_systemsetting
-                    (key, value, category, updated_at)
-                    VALUES (?, ?, 'theme', datetime('now'))
-                ''', [f'theme_{key}', value])
-        
+        store.set_many({f'theme_{key}': value for key, value in theme_data.items()}, category='theme')
         return {'status': 'success', 'message': 'Theme saved'}
     
     @staticmethod
     def reset_theme():
-        with connection.cursor() as cursor:
-            cursor.execute("DELETE FROM settings_systemsetting WHERE category = 'theme'")
-        
+        store.delete_category('theme')
         return {'status': 'success', 'message': 'Theme reset to default'}
@@ -8,20 +8,14 @@ from django.utils.dateparse import parse_datetime
 from datetime import datetime
 from django.db import models
 from .models import SystemSettings, MaintenanceMode, Announcement
+from . import store
 from permissions.decorators import get_user_role
 
 @login_required
 def settings_page(request):
     user_role = get_user_role(request.user)
-    maintenance_mode, _ = MaintenanceMode.objects.get_or_create(id=1)
-    system_settings, _ = SystemSettings.objects.get_or_create(
-        id=1,
-        defaults={
-            'company_name': 'MultiStock Logistics',
-            'currency': 'INR',
-            'timezone': 'Asia/Kolkata',
-        }
-    )
+    maintenance_mode = store.maintenance()
+    system_settings = store.system()
     # Lightweight per-user preferences stored in session
     user_prefs = {
         'language': request.session.get('settings_language', 'en'),
@@ -120,12 +114,12 @@ def save_setting(request):
 
     form_type = request.POST.get('form_type')
     user_role = get_user_role(request.user)
-    settings_obj, _ = SystemSettings.objects.get_or_create(id=1)
 
     if form_type == 'system':
         if user_role not in ['superadmin', 'admin']:
             messages.error(request, 'Permission denied')
             return redirect('settings_page')
+        settings_obj, _ = SystemSettings.objects.get_or_create(id=1)
         settings_obj.company_name = request.POST.get('company_name', settings_obj.company_name)
         settings_obj.currency = request.POST.get('currency', settings_obj.currency)
         settings_obj.timezone = request.POST.get('timezone', settings_obj.timezone)
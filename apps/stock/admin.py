@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import StockListModel, StockMovement, StockAlert
+from .models import StockListModel, StockMovement, StockAlert, WarehouseStock
 
 @admin.register(StockListModel)
 class StockAdmin(admin.ModelAdmin):
@@ -10,12 +10,19 @@ class StockAdmin(admin.ModelAdmin):
 
 @admin.register(StockMovement)
 class StockMovementAdmin(admin.ModelAdmin):
-    list_display = ['goods_code', 'movement_type', 'quantity', 'reason', 'user', 'created_at']
-    list_filter = ['movement_type', 'created_at']
+    list_display = ['goods_code', 'movement_type', 'quantity', 'warehouse', 'reason', 'user', 'created_at']
+    list_filter = ['movement_type', 'warehouse', 'created_at']
     search_fields = ['goods_code', 'reason']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
 
+@admin.register(WarehouseStock)
+class WarehouseStockAdmin(admin.ModelAdmin):
+    list_display = ['goods_code', 'openid', 'warehouse', 'onhand_stock', 'update_time']
+    list_filter = ['warehouse']
+    search_fields = ['goods_code']
+    readonly_fields = ['onhand_stock', 'update_time']
+
 @admin.register(StockAlert)
 class StockAlertAdmin(admin.ModelAdmin):
     list_display = ['goods_code', 'alert_level', 'message', 'is_resolved', 'created_at']
@@ -0,0 +1,168 @@
+"""
+Point-in-time stock balances from daily snapshots.
+
+``take_snapshots`` records each product's on-hand balance at the end of a
+day by walking back from the current balance through the movements since
+then. ``balance_at`` answers "what was on hand at T" from the nearest
+snapshot plus the movements between it and T, so the work is bounded by
+about a day of movements however long the ledger grows, provided
+``snapshot_stock`` runs daily.
+
+``compact`` folds old ``StockMovement`` rows into ``StockMovementArchive``
+daily totals. Balances inside a compacted day resolve to the end of the
+previous day.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import StockListModel, StockMovement, StockMovementArchive, StockSnapshot
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def end_of_day(day):
+    return start_of_day(day + timedelta(days=1))
+
+
+def current_balances(goods_code=None):
+    rows = StockListModel.objects.values('goods_code').annotate(total=Sum('onhand_stock'))
+    if goods_code:
+        rows = rows.filter(goods_code=goods_code)
+    return {row['goods_code']: row['total'] or 0 for row in rows}
+
+
+def take_snapshots(days):
+    """
+    Snapshot balances at the end of each date in ``days``.
+
+    Reads the current balances and the per-day movement totals since the
+    earliest requested day once, then walks backwards. A product gets a row
+    on a day it moved, and on the earliest day if it has no older snapshot;
+    on other days its latest snapshot is still its balance, so the ledger
+    stays small while ``balance_at`` never has more than one day of
+    movements to apply. Existing snapshots for those dates are replaced.
+    Returns the number of rows written.
+    """
+    days = sorted(set(days), reverse=True)
+    if not days:
+        return 0
+    balances = current_balances()
+    daily = {}
+    movements = (
+        StockMovement.objects.filter(created_at__gte=end_of_day(days[-1]))
+        .annotate(day=TruncDate('created_at'))
+        .values('goods_code', 'day').annotate(total=Sum('quantity'))
+    )
+    archived = (
+        StockMovementArchive.objects.filter(day__gt=days[-1])
+        .values('goods_code', 'day').annotate(total=Sum('quantity'))
+    )
+    for row in list(movements) + list(archived):
+        totals = daily.setdefault(row['day'], {})
+        totals[row['goods_code']] = totals.get(row['goods_code'], 0) + row['total']
+
+    known = set(StockSnapshot.objects.filter(snapshot_date__lt=days[-1])
+                .values_list('goods_code', flat=True).distinct())
+    snapshots = []
+    walked = timezone.localdate()
+    for day in days:
+        # Undo every day after ``day`` that has not been undone yet.
+        while walked > day:
+            for goods_code, total in daily.get(walked, {}).items():
+                balances[goods_code] = balances.get(goods_code, 0) - total
+            walked -= timedelta(days=1)
+        moved = daily.get(day, {})
+        snapshots.extend(
+            StockSnapshot(goods_code=goods_code, snapshot_date=day, balance=balance)
+            for goods_code, balance in balances.items()
+            if goods_code in moved or (day == days[-1] and goods_code not in known)
+        )
+    with transaction.atomic():
+        StockSnapshot.objects.filter(snapshot_date__in=days).delete()
+        StockSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
+
+
+def _movements_between(goods_code, start, end):
+    """Net quantity and row count of movements in [start, end), archived days included."""
+    live = StockMovement.objects.filter(goods_code=goods_code, created_at__gte=start, created_at__lt=end) \
+        .aggregate(total=Sum('quantity'), rows=Count('id'))
+    first_day = timezone.localdate(start)
+    last_day = timezone.localdate(end) - timedelta(days=1)
+    archived = StockMovementArchive.objects.filter(
+        goods_code=goods_code,
+        day__gte=first_day if start_of_day(first_day) == start else first_day + timedelta(days=1),
+        day__lte=last_day,
+    ).aggregate(total=Sum('quantity'), rows=Sum('movement_count'))
+    return (live['total'] or 0) + (archived['total'] or 0), live['rows'] + (archived['rows'] or 0)
+
+
+def balance_at(goods_code, at):
+    """On-hand balance of ``goods_code`` at the aware datetime ``at``."""
+    day = timezone.localdate(at)
+    before = StockSnapshot.objects.filter(goods_code=goods_code, snapshot_date__lt=day) \
+        .order_by('-snapshot_date').first()
+    if before:
+        delta, rows = _movements_between(goods_code, end_of_day(before.snapshot_date), at)
+        source, snapshot_date, balance = 'snapshot', before.snapshot_date, before.balance + delta
+    else:
+        after = StockSnapshot.objects.filter(goods_code=goods_code, snapshot_date__gte=day) \
+            .order_by('snapshot_date').first()
+        if after:
+            delta, rows = _movements_between(goods_code, at, end_of_day(after.snapshot_date))
+            source, snapshot_date, balance = 'snapshot', after.snapshot_date, after.balance - delta
+        else:
+            delta, rows = _movements_between(goods_code, at, timezone.now())
+            source, snapshot_date = 'current', None
+            balance = current_balances(goods_code).get(goods_code, 0) - delta
+    compacted = StockMovementArchive.objects.filter(goods_code=goods_code, day=day).exists()
+    return {
+        'goods_code': goods_code,
+        'at': at.isoformat(),
+        'balance': balance,
+        'source': source,
+        'snapshot_date': snapshot_date.isoformat() if snapshot_date else None,
+        'movements_applied': rows,
+        'exact': not compacted,
+    }
+
+
+def compact(before_day, batch_days=31):
+    """
+    Fold movements dated before ``before_day`` into daily archive totals.
+
+    Works through the history ``batch_days`` at a time, each batch in its
+    own transaction. Returns ``(movements_removed, archive_rows_written)``.
+    """
+    removed = written = 0
+    cutoff = start_of_day(before_day)
+    while True:
+        oldest = StockMovement.objects.filter(created_at__lt=cutoff).order_by('created_at') \
+            .values_list('created_at', flat=True).first()
+        if oldest is None:
+            return removed, written
+        batch_end = min(cutoff, start_of_day(timezone.localdate(oldest) + timedelta(days=batch_days)))
+        window = StockMovement.objects.filter(created_at__lt=batch_end)
+        with transaction.atomic():
+            totals = (
+                window.annotate(day=TruncDate('created_at'))
+                .values('goods_code', 'day', 'movement_type', 'warehouse_id')
+                .annotate(total=Sum('quantity'), rows=Count('id'))
+            )
+            archive = [
+                StockMovementArchive(
+                    goods_code=row['goods_code'], day=row['day'], movement_type=row['movement_type'],
+                    warehouse_id=row['warehouse_id'], quantity=row['total'], movement_count=row['rows'],
+                )
+                for row in totals
+            ]
+            StockMovementArchive.objects.bulk_create(archive, batch_size=1000)
+            count, _ = window.delete()
+        removed += count
+        written += len(archive)
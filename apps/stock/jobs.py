@@ -0,0 +1,13 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.scheduler import job
+
+from . import history
+
+
+@job('snapshot_stock', interval=timedelta(days=1))
+def snapshot_stock():
+    """Yesterday's end-of-day balances, as ``manage.py snapshot_stock`` takes them."""
+    return history.take_snapshots([timezone.localdate() - timedelta(days=1)])
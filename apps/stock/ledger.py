@@ -0,0 +1,316 @@
+"""
+Location-level stock ledger.
+
+Quantities live in ``WarehouseStock`` rows keyed by (warehouse, goods_code,
+openid): like the global ``StockListModel`` rows, balances belong to one
+store, so one store's issue never draws on units another store received
+into the same warehouse.
+Every change goes through ``apply_delta`` or ``transfer``, which in one
+transaction
+
+* move the warehouse balance with a conditional ``UPDATE ... SET qty = qty + d``
+  (no read-modify-write, never below zero),
+* keep the warehouse's ``WarehouseStockTotal`` and the global
+  ``StockListModel`` row for the product in step, and
+* record the ``StockMovement`` rows with their warehouse.
+
+Each warehouse total is spread over ``TOTAL_SLOTS`` rows picked by goods
+code, so changes to different products rarely wait on the same totals row;
+roll-ups sum the slots instead of every balance. The product's global row
+is still a single row, because orders and tills check availability against
+it: receipts and issues of the same product for the same store serialise on
+it whichever warehouse they happen at. A transfer nets to zero globally and
+leaves that row alone, so it only touches the two warehouse balances and
+their totals.
+
+Receipts and issues name their warehouse (``resolve_warehouse`` picks the
+default one when the caller has none). Stock that predates warehouse
+tracking stays unallocated until an issue needs it: the shortfall is then
+assigned to the issuing warehouse first. Without any warehouse at all,
+changes only move unallocated stock. ``stock_changed`` is sent after
+commit for every global row a change touched, since the row is written
+with ``UPDATE`` and fires no ``post_save``.
+"""
+import zlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import StockListModel, StockMovement, WarehouseStock, WarehouseStockTotal
+
+DEFAULT_WAREHOUSE = 'Main'
+
+# Rows each warehouse total is split over; see ``_total_slot``.
+TOTAL_SLOTS = 16
+
+# Sent with ``goods_code`` and ``openid`` once a ledger change has committed.
+stock_changed = Signal()
+
+
+class InsufficientStock(Exception):
+    """The warehouse does not hold enough of the product for the change."""
+
+
+def resolve_warehouse(value=None):
+    """
+    Warehouse by id, or by name for callers that still send names. Without a
+    value: the warehouse named like ``DEFAULT_WAREHOUSE``, else the oldest;
+    ``None`` when there is none (or nothing matches ``value``).
+    """
+    from warehouse.models import ListModel as Warehouse
+
+    warehouses = Warehouse.objects.filter(is_delete=False)
+    value = str(value or '').strip()
+    if not value:
+        return warehouses.filter(warehouse_name__istartswith=DEFAULT_WAREHOUSE).order_by('id').first() or \
+            warehouses.order_by('id').first()
+    if value.isdigit():
+        return warehouses.filter(pk=int(value)).first()
+    return warehouses.filter(warehouse_name__iexact=value).first() or \
+        warehouses.filter(warehouse_name__istartswith=value).order_by('id').first()
+
+
+def warehouse_id(value=None):
+    """Primary key of ``resolve_warehouse(value)``; ``None`` means unallocated stock."""
+    warehouse = resolve_warehouse(value)
+    return warehouse.pk if warehouse else None
+
+
+def _upsert_add(model, lookup, field, delta):
+    """``field += delta`` on the row matching ``lookup``, creating it if missing."""
+    now = timezone.now()
+    if model.objects.filter(**lookup).update(**{field: F(field) + delta, 'update_time': now}):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: delta})
+    except IntegrityError:
+        # Another request created the row first; add to it instead.
+        model.objects.filter(**lookup).update(**{field: F(field) + delta, 'update_time': now})
+
+
+def _total_slot(goods_code):
+    """The warehouse totals row a product's deltas go to, the same in every process."""
+    return zlib.crc32(goods_code.encode()) % TOTAL_SLOTS
+
+
+def _move_balance(warehouse_id, goods_code, openid, delta):
+    if delta < 0:
+        moved = WarehouseStock.objects.filter(
+            warehouse_id=warehouse_id, goods_code=goods_code, openid=openid, onhand_stock__gte=-delta,
+        ).update(onhand_stock=F('onhand_stock') + delta, update_time=timezone.now())
+        if not moved:
+            raise InsufficientStock(f'Insufficient stock of {goods_code} in warehouse {warehouse_id}')
+    elif delta > 0:
+        lookup = {'warehouse_id': warehouse_id, 'goods_code': goods_code, 'openid': openid}
+        _upsert_add(WarehouseStock, lookup, 'onhand_stock', delta)
+    lookup = {'warehouse_id': warehouse_id, 'slot': _total_slot(goods_code)}
+    _upsert_add(WarehouseStockTotal, lookup, 'total_units', delta)
+
+
+def _global_row(goods_code, openid=None):
+    rows = StockListModel.objects.filter(goods_code=goods_code)
+    if openid is not None:
+        rows = rows.filter(openid=openid)
+    return rows.order_by('id').values_list('pk', 'openid').first()
+
+
+def store_of(goods_code, openid=None):
+    """The store whose balances to use: ``openid`` if it stocks the product, else the oldest row's store."""
+    row = (_global_row(goods_code, openid) if openid is not None else None) or _global_row(goods_code)
+    return row[1] if row else (openid or '')
+
+
+def stock_row(goods_code, openid=None, goods_desc=None, **defaults):
+    """
+    ``(pk, openid)`` of the product's global row for ``openid`` (any store's
+    oldest row when ``None``), created empty (plus ``defaults``) if missing.
+    """
+    row = _global_row(goods_code, openid)
+    if row is not None:
+        return row
+    if goods_desc is None:
+        from goods.models import ListModel as Product
+        goods_desc = Product.objects.filter(goods_code=goods_code).values_list('goods_desc', flat=True).first()
+    try:
+        with transaction.atomic():
+            stock = StockListModel.objects.create(
+                goods_code=goods_code, goods_desc=goods_desc or goods_code, openid=openid or '', **defaults,
+            )
+            return stock.pk, stock.openid
+    except IntegrityError:
+        # Another request created the row first.
+        return _global_row(goods_code, openid or '')
+
+
+def _move_global(pk, goods_code, openid, delta):
+    """Apply ``delta`` to the global row ``pk`` the way ``StockListModel.save`` computes it."""
+    rows = StockListModel.objects.filter(pk=pk)
+    if delta < 0:
+        rows = rows.filter(onhand_stock__gte=-delta)
+    moved = rows.update(
+        onhand_stock=F('onhand_stock') + delta,
+        goods_qty=F('onhand_stock') + delta,
+        can_order_stock=Greatest(F('onhand_stock') + delta - F('ordered_stock') - F('damage_stock'), Value(0)),
+        update_time=timezone.now(),
+    )
+    if not moved:
+        raise InsufficientStock(f'Insufficient stock of {goods_code}')
+    transaction.on_commit(lambda: stock_changed.send(StockListModel, goods_code=goods_code, openid=openid))
+
+
+def _issue(warehouse_id, goods_code, openid, quantity):
+    """Take ``quantity`` from a store's balance at a warehouse, drawing on its unallocated stock for any shortfall."""
+    try:
+        _move_balance(warehouse_id, goods_code, openid, -quantity)
+        return
+    except InsufficientStock:
+        held = WarehouseStock.objects.filter(warehouse_id=warehouse_id, goods_code=goods_code, openid=openid) \
+            .values_list('onhand_stock', flat=True).first() or 0
+        shortfall = quantity - held
+        if _unallocated_units(goods_code, openid) < shortfall:
+            raise
+    _move_balance(warehouse_id, goods_code, openid, shortfall)
+    _move_balance(warehouse_id, goods_code, openid, -quantity)
+
+
+def apply_delta(warehouse_id, goods_code, delta, movement_type, reason, user=None, openid=None, goods_desc=None):
+    """
+    Receive (``delta > 0``) or issue (``delta < 0``) stock at one warehouse.
+
+    ``openid`` selects the store's global row (created with ``goods_desc``
+    if missing) and its balance; ``warehouse_id=None`` moves unallocated
+    stock. Raises
+    ``InsufficientStock`` if an issue would take the warehouse or the global
+    row below zero. Returns the recorded ``StockMovement``.
+    """
+    if not delta:
+        raise ValueError('delta must be non-zero')
+    with transaction.atomic():
+        pk, row_openid = stock_row(goods_code, openid, goods_desc)
+        if warehouse_id is None:
+            if delta < 0 and _unallocated_units(goods_code, row_openid) < -delta:
+                raise InsufficientStock(f'Insufficient unallocated stock of {goods_code}')
+        elif delta < 0:
+            _issue(warehouse_id, goods_code, row_openid, -delta)
+        else:
+            _move_balance(warehouse_id, goods_code, row_openid, delta)
+        _move_global(pk, goods_code, row_openid, delta)
+        return StockMovement.objects.create(
+            goods_code=goods_code, movement_type=movement_type, quantity=delta,
+            reason=reason, warehouse_id=warehouse_id, user=user,
+        )
+
+
+def set_onhand(warehouse_id, goods_code, onhand, reason, user=None, openid=None, goods_desc=None):
+    """
+    Bring a global row's on-hand stock to ``onhand`` (a count or an edit
+    form) as an ``adjust`` movement of the difference. Returns the movement,
+    or ``None`` when nothing changed.
+    """
+    if onhand < 0:
+        raise ValueError('onhand must not be negative')
+    with transaction.atomic():
+        pk, row_openid = stock_row(goods_code, openid, goods_desc)
+        current = StockListModel.objects.select_for_update().values_list('onhand_stock', flat=True).get(pk=pk)
+        if onhand == current:
+            return None
+        return apply_delta(warehouse_id, goods_code, onhand - current, 'adjust', reason, user, row_openid)
+
+
+def transfer(goods_code, from_warehouse, to_warehouse, quantity, user=None, reason='', openid=None):
+    """
+    Move ``quantity`` units of a store's product (``store_of(goods_code,
+    openid)``) between two warehouses as one atomic pair of deltas.
+
+    Balances are updated in warehouse-id order so two opposite transfers of
+    the same product cannot deadlock. Returns the source's new balance.
+    """
+    if quantity <= 0:
+        raise ValueError('quantity must be positive')
+    if from_warehouse.pk == to_warehouse.pk:
+        raise ValueError('Source and destination must differ')
+    deltas = {from_warehouse.pk: -quantity, to_warehouse.pk: quantity}
+    openid = store_of(goods_code, openid)
+    with transaction.atomic():
+        for warehouse_id in sorted(deltas):
+            _move_balance(warehouse_id, goods_code, openid, deltas[warehouse_id])
+        note = f': {reason}' if reason else ''
+        StockMovement.objects.bulk_create([
+            StockMovement(goods_code=goods_code, movement_type='out', quantity=-quantity,
+                          reason=f'Transfer to {to_warehouse.warehouse_name}{note}',
+                          warehouse=from_warehouse, user=user),
+            StockMovement(goods_code=goods_code, movement_type='in', quantity=quantity,
+                          reason=f'Transfer from {from_warehouse.warehouse_name}{note}',
+                          warehouse=to_warehouse, user=user),
+        ])
+        return WarehouseStock.objects.get(warehouse=from_warehouse, goods_code=goods_code, openid=openid).onhand_stock
+
+
+def balances(goods_code, openid=None):
+    """Per-warehouse balances of one product, for one store or (``None``) all stores together."""
+    rows = WarehouseStock.objects.filter(goods_code=goods_code, onhand_stock__gt=0)
+    if openid is not None:
+        rows = rows.filter(openid=openid)
+    return [
+        {'warehouse_id': row['warehouse_id'], 'warehouse__warehouse_name': row['warehouse__warehouse_name'],
+         'onhand_stock': row['units']}
+        for row in rows.values('warehouse_id', 'warehouse__warehouse_name')
+        .annotate(units=Sum('onhand_stock')).order_by('warehouse__warehouse_name')
+    ]
+
+
+def warehouse_totals():
+    """Units held per warehouse and overall, summed from the maintained total slots."""
+    rows = list(
+        WarehouseStockTotal.objects.filter(warehouse__is_delete=False)
+        .values('warehouse_id', 'warehouse__warehouse_name')
+        .annotate(total_units=Sum('total_units'))
+        .order_by('warehouse__warehouse_name')
+    )
+    return {'warehouses': rows, 'total_units': sum(row['total_units'] for row in rows)}
+
+
+def unallocated(goods_code=None, openid=None):
+    """
+    Global on-hand stock not yet assigned to any warehouse, keyed by
+    ``(goods_code, openid)``.
+
+    Stock recorded before warehouses were tracked only exists on the global
+    row; ``allocate_warehouse_stock`` moves it into a warehouse.
+    """
+    balances = WarehouseStock.objects.all()
+    totals = StockListModel.objects.all()
+    if goods_code:
+        balances = balances.filter(goods_code=goods_code)
+        totals = totals.filter(goods_code=goods_code)
+    if openid is not None:
+        balances = balances.filter(openid=openid)
+        totals = totals.filter(openid=openid)
+    allocated = {
+        (row['goods_code'], row['openid']): row['total']
+        for row in balances.values('goods_code', 'openid').annotate(total=Sum('onhand_stock'))
+    }
+    pending = {}
+    for code, store, total in totals.values_list('goods_code', 'openid', 'onhand_stock'):
+        units = total - allocated.get((code, store), 0)
+        if units > 0:
+            pending[(code, store)] = units
+    return pending
+
+
+def _unallocated_units(goods_code, openid):
+    return unallocated(goods_code, openid).get((goods_code, openid), 0)
+
+
+def allocate(warehouse_id, quantities):
+    """
+    Assign already-counted global stock (``{(goods_code, openid): units}``,
+    as ``unallocated`` returns it) to a warehouse without changing global totals.
+    """
+    with transaction.atomic():
+        for (goods_code, openid), quantity in quantities.items():
+            _move_balance(warehouse_id, goods_code, openid, quantity)
@@ -0,0 +1,33 @@
+"""
+allocate_warehouse_stock – assign stock that predates warehouse tracking.
+
+Global on-hand quantities that are not yet held by any warehouse are moved
+into the given warehouse; global totals do not change.
+    python manage.py allocate_warehouse_stock --warehouse 1
+    python manage.py allocate_warehouse_stock --warehouse 1 --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from stock import ledger
+from warehouse.models import ListModel as Warehouse
+
+
+class Command(BaseCommand):
+    help = 'Assign unallocated global stock to a warehouse.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--warehouse', type=int, required=True, help='Warehouse id to receive the stock.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be allocated.')
+
+    def handle(self, *args, **options):
+        warehouse = Warehouse.objects.filter(pk=options['warehouse'], is_delete=False).first()
+        if warehouse is None:
+            raise CommandError(f"Warehouse {options['warehouse']} not found")
+        pending = ledger.unallocated()
+        units = sum(pending.values())
+        if options['dry_run']:
+            self.stdout.write(f'{len(pending)} products, {units} units would go to {warehouse.warehouse_name}')
+            return
+        ledger.allocate(warehouse.pk, pending)
+        self.stdout.write(self.style.SUCCESS(
+            f'Allocated {units} units of {len(pending)} products to {warehouse.warehouse_name}'))
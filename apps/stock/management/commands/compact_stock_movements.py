@@ -0,0 +1,47 @@
+"""
+compact_stock_movements – fold old stock movements into daily totals.
+
+Movements older than --keep-days are replaced by one StockMovementArchive row
+per product, day, type and warehouse. Snapshots are taken for the compacted
+range first, so point-in-time balances stay available at daily resolution.
+    python manage.py compact_stock_movements --keep-days 365
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from stock import history
+from stock.models import StockMovement, StockSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Archive stock movements older than N days as daily totals.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=365, help='Keep individual movements this many days.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be compacted.')
+
+    def handle(self, *args, **options):
+        before_day = timezone.localdate() - timedelta(days=options['keep_days'])
+        old = StockMovement.objects.filter(created_at__lt=history.start_of_day(before_day))
+        if options['dry_run']:
+            self.stdout.write(f'{old.count()} movements before {before_day} would be compacted')
+            return
+
+        oldest = old.order_by('created_at').values_list('created_at', flat=True).first()
+        if oldest is None:
+            self.stdout.write('Nothing to compact')
+            return
+        first_day = timezone.localdate(oldest) - timedelta(days=1)
+        have = set(StockSnapshot.objects.filter(snapshot_date__gte=first_day, snapshot_date__lt=before_day)
+                   .values_list('snapshot_date', flat=True).distinct())
+        missing = [first_day + timedelta(days=n) for n in range((before_day - first_day).days)
+                   if first_day + timedelta(days=n) not in have]
+        if missing:
+            history.take_snapshots(missing)
+            self.stdout.write(f'Snapshotted {len(missing)} day(s) before compacting')
+
+        removed, written = history.compact(before_day)
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {removed} movements before {before_day} into {written} daily rows'))
@@ -0,0 +1,34 @@
+"""
+snapshot_stock – record end-of-day on-hand balances for every product.
+
+Run daily after midnight (snapshots yesterday by default):
+    python manage.py snapshot_stock
+    python manage.py snapshot_stock --date 2026-01-31
+    python manage.py snapshot_stock --backfill 90     # the last 90 days
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from stock import history
+
+
+class Command(BaseCommand):
+    help = 'Snapshot per-product stock balances at the end of a day.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to snapshot (YYYY-MM-DD); default yesterday.')
+        parser.add_argument('--backfill', type=int, default=0, help='Snapshot each of the last N days.')
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        if options['backfill']:
+            days = [yesterday - timedelta(days=n) for n in range(options['backfill'])]
+        else:
+            try:
+                days = [date.fromisoformat(options['date']) if options['date'] else yesterday]
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+        rows = history.take_snapshots(days)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} snapshots for {len(days)} day(s)'))
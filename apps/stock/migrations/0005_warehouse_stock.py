@@ -0,0 +1,56 @@
+# Generated by Django 4.2.11 on 2026-10-19 13:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouse', '0002_listmodel_warehouse_image'),
+        ('stock', '0004_stockalert_idx_alert_goods_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WarehouseStockTotal',
+            fields=[
+                ('warehouse', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stock_total', serialize=False, to='warehouse.listmodel')),
+                ('total_units', models.BigIntegerField(default=0)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'stock_warehouse_total',
+            },
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='warehouse',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='warehouse.listmodel'),
+        ),
+        migrations.CreateModel(
+            name='WarehouseStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goods_code', models.CharField(max_length=255, verbose_name='Goods Code')),
+                ('onhand_stock', models.BigIntegerField(default=0, verbose_name='On Hand Stock')),
+                ('update_time', models.DateTimeField(auto_now=True, verbose_name='Update Time')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_balances', to='warehouse.listmodel')),
+            ],
+            options={
+                'verbose_name': 'Warehouse Stock',
+                'verbose_name_plural': 'Warehouse Stock',
+                'db_table': 'stock_warehouse',
+                'ordering': ['warehouse_id', 'goods_code'],
+                'indexes': [models.Index(fields=['goods_code'], name='idx_stock_warehouse_goods')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='warehousestock',
+            constraint=models.UniqueConstraint(fields=('warehouse', 'goods_code'), name='uniq_stock_warehouse_goods'),
+        ),
+        migrations.AddConstraint(
+            model_name='warehousestock',
+            constraint=models.CheckConstraint(check=models.Q(('onhand_stock__gte', 0)), name='stock_warehouse_non_negative'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0005_warehouse_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovementArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goods_code', models.CharField(max_length=255)),
+                ('day', models.DateField()),
+                ('movement_type', models.CharField(choices=[('in', 'Stock In'), ('out', 'Stock Out'), ('adjust', 'Adjustment')], max_length=10)),
+                ('warehouse_id', models.BigIntegerField(blank=True, null=True)),
+                ('quantity', models.BigIntegerField()),
+                ('movement_count', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'stock_movement_archive',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goods_code', models.CharField(max_length=255)),
+                ('snapshot_date', models.DateField()),
+                ('balance', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'stock_snapshot',
+                'ordering': ['goods_code', '-snapshot_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['goods_code', 'created_at'], name='idx_movement_goods_created'),
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('goods_code', 'snapshot_date'), name='uniq_snapshot_goods_date'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovementarchive',
+            index=models.Index(fields=['goods_code', 'day'], name='idx_movement_archive_goods'),
+        ),
+    ]
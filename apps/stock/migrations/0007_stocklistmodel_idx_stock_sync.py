@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0006_stock_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stocklistmodel',
+            index=models.Index(fields=['update_time', 'id'], name='idx_stock_sync'),
+        ),
+    ]
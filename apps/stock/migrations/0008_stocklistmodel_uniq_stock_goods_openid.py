@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicates(apps, schema_editor):
+    """Fold rows sharing (goods_code, openid) into the oldest one so the constraint can be added."""
+    Stock = apps.get_model('stock', 'StockListModel')
+    duplicated = (Stock.objects.values('goods_code', 'openid')
+                  .annotate(rows=Count('id')).filter(rows__gt=1))
+    for group in duplicated:
+        rows = list(Stock.objects.filter(goods_code=group['goods_code'], openid=group['openid']).order_by('id'))
+        keep, extras = rows[0], rows[1:]
+        for row in extras:
+            keep.onhand_stock += row.onhand_stock
+            keep.ordered_stock += row.ordered_stock
+            keep.damage_stock += row.damage_stock
+        keep.goods_qty = keep.onhand_stock
+        keep.can_order_stock = max(0, keep.onhand_stock - keep.ordered_stock - keep.damage_stock)
+        keep.save()
+        Stock.objects.filter(pk__in=[row.pk for row in extras]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0007_stocklistmodel_idx_stock_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='stocklistmodel',
+            constraint=models.UniqueConstraint(fields=('goods_code', 'openid'), name='uniq_stock_goods_openid'),
+        ),
+    ]
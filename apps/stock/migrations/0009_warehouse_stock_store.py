@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def assign_stores(apps, schema_editor):
+    """Give existing balances the store of the product's oldest global row, the one the ledger used."""
+    Stock = apps.get_model('stock', 'StockListModel')
+    WarehouseStock = apps.get_model('stock', 'WarehouseStock')
+    codes = WarehouseStock.objects.values_list('goods_code', flat=True).distinct()
+    for goods_code in codes:
+        openid = Stock.objects.filter(goods_code=goods_code).order_by('id').values_list('openid', flat=True).first()
+        if openid:
+            WarehouseStock.objects.filter(goods_code=goods_code).update(openid=openid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0008_stocklistmodel_uniq_stock_goods_openid'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='warehousestock',
+            name='uniq_stock_warehouse_goods',
+        ),
+        migrations.RemoveIndex(
+            model_name='warehousestock',
+            name='idx_stock_warehouse_goods',
+        ),
+        migrations.AddField(
+            model_name='warehousestock',
+            name='openid',
+            field=models.CharField(default='', max_length=255, verbose_name='User'),
+        ),
+        migrations.RunPython(assign_stores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='warehousestock',
+            index=models.Index(fields=['goods_code', 'openid'], name='idx_stock_warehouse_store'),
+        ),
+        migrations.AddConstraint(
+            model_name='warehousestock',
+            constraint=models.UniqueConstraint(fields=('warehouse', 'goods_code', 'openid'), name='uniq_stock_warehouse_goods_store'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_totals(apps, schema_editor):
+    """Each warehouse's existing total becomes its slot 0; later deltas spread over the other slots."""
+    Old = apps.get_model('stock', 'WarehouseStockTotalUnsliced')
+    New = apps.get_model('stock', 'WarehouseStockTotal')
+    New.objects.bulk_create([
+        New(warehouse_id=row.warehouse_id, slot=0, total_units=row.total_units)
+        for row in Old.objects.all()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warehouse', '0002_listmodel_warehouse_image'),
+        ('stock', '0009_warehouse_stock_store'),
+    ]
+
+    operations = [
+        migrations.RenameModel('WarehouseStockTotal', 'WarehouseStockTotalUnsliced'),
+        migrations.AlterField(
+            model_name='warehousestocktotalunsliced',
+            name='warehouse',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='warehouse.listmodel'),
+        ),
+        migrations.CreateModel(
+            name='WarehouseStockTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField(default=0)),
+                ('total_units', models.BigIntegerField(default=0)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_totals', to='warehouse.listmodel')),
+            ],
+            options={
+                'db_table': 'stock_warehouse_total_slot',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='warehousestocktotal',
+            constraint=models.UniqueConstraint(fields=('warehouse', 'slot'), name='uniq_stock_warehouse_total_slot'),
+        ),
+        migrations.RunPython(copy_totals, migrations.RunPython.noop),
+        migrations.DeleteModel('WarehouseStockTotalUnsliced'),
+    ]
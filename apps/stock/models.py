@@ -24,6 +24,10 @@ class StockListModel(models.Model):
             models.Index(fields=['goods_code'], name='idx_stock_goods'),
             models.Index(fields=['goods_code', 'openid'], name='idx_stock_user'),
             models.Index(fields=['create_time'], name='idx_stock_created'),
+            models.Index(fields=['update_time', 'id'], name='idx_stock_sync'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['goods_code', 'openid'], name='uniq_stock_goods_openid'),
         ]
 
     def __str__(self):
@@ -46,6 +50,7 @@ class StockMovement(models.Model):
     movement_type = models.CharField(max_length=10, choices=MOVEMENT_TYPES)
     quantity = models.IntegerField()
     reason = models.CharField(max_length=200)
+    warehouse = models.ForeignKey('warehouse.ListModel', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
     user = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -55,11 +60,113 @@ class StockMovement(models.Model):
             models.Index(fields=['goods_code'], name='idx_movement_goods'),
             models.Index(fields=['movement_type'], name='idx_movement_type'),
             models.Index(fields=['created_at'], name='idx_movement_created'),
+            models.Index(fields=['goods_code', 'created_at'], name='idx_movement_goods_created'),
         ]
     
     def __str__(self):
         return f"{self.goods_code} - {self.movement_type} - {self.quantity}"
 
+class StockSnapshot(models.Model):
+    """
+    On-hand balance of one product at the end of one day (project time zone).
+
+    Written by ``snapshot_stock``; ``stock.history.balance_at`` starts from
+    the nearest snapshot and applies at most a day or so of movements.
+    """
+    goods_code = models.CharField(max_length=255)
+    snapshot_date = models.DateField()
+    balance = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stock_snapshot'
+        ordering = ['goods_code', '-snapshot_date']
+        constraints = [
+            models.UniqueConstraint(fields=['goods_code', 'snapshot_date'], name='uniq_snapshot_goods_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.goods_code} @ {self.snapshot_date}: {self.balance}"
+
+
+class StockMovementArchive(models.Model):
+    """
+    Daily totals that replace compacted ``StockMovement`` rows.
+
+    One row per product, day, movement type and warehouse keeps the net
+    quantity and how many movements it stands for.
+    """
+    goods_code = models.CharField(max_length=255)
+    day = models.DateField()
+    movement_type = models.CharField(max_length=10, choices=StockMovement.MOVEMENT_TYPES)
+    warehouse_id = models.BigIntegerField(null=True, blank=True)
+    quantity = models.BigIntegerField()
+    movement_count = models.IntegerField()
+
+    class Meta:
+        db_table = 'stock_movement_archive'
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['goods_code', 'day'], name='idx_movement_archive_goods'),
+        ]
+
+    def __str__(self):
+        return f"{self.goods_code} {self.day} {self.movement_type}: {self.quantity}"
+
+
+class WarehouseStock(models.Model):
+    """
+    On-hand quantity of one store's product at one warehouse.
+
+    Written only through ``stock.ledger`` so the per-warehouse totals and the
+    store's global ``StockListModel`` row (same ``goods_code`` and ``openid``)
+    stay in step with it.
+    """
+    warehouse = models.ForeignKey('warehouse.ListModel', on_delete=models.CASCADE, related_name='stock_balances')
+    goods_code = models.CharField(max_length=255, verbose_name="Goods Code")
+    openid = models.CharField(max_length=255, default='', verbose_name='User')
+    onhand_stock = models.BigIntegerField(default=0, verbose_name='On Hand Stock')
+    update_time = models.DateTimeField(auto_now=True, verbose_name="Update Time")
+
+    class Meta:
+        db_table = 'stock_warehouse'
+        verbose_name = 'Warehouse Stock'
+        verbose_name_plural = "Warehouse Stock"
+        ordering = ['warehouse_id', 'goods_code']
+        constraints = [
+            models.UniqueConstraint(fields=['warehouse', 'goods_code', 'openid'], name='uniq_stock_warehouse_goods_store'),
+            models.CheckConstraint(check=models.Q(onhand_stock__gte=0), name='stock_warehouse_non_negative'),
+        ]
+        indexes = [
+            models.Index(fields=['goods_code', 'openid'], name='idx_stock_warehouse_store'),
+        ]
+
+    def __str__(self):
+        return f"{self.goods_code} ({self.openid}) @ {self.warehouse_id}: {self.onhand_stock}"
+
+
+class WarehouseStockTotal(models.Model):
+    """
+    One slice of a warehouse's running total, maintained with every ledger
+    delta. A warehouse's total is spread over ``stock.ledger.TOTAL_SLOTS``
+    rows picked by goods code, so deltas to different products rarely
+    update the same row; the warehouse total is the sum of its slots.
+    """
+    warehouse = models.ForeignKey('warehouse.ListModel', on_delete=models.CASCADE, related_name='stock_totals')
+    slot = models.PositiveSmallIntegerField(default=0)
+    total_units = models.BigIntegerField(default=0)
+    update_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stock_warehouse_total_slot'
+        constraints = [
+            models.UniqueConstraint(fields=['warehouse', 'slot'], name='uniq_stock_warehouse_total_slot'),
+        ]
+
+    def __str__(self):
+        return f"{self.warehouse_id}/{self.slot}: {self.total_units} units"
+
+
 class StockAlert(models.Model):
     ALERT_LEVELS = [
         ('critical', 'Critical'),
@@ -0,0 +1,91 @@
+from django.test import TestCase
+
+from stock import ledger
+from stock.models import StockListModel, StockMovement, WarehouseStock
+from warehouse.models import ListModel as Warehouse
+
+
+class LedgerTests(TestCase):
+    """Warehouse balances, store balances and the global rows move together."""
+
+    def setUp(self):
+        self.main = self.warehouse('Main Warehouse')
+        self.north = self.warehouse('North')
+
+    def warehouse(self, name):
+        return Warehouse.objects.create(warehouse_name=name, warehouse_city='City', warehouse_address='Street',
+                                        warehouse_contact='1', warehouse_manager='M', creater='test')
+
+    def onhand(self, goods_code, openid):
+        return StockListModel.objects.get(goods_code=goods_code, openid=openid).onhand_stock
+
+    def balance(self, warehouse, goods_code, openid):
+        return WarehouseStock.objects.filter(warehouse=warehouse, goods_code=goods_code, openid=openid) \
+            .values_list('onhand_stock', flat=True).first() or 0
+
+    def test_receipt_and_issue(self):
+        ledger.apply_delta(self.main.pk, 'SKU1', 10, 'in', 'Received', openid='store-a', goods_desc='Widget')
+        movement = ledger.apply_delta(self.main.pk, 'SKU1', -4, 'out', 'Sold', openid='store-a')
+        self.assertEqual(movement.warehouse_id, self.main.pk)
+        self.assertEqual(self.balance(self.main, 'SKU1', 'store-a'), 6)
+        stock = StockListModel.objects.get(goods_code='SKU1', openid='store-a')
+        self.assertEqual((stock.onhand_stock, stock.goods_qty, stock.can_order_stock), (6, 6, 6))
+        self.assertEqual(ledger.warehouse_totals()['total_units'], 6)
+
+    def test_warehouse_totals_sum_their_slots(self):
+        codes = [f'SKU{n}' for n in range(40)]
+        for goods_code in codes:
+            ledger.apply_delta(self.main.pk, goods_code, 2, 'in', 'Received', openid='store-a')
+        ledger.apply_delta(self.north.pk, 'SKU1', 3, 'in', 'Received', openid='store-a')
+        ledger.transfer('SKU2', self.main, self.north, 1, openid='store-a')
+        totals = ledger.warehouse_totals()
+        self.assertEqual(totals['total_units'], 83)
+        self.assertEqual([row['total_units'] for row in totals['warehouses']], [79, 4])
+        self.assertGreater(self.main.stock_totals.count(), 1)
+
+    def test_insufficient_stock_changes_nothing(self):
+        ledger.apply_delta(self.main.pk, 'SKU1', 3, 'in', 'Received', openid='store-a')
+        with self.assertRaises(ledger.InsufficientStock):
+            ledger.apply_delta(self.main.pk, 'SKU1', -5, 'out', 'Sold', openid='store-a')
+        with self.assertRaises(ledger.InsufficientStock):
+            ledger.apply_delta(self.north.pk, 'SKU1', -1, 'out', 'Sold', openid='store-a')
+        self.assertEqual(self.onhand('SKU1', 'store-a'), 3)
+        self.assertEqual(self.balance(self.main, 'SKU1', 'store-a'), 3)
+        self.assertEqual(StockMovement.objects.count(), 1)
+
+    def test_shortfall_draws_on_unallocated_stock(self):
+        StockListModel.objects.create(goods_code='OLD', goods_desc='Legacy', onhand_stock=8, openid='store-a')
+        self.assertEqual(ledger.unallocated('OLD'), {('OLD', 'store-a'): 8})
+        ledger.apply_delta(self.north.pk, 'OLD', -5, 'out', 'Sold', openid='store-a')
+        self.assertEqual(self.onhand('OLD', 'store-a'), 3)
+        self.assertEqual(self.balance(self.north, 'OLD', 'store-a'), 0)
+        self.assertEqual(ledger.unallocated('OLD'), {('OLD', 'store-a'): 3})
+        with self.assertRaises(ledger.InsufficientStock):
+            ledger.apply_delta(self.north.pk, 'OLD', -4, 'out', 'Sold', openid='store-a')
+
+    def test_stores_do_not_share_balances(self):
+        ledger.apply_delta(self.main.pk, 'SKU1', 5, 'in', 'Received', openid='store-a')
+        ledger.stock_row('SKU1', 'store-b', 'Widget')
+        with self.assertRaises(ledger.InsufficientStock):
+            ledger.apply_delta(self.main.pk, 'SKU1', -1, 'out', 'Sold', openid='store-b')
+        self.assertEqual(self.balance(self.main, 'SKU1', 'store-a'), 5)
+        self.assertEqual(ledger.unallocated('SKU1'), {})
+
+    def test_transfer_moves_balances_only(self):
+        ledger.apply_delta(self.main.pk, 'SKU1', 10, 'in', 'Received', openid='store-a')
+        remaining = ledger.transfer('SKU1', self.main, self.north, 4, openid='store-a')
+        self.assertEqual(remaining, 6)
+        self.assertEqual(self.balance(self.north, 'SKU1', 'store-a'), 4)
+        self.assertEqual(self.onhand('SKU1', 'store-a'), 10)
+        self.assertEqual([row['onhand_stock'] for row in ledger.balances('SKU1')], [6, 4])
+        with self.assertRaises(ledger.InsufficientStock):
+            ledger.transfer('SKU1', self.north, self.main, 5, openid='store-a')
+        with self.assertRaises(ValueError):
+            ledger.transfer('SKU1', self.main, self.main, 1, openid='store-a')
+
+    def test_set_onhand_records_the_difference(self):
+        ledger.apply_delta(self.main.pk, 'SKU1', 10, 'in', 'Received', openid='store-a')
+        movement = ledger.set_onhand(self.main.pk, 'SKU1', 7, 'Count', openid='store-a')
+        self.assertEqual((movement.movement_type, movement.quantity), ('adjust', -3))
+        self.assertIsNone(ledger.set_onhand(self.main.pk, 'SKU1', 7, 'Count', openid='store-a'))
+        self.assertEqual(self.balance(self.main, 'SKU1', 'store-a'), 7)
@@ -1,22 +1,66 @@
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
+from django.db import DatabaseError, transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Greatest
 from .models import StockListModel, StockAlert, StockMovement
+from . import ledger
 from .serializers import StockSerializer
 from permissions.decorators import require_permission
+from core.bulk import bulk_response, record_audit, summary
+from core.sync import sync_response
+from greaterwms.pagination import HybridPagination
+from greaterwms.serialization import FastListMixin
 import csv
 import io
 import json
 from datetime import datetime
 
-class StockViewSet(viewsets.ModelViewSet):
+def sync_quantities(ids):
+    """Recompute the derived quantities ``StockListModel.save`` maintains, for rows written in bulk."""
+    StockListModel.objects.filter(pk__in=ids).update(
+        goods_qty=F('onhand_stock'),
+        can_order_stock=Greatest(F('onhand_stock') - F('ordered_stock') - F('damage_stock'), Value(0)),
+    )
+
+
+def receive_rows(rows, warehouse_id, openid, user, reason):
+    """
+    Receive ``goods_qty`` units of each CSV row into the store's stock, adding
+    to rows that already exist. One result per row, shaped like ``core.bulk``.
+    """
+    results = []
+    with transaction.atomic():
+        for index, row in enumerate(rows):
+            goods_code = (row.get('goods_code') or '').strip()
+            result = {'index': index, 'goods_code': goods_code}
+            results.append(result)
+            try:
+                quantity = int(row.get('goods_qty') or 0)
+            except ValueError:
+                quantity = -1
+            if not goods_code or quantity < 0:
+                result.update(status='error', errors={'non_field_errors': ['goods_code and a goods_qty >= 0 are required.']})
+                continue
+            existed = StockListModel.objects.filter(goods_code=goods_code, openid=openid).exists()
+            result['id'], _ = ledger.stock_row(goods_code, openid, (row.get('goods_desc') or '').strip() or None)
+            if quantity:
+                ledger.apply_delta(warehouse_id, goods_code, quantity, 'in', reason, user, openid=openid)
+            result['status'] = 'updated' if existed else 'created'
+    return results
+
+
+class StockViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = StockListModel.objects.all()
     serializer_class = StockSerializer
+    pagination_class = HybridPagination
     # Custom permission class defined below
     permission_classes = [] 
 
@@ -25,20 +69,118 @@ class StockViewSet(viewsets.ModelViewSet):
         SuperAdmin sees all stock.
         Others see only their store's stock (filtered by openid).
         """
+        openid = self._owner_openid()
+        if openid is None:
+            return StockListModel.objects.all()
+        return StockListModel.objects.filter(openid=openid)
+
+    def _owner_openid(self):
+        """None for SuperAdmin (sees every store), otherwise the user's openid."""
         user = self.request.user
         if user.is_superuser:
-            return StockListModel.objects.all()
+            return None
         
         try:
             from permissions.decorators import get_user_role
             role = get_user_role(user)
             if role == 'superadmin':
-                return StockListModel.objects.all()
+                return None
         except:
             pass
         
-        openid = getattr(user, 'openid', user.username)
-        return StockListModel.objects.filter(openid=openid)
+        return getattr(user, 'openid', user.username)
+
+    def _ledger_warehouse(self):
+        """Id of the ``warehouse`` (query string or body) that API stock changes are booked at."""
+        payload = self.request.data
+        name = self.request.query_params.get('warehouse') or (
+            payload.get('warehouse') if isinstance(payload, dict) else None)
+        warehouse = ledger.resolve_warehouse(name)
+        if warehouse is None and name:
+            raise ValidationError({'warehouse': ['Warehouse not found']})
+        return warehouse.pk if warehouse else None
+
+    def _save_through_ledger(self, serializer, reason):
+        """
+        Save the row's other fields as usual; a new ``onhand_stock`` is booked
+        through the stock ledger as an adjustment. The derived quantities are
+        recomputed from it, so they are never taken from the request.
+        """
+        data = serializer.validated_data
+        onhand = data.pop('onhand_stock', None)
+        data.pop('goods_qty', None)
+        data.pop('can_order_stock', None)
+        if onhand is not None and onhand < 0:
+            raise ValidationError({'onhand_stock': ['Cannot be negative.']})
+        warehouse_id = self._ledger_warehouse()
+        with transaction.atomic():
+            stock = serializer.save()
+            if onhand is not None:
+                try:
+                    ledger.set_onhand(warehouse_id, stock.goods_code, onhand, reason, self.request.user,
+                                      openid=stock.openid)
+                except ledger.InsufficientStock as exc:
+                    raise ValidationError({'onhand_stock': [str(exc)]})
+        stock.refresh_from_db()
+
+    def perform_create(self, serializer):
+        self._save_through_ledger(serializer, 'Stock API create')
+
+    def perform_update(self, serializer):
+        self._save_through_ledger(serializer, 'Stock API update')
+
+    @action(detail=False, methods=['get'])
+    def sync(self, request):
+        """Stock changes since ``cursor`` (or ``updated_since``). Honours ``If-None-Match``."""
+        return sync_response(
+            request, self.get_queryset(), lambda rows: self.get_serializer(rows, many=True).data,
+            openid=self._owner_openid(),
+        )
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create, update or upsert a list of stock rows keyed on
+        ``(goods_code, openid)``. Rows land in the user's store; a SuperAdmin
+        may name the ``openid``. Needs the stock ``adjust`` permission, like
+        the CSV bulk upload. ``onhand_stock`` changes go through the stock
+        ledger at ``warehouse`` (query string or body; default warehouse when
+        omitted), so a row that cannot be issued fails its chunk.
+        """
+        owner = self._owner_openid()
+        try:
+            warehouse_id = self._ledger_warehouse()
+        except ValidationError as exc:
+            return JsonResponse({'error': exc.detail['warehouse'][0]}, status=400)
+        deltas = {}
+
+        def check(data, current):
+            target = data.pop('onhand_stock', None)
+            data.pop('goods_qty', None)
+            data.pop('can_order_stock', None)
+            if target is None:
+                return None
+            if target < 0:
+                return 'onhand_stock cannot be negative.'
+            deltas[(data['goods_code'], data.get('openid', ''))] = target - (current['onhand_stock'] if current else 0)
+            return None
+
+        def finalize(ids):
+            sync_quantities(ids)
+            for key in StockListModel.objects.filter(pk__in=ids).values_list('goods_code', 'openid'):
+                delta = deltas.pop(key, 0)
+                if not delta:
+                    continue
+                try:
+                    ledger.apply_delta(warehouse_id, key[0], delta, 'adjust',
+                                       'Bulk stock update', request.user, openid=key[1])
+                except ledger.InsufficientStock as exc:
+                    raise DatabaseError(str(exc))
+
+        return bulk_response(
+            request, StockSerializer, ['goods_code', 'openid'], context=self.get_serializer_context(),
+            assign={'openid': owner} if owner is not None else None, check=check, finalize=finalize,
+        )
 
     def get_permissions(self):
         from permissions.decorators import check_permission
@@ -50,6 +192,8 @@ class StockViewSet(viewsets.ModelViewSet):
                     return False
                 if request.method == 'GET':
                     return check_permission(request.user, 'stock', 'view')
+                elif request.method == 'POST' and view.action == 'bulk':
+                    return check_permission(request.user, 'stock', 'adjust')
                 elif request.method == 'POST':
                     return check_permission(request.user, 'stock', 'create')
                 elif request.method in ['PUT', 'PATCH']:
@@ -88,22 +232,24 @@ def stock_dashboard(request):
 @require_permission('stock', 'adjust')  # Stock adjust permission
 @require_http_methods(["POST"])
 def add_stock_api(request):
+    """Receive stock into a warehouse (the default one unless ``warehouse`` is given)."""
     try:
         goods_code = request.POST.get('goods_code')
         goods_desc = request.POST.get('goods_desc')
         goods_qty = int(request.POST.get('goods_qty', 0))
-        warehouse = request.POST.get('warehouse', 'Main')
+        if not goods_code or goods_qty < 0:
+            return JsonResponse({'success': False, 'error': 'Invalid data'}, status=400)
+        warehouse = ledger.resolve_warehouse(request.POST.get('warehouse'))
+        if warehouse is None and request.POST.get('warehouse'):
+            return JsonResponse({'success': False, 'error': 'Warehouse not found'}, status=400)
         
-        stock = StockListModel.objects.create(
-            goods_code=goods_code,
-            goods_desc=goods_desc,
-            goods_qty=goods_qty,
-            can_order_stock=goods_qty,
-            ordered_stock=0,
-            openid=request.user.username
-        )
+        openid = request.user.username
+        if goods_qty:
+            ledger.apply_delta(warehouse.pk if warehouse else None, goods_code, goods_qty, 'in',
+                               'Stock added', request.user, openid=openid, goods_desc=goods_desc)
+        stock_id, _ = ledger.stock_row(goods_code, openid, goods_desc)
         
-        return JsonResponse({'success': True, 'id': stock.id})
+        return JsonResponse({'success': True, 'id': stock_id})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
@@ -119,19 +265,17 @@ def bulk_upload_stock_api(request):
         io_string = io.StringIO(decoded_file)
         reader = csv.DictReader(io_string)
         
-        created = 0
-        for row in reader:
-            StockListModel.objects.create(
-                goods_code=row['goods_code'],
-                goods_desc=row['goods_desc'],
-                goods_qty=int(row['goods_qty']),
-                can_order_stock=int(row['goods_qty']),
-                ordered_stock=0,
-                openid=request.user.username
-            )
-            created += 1
-        
-        return JsonResponse({'success': True, 'created': created})
+        warehouse = ledger.resolve_warehouse(request.POST.get('warehouse'))
+        if warehouse is None and request.POST.get('warehouse'):
+            return JsonResponse({'success': False, 'error': 'Warehouse not found'}, status=400)
+        results = receive_rows(list(reader), warehouse.pk if warehouse else None, request.user.username,
+                               request.user, 'CSV stock upload')
+        record_audit(request, StockListModel._meta.label, results, 'goods_code')
+        counts = summary(results)
+        return JsonResponse({
+            'success': not counts['error'], 'created': counts['created'], 'updated': counts['updated'],
+            'errors': [result for result in results if result['status'] == 'error'],
+        })
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
@@ -153,34 +297,20 @@ def adjust_stock_api(request):
         stock = StockListModel.objects.filter(goods_code=goods_code).first()
         if not stock:
             return JsonResponse({'success': False, 'error': 'Stock not found'}, status=404)
-        
-        old_qty = stock.goods_qty
-        
-        if adjustment_type == 'increase':
-            stock.goods_qty += quantity
-            stock.can_order_stock += quantity
-            stock.onhand_stock += quantity
-            movement_type = 'in'
-        elif adjustment_type == 'decrease':
-            if stock.goods_qty < quantity:
-                return JsonResponse({'success': False, 'error': 'Insufficient stock'}, status=400)
-            stock.goods_qty -= quantity
-            stock.can_order_stock = max(0, stock.can_order_stock - quantity)
-            stock.onhand_stock = max(0, stock.onhand_stock - quantity)
-            movement_type = 'out'
-        else:
+        if adjustment_type not in ('increase', 'decrease'):
             return JsonResponse({'success': False, 'error': 'Invalid adjustment type'}, status=400)
+        warehouse = ledger.resolve_warehouse(data.get('warehouse'))
+        if warehouse is None and data.get('warehouse'):
+            return JsonResponse({'success': False, 'error': 'Warehouse not found'}, status=400)
         
-        stock.save()
-        
-        # Record stock movement
-        StockMovement.objects.create(
-            goods_code=goods_code,
-            movement_type='adjust',
-            quantity=quantity if adjustment_type == 'increase' else -quantity,
-            reason=reason or f'Stock {adjustment_type}',
-            user=request.user
-        )
+        old_qty = stock.goods_qty
+        delta = quantity if adjustment_type == 'increase' else -quantity
+        try:
+            ledger.apply_delta(warehouse.pk if warehouse else None, goods_code, delta, 'adjust',
+                               reason or f'Stock {adjustment_type}', request.user, openid=stock.openid)
+        except ledger.InsufficientStock:
+            return JsonResponse({'success': False, 'error': 'Insufficient stock'}, status=400)
+        stock.refresh_from_db()
         
         return JsonResponse({
             'success': True,
@@ -195,58 +325,66 @@ def adjust_stock_api(request):
 @require_permission('stock', 'transfer')  # Stock transfer permission (Admin+)
 @require_http_methods(["POST"])
 def transfer_stock_api(request):
-    """Transfer stock between warehouses/locations"""
+    """Transfer stock between warehouses"""
     try:
         data = json.loads(request.body)
         goods_code = data.get('goods_code')
-        from_warehouse = data.get('from_warehouse', 'Main')
-        to_warehouse = data.get('to_warehouse')
         quantity = int(data.get('quantity', 0))
         reason = data.get('reason', '')
         
-        if not all([goods_code, to_warehouse, quantity > 0]):
+        if not all([goods_code, data.get('to_warehouse'), quantity > 0]):
             return JsonResponse({'success': False, 'error': 'Invalid data'}, status=400)
         
-        # Get source stock
-        source_stock = StockListModel.objects.filter(goods_code=goods_code).first()
-        if not source_stock:
-            return JsonResponse({'success': False, 'error': 'Source stock not found'}, status=404)
+        from_warehouse = ledger.resolve_warehouse(data.get('from_warehouse'))
+        to_warehouse = ledger.resolve_warehouse(data.get('to_warehouse'))
+        if not from_warehouse or not to_warehouse:
+            return JsonResponse({'success': False, 'error': 'Warehouse not found'}, status=404)
+        if from_warehouse.pk == to_warehouse.pk:
+            return JsonResponse({'success': False, 'error': 'Source and destination must differ'}, status=400)
         
-        if source_stock.goods_qty < quantity:
+        try:
+            remaining = ledger.transfer(goods_code, from_warehouse, to_warehouse, quantity, request.user, reason,
+                                        openid=data.get('openid') or request.user.username)
+        except ledger.InsufficientStock:
             return JsonResponse({'success': False, 'error': 'Insufficient stock for transfer'}, status=400)
         
-        # Reduce from source
-        source_stock.goods_qty -= quantity
-        source_stock.can_order_stock -= quantity
-        source_stock.save()
-        
-        # Record outbound movement
-        StockMovement.objects.create(
-            goods_code=goods_code,
-            movement_type='out',
-            quantity=-quantity,
-            reason=f'Transfer to {to_warehouse}: {reason}',
-            user=request.user
-        )
-        
-        # Record inbound movement
-        StockMovement.objects.create(
-            goods_code=goods_code,
-            movement_type='in',
-            quantity=quantity,
-            reason=f'Transfer from {from_warehouse}: {reason}',
-            user=request.user
-        )
-        
         return JsonResponse({
             'success': True,
-            'message': f'Transferred {quantity} units to {to_warehouse}',
-            'remaining_stock': source_stock.goods_qty
+            'message': f'Transferred {quantity} units to {to_warehouse.warehouse_name}',
+            'remaining_stock': remaining
         })
     
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
+@require_permission('stock', 'view')
+def warehouse_balances_api(request):
+    """Per-warehouse balances of one product, or units per warehouse overall"""
+    goods_code = request.GET.get('goods_code')
+    if goods_code:
+        total = StockListModel.objects.filter(goods_code=goods_code).aggregate(total=Sum('onhand_stock'))['total']
+        return JsonResponse({
+            'success': True,
+            'goods_code': goods_code,
+            'total': total or 0,
+            'unallocated': sum(ledger.unallocated(goods_code).values()),
+            'warehouses': [{
+                'warehouse_id': row['warehouse_id'],
+                'warehouse_name': row['warehouse__warehouse_name'],
+                'onhand_stock': row['onhand_stock'],
+            } for row in ledger.balances(goods_code)],
+        })
+    totals = ledger.warehouse_totals()
+    return JsonResponse({
+        'success': True,
+        'total_units': totals['total_units'],
+        'warehouses': [{
+            'warehouse_id': row['warehouse_id'],
+            'warehouse_name': row['warehouse__warehouse_name'],
+            'total_units': row['total_units'],
+        } for row in totals['warehouses']],
+    })
+
 @require_permission('stock', 'view')
 def stock_movements_page(request):
     """Stock movements page with filters"""
@@ -264,27 +402,34 @@ def delete_movement(request, movement_id):
 @require_permission('stock', 'view')  # View stock movements
 def stock_movements_api(request):
     """Get stock movement history"""
+    from greaterwms.pagination import estimated_count
+    from django.utils import timezone
+    from datetime import timedelta
+
     try:
         goods_code = request.GET.get('goods_code')
         movement_type = request.GET.get('type')
         days = int(request.GET.get('days', 30))
-        page = int(request.GET.get('page', 1))
-        per_page = int(request.GET.get('per_page', 50))
+        page = max(1, int(request.GET.get('page', 1)))
+        per_page = min(200, max(1, int(request.GET.get('per_page', 50))))
         
-        movements = StockMovement.objects.all()
+        movements = StockMovement.objects.select_related('user')
         
         if goods_code:
             movements = movements.filter(goods_code=goods_code)
         if movement_type:
             movements = movements.filter(movement_type=movement_type)
+        if days > 0:
+            movements = movements.filter(created_at__gte=timezone.now() - timedelta(days=days))
         
-        # Pagination
-        from django.core.paginator import Paginator
-        paginator = Paginator(movements, per_page)
-        page_obj = paginator.get_page(page)
+        # Estimated count: an exact COUNT(*) over the whole ledger on every page is too slow
+        total, exact = estimated_count(movements)
+        offset = (page - 1) * per_page
+        page_rows = list(movements.order_by('-created_at', '-id')[offset:offset + per_page + 1])
+        has_next = len(page_rows) > per_page
         
         results = []
-        for movement in page_obj:
+        for movement in page_rows[:per_page]:
             results.append({
                 'id': movement.id,
                 'goods_code': movement.goods_code,
@@ -298,10 +443,37 @@ def stock_movements_api(request):
         return JsonResponse({
             'success': True,
             'movements': results,
-            'total': paginator.count,
+            'total': total,
+            'total_exact': exact,
             'page': page,
-            'total_pages': paginator.num_pages
+            'has_next': has_next,
+            'total_pages': max(1, -(-total // per_page))
         })
     
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=400)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+@require_permission('stock', 'view')
+def stock_balance_at_api(request):
+    """On-hand balance of a product at a past date or time"""
+    from . import history
+    from django.utils import timezone
+    from django.utils.dateparse import parse_date, parse_datetime
+
+    goods_code = request.GET.get('goods_code')
+    at_raw = request.GET.get('at', '')
+    if not goods_code or not at_raw:
+        return JsonResponse({'success': False, 'error': 'goods_code and at are required'}, status=400)
+    try:
+        at = parse_datetime(at_raw)
+        if at is None:
+            day = parse_date(at_raw)
+            # A bare date means the balance at close of that day.
+            at = history.end_of_day(day) if day else None
+        elif timezone.is_naive(at):
+            at = timezone.make_aware(at)
+    except ValueError:
+        at = None
+    if at is None:
+        return JsonResponse({'success': False, 'error': 'at must be YYYY-MM-DD or an ISO datetime'}, status=400)
+    return JsonResponse({'success': True, **history.balance_at(goods_code, min(at, timezone.now()))})
@@ -12,6 +12,7 @@ import json
 
 # Import RBAC decorators
 from permissions.decorators import require_permission, check_permission
+from greaterwms.pagination import HybridPagination
 
 # Custom DRF permission class for supplier CRUD
 class SupplierPermission(BasePermission):
@@ -39,6 +40,7 @@ class SupplierPermission(BasePermission):
 class SupplierViewSet(viewsets.ModelViewSet):
     queryset = ListModel.objects.filter(is_delete=False)
     serializer_class = SupplierSerializer
+    pagination_class = HybridPagination
     permission_classes = [SupplierPermission]  # RBAC permission
     
     def get_queryset(self):
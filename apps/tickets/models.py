@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
-import uuid
+from django.utils import timezone
+
+from core.sequences import allocate
 
 class Ticket(models.Model):
     STATUS_CHOICES = [
@@ -57,7 +59,8 @@ class Ticket(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.ticket_number:
-            self.ticket_number = f"TKT-{uuid.uuid4().hex[:8].upper()}"
+            today = timezone.now().date()
+            self.ticket_number = f"TKT-{today:%Y%m%d}-{allocate('ticket', today):04d}"
         super().save(*args, **kwargs)
     
     @property
@@ -4,4 +4,5 @@ app_name = 'transfers'
 urlpatterns = [
     path('', views.transfer_list, name='list'),
     path('create/', views.create_transfer, name='create'),
+    path('<int:pk>/complete/', views.complete_transfer, name='complete'),
 ]
@@ -1,10 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
+from django.views.decorators.http import require_POST
 from permissions.decorators import require_role
 from .models import StockTransfer
 from goods.models import ListModel as Product
 from warehouse.models import ListModel as Warehouse
+from stock import ledger
 
 @login_required
 @require_role('superadmin','admin','supervisor','staff')
@@ -35,3 +38,23 @@ def create_transfer(request):
         'products': Product.objects.filter(is_delete=False),
         'warehouses': Warehouse.objects.all()
     })
+
+@login_required
+@require_role('superadmin','admin','supervisor')
+@require_POST
+def complete_transfer(request, pk):
+    transfer = get_object_or_404(StockTransfer.objects.select_related('product','from_warehouse','to_warehouse'), pk=pk)
+    try:
+        with transaction.atomic():
+            # Claiming the status first makes a double submit a no-op.
+            claimed = StockTransfer.objects.filter(pk=pk, status__in=['pending','in_transit']).update(status='completed')
+            if not claimed:
+                messages.error(request, f'Transfer is already {transfer.get_status_display().lower()}.')
+                return redirect('transfers:list')
+            ledger.transfer(transfer.product.goods_code, transfer.from_warehouse, transfer.to_warehouse,
+                            transfer.quantity, request.user, transfer.notes, openid=transfer.product.openid)
+    except ledger.InsufficientStock:
+        messages.error(request, f'{transfer.from_warehouse.warehouse_name} does not hold {transfer.quantity} units of {transfer.product.goods_code}.')
+        return redirect('transfers:list')
+    messages.success(request, 'Transfer completed.')
+    return redirect('transfers:list')
@@ -5,7 +5,6 @@ from rest_framework.response import Response
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
-from django.db.models import Sum, Count
 from .models import ListModel
 from .serializers import WarehouseSerializer
 from permissions.decorators import require_permission, require_role
@@ -20,7 +19,8 @@ class WarehouseViewSet(viewsets.ModelViewSet):
 @require_permission('warehouses', 'view')
 def warehouse_management_view(request):
     warehouses = ListModel.objects.filter(is_delete=False)
-    total_stock = StockListModel.objects.aggregate(total=Sum('goods_qty'))['total'] or 0
+    from stock.ledger import warehouse_totals
+    total_stock = warehouse_totals()['total_units']
     context = {
         'warehouses': warehouses,
         'total_warehouses': warehouses.count(),
@@ -47,7 +47,8 @@ def create_warehouse(request):
 @api_view(['GET'])
 def warehouse_stats(request):
     warehouses = ListModel.objects.filter(is_delete=False)
-    total_stock = StockListModel.objects.aggregate(total=Sum('goods_qty'))['total'] or 0
+    from stock.ledger import warehouse_totals
+    total_stock = warehouse_totals()['total_units']
     
     # Calculate pending transfers from stock movements
     from stock.models import StockMovement
@@ -0,0 +1,79 @@
+"""
+Buffered counters for hot read paths.
+
+Page views used to be a read-modify-write of the counted row on every
+request, which serialises readers on that row (and on SQLite's single
+writer lock) and drops increments when two requests race. ``increment``
+only adds to a process-local buffer; ``flush`` writes the buffer as
+``UPDATE ... SET field = field + n`` statements, one per model, field and
+amount, covering every object that received that amount. The buffer is
+flushed at the end of a request once ``FLUSH_INTERVAL`` seconds have passed
+(or ``MAX_PENDING`` objects are waiting) and when the process exits, so at
+most a few seconds of counts are lost if a worker is killed.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 10.0
+MAX_PENDING = 1000
+
+_lock = threading.Lock()
+_pending = defaultdict(int)
+_last_flush = [time.monotonic()]
+
+
+def increment(model, pk, field='views', amount=1):
+    """Count ``amount`` against ``model.field`` of row ``pk`` without writing yet."""
+    with _lock:
+        _pending[(model, field, pk)] += amount
+
+
+def pending(model, pk, field='views'):
+    """Increments for the row still waiting in this process's buffer."""
+    with _lock:
+        return _pending.get((model, field, pk), 0)
+
+
+def flush():
+    """Write the buffered increments; returns the number of rows updated."""
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush[0] = time.monotonic()
+    if not batch:
+        return 0
+    groups = defaultdict(list)
+    for (model, field, pk), amount in batch.items():
+        groups[(model, field, amount)].append(pk)
+    updated = 0
+    try:
+        with transaction.atomic():
+            for (model, field, amount), pks in groups.items():
+                updated += model._default_manager.filter(pk__in=pks).update(**{field: F(field) + amount})
+    except Exception:
+        logger.exception('Could not flush %d buffered counters; keeping them for the next flush', len(batch))
+        with _lock:
+            for key, amount in batch.items():
+                _pending[key] += amount
+        return 0
+    return updated
+
+
+def _flush_if_due(**kwargs):
+    if not _pending:
+        return
+    if len(_pending) >= MAX_PENDING or time.monotonic() - _last_flush[0] >= FLUSH_INTERVAL:
+        flush()
+
+
+request_finished.connect(_flush_if_due, dispatch_uid='greaterwms_counters_flush')
+atexit.register(flush)
@@ -0,0 +1,58 @@
+"""
+Deferred imports for heavy optional libraries.
+
+Every view module is imported when the URLconf loads, so a library imported
+at the top of one (openpyxl, qrcode, Pillow) is paid for by every cold
+start, including the serverless entry point in ``api/index.py``, even
+though only an export or a barcode request uses it. ``lazy_module``
+returns a stand-in that imports the real module on first attribute
+access::
+
+    openpyxl = lazy_module('openpyxl')
+    ...
+    wb = openpyxl.Workbook()        # imported here, once
+
+``available`` tells whether an optional library is installed without
+importing it. ``manage.py startup_report`` lists what is still imported at
+startup.
+"""
+import functools
+import importlib
+import importlib.util
+import threading
+
+
+class LazyModule:
+    """Proxy for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_module(name):
+    return LazyModule(name)
+
+
+@functools.lru_cache(maxsize=None)
+def available(name):
+    """True when ``name`` can be imported; only its parent packages are imported to find out."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
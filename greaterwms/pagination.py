@@ -0,0 +1,248 @@
+"""
+Pagination helpers shared across apps.
+
+DRF's own ``PageNumberPagination`` stays the project-wide default.
+Viewsets with deep listings opt into ``HybridPagination``, which serves
+count-bounded page numbers (``PageNumberPagination`` below) and keyset
+cursors.
+"""
+import base64
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(queryset, threshold=ESTIMATE_THRESHOLD):
+    """
+    Row count of ``queryset`` without scanning huge tables.
+
+    Returns ``(count, exact)``. Up to ``threshold`` rows the count is exact.
+    Beyond that PostgreSQL reports the planner's estimate; other databases
+    stop counting at ``threshold`` and return it with ``exact=False``, which
+    callers show as "10000+".
+    """
+    queryset = queryset.order_by()
+    if connections[queryset.db].vendor == 'postgresql':
+        plan = json.loads(queryset.explain(format='json'))
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate > threshold:
+            return estimate, False
+        return queryset.count(), True
+    count = queryset[:threshold + 1].count()
+    if count > threshold:
+        return threshold, False
+    return count, True
+
+
+def _flag(request, name, default=True):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off')
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """
+    ``?page=N`` pagination without an unbounded ``COUNT(*)``.
+
+    Reads one row past the page to know whether there is a next page, and
+    reports ``count`` from ``estimated_count`` with ``count_exact``;
+    ``?count=false`` leaves the count out entirely. Responses otherwise keep
+    DRF's ``count``/``next``/``previous``/``results`` shape. Deep pages still
+    pay for the ``OFFSET``; views that need them opt into ``HybridPagination``.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_query_param = 'count'
+    count_threshold = ESTIMATE_THRESHOLD
+    template = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.count = self.count_exact = None
+        if _flag(request, self.count_query_param):
+            self.count, self.count_exact = estimated_count(queryset, self.count_threshold)
+
+        page = request.query_params.get(self.page_query_param) or 1
+        if page in self.last_page_strings and self.count is not None:
+            page = max(1, math.ceil(self.count / page_size))
+        try:
+            self.page_number = int(page)
+            if self.page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(page_number=page, message='Invalid page number'))
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page, message='That page contains no results'))
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.count is not None:
+            body.update(count=self.count, count_exact=self.count_exact)
+        body.update(next=self.get_next_link(), previous=self.get_previous_link(), results=data)
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['required'] = ['results']
+        response['properties']['count_exact'] = {'type': 'boolean', 'example': True}
+        return response
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class CursorPagination(pagination.BasePagination):
+    """
+    Keyset pagination on ``(ordering field, id)``.
+
+    Each page is ``WHERE (field, id) > last seen ORDER BY field, id LIMIT n``,
+    so page 1000 costs the same index range scan as page 1, with no count
+    and no ``OFFSET``. Views choose the key with ``cursor_ordering`` (default
+    ``'-id'``); the field must be non-null and should be indexed together
+    with the primary key. ``next``/``previous`` carry opaque cursors. Rows
+    may be model instances or ``.values()`` dicts.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    ordering = '-id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        self.pk_name = queryset.model._meta.pk.attname
+        model_field = queryset.model._meta.get_field(self.field if self.field != 'pk' else self.pk_name)
+        keys = [self.field] if model_field.primary_key else [self.field, 'pk']
+
+        position = self.decode_cursor(request, model_field)
+        self.backwards = bool(position and position['previous'])
+        descending = self.descending != self.backwards
+        if position:
+            after = Q(**{f"{keys[-1]}__{'lt' if descending else 'gt'}": position['pk']})
+            if len(keys) == 2:
+                after = Q(**{f"{self.field}__{'lt' if descending else 'gt'}": position['value']}) | \
+                    (Q(**{self.field: position['value']}) & after)
+            queryset = queryset.filter(after)
+        rows = list(queryset.order_by(*[f'-{key}' if descending else key for key in keys])[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.backwards:
+            rows.reverse()
+        self.keys = keys
+        self.next_row = rows[-1] if rows and (has_more or self.backwards) else None
+        self.previous_row = rows[0] if rows and position and (has_more or not self.backwards) else None
+        return rows
+
+    def get_page_size(self, request):
+        return pagination.PageNumberPagination.get_page_size(self, request)
+
+    def decode_cursor(self, request, model_field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            return {
+                'value': model_field.to_python(position['v']),
+                'pk': int(position['id']),
+                'previous': bool(position.get('p')),
+            }
+        except (ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound('Invalid cursor.')
+
+    def encode_cursor(self, row, previous):
+        pk = row[self.pk_name] if isinstance(row, dict) else row.pk
+        if self.field == 'pk':
+            value = pk
+        else:
+            value = row[self.field] if isinstance(row, dict) else getattr(row, self.field)
+        # isoformat() keeps microseconds, which DjangoJSONEncoder would round away.
+        position = {'v': value.isoformat() if hasattr(value, 'isoformat') else value, 'id': pk}
+        if previous:
+            position['p'] = 1
+        value = json.dumps(position, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+        cursor = base64.urlsafe_b64encode(value).decode().rstrip('=')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self.encode_cursor(self.next_row, previous=False) if self.next_row is not None else None
+
+    def get_previous_link(self):
+        return self.encode_cursor(self.previous_row, previous=True) if self.previous_row is not None else None
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class HybridPagination(pagination.BasePagination):
+    """
+    Page numbers by default, keyset cursors once the client asks for them.
+
+    Requests carrying ``?cursor=`` (empty for the first page) use
+    ``CursorPagination``; others keep ``?page=N`` with a bounded count, so
+    existing clients are unaffected. Viewsets opt in with
+    ``pagination_class = HybridPagination`` and optionally ``cursor_ordering``.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        if CursorPagination.cursor_query_param in request.query_params:
+            self.delegate = CursorPagination()
+        else:
+            self.delegate = PageNumberPagination()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return (PageNumberPagination().get_schema_operation_parameters(view)
+                + CursorPagination().get_schema_operation_parameters(view))
@@ -0,0 +1,27 @@
+"""
+JSON renderer backed by orjson when it is installed.
+
+Produces the same bytes as DRF's compact ``JSONRenderer`` for API data
+(datetimes, decimals and other non-JSON types still go through DRF's
+encoder) several times faster on large lists. Without orjson, or when a
+client asks for indented output, it is DRF's renderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact \
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        body = orjson.dumps(
+            data, default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Same JavaScript-safe escaping as JSONRenderer.
+        return body.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,151 @@
+"""
+Read replica routing for heavy read-only views.
+
+Reports, dashboards, analytics and exports run long aggregate queries on
+the same ``default`` connection as checkout and stock writes. When a
+``replica`` database is configured (``REPLICA_DATABASE_URL``: a Postgres
+replica, or a second SQLite file kept in sync), code inside
+``replica_reads`` sends its ORM reads there::
+
+    @require_role('admin')
+    @replica_reads
+    def sales_report(request): ...
+
+    with replica_reads():
+        data = expensive_query()
+
+Raw SQL picks its connection with ``read_connection()``. Writes always go
+to ``default``, and reads stay there when:
+
+* no replica is configured, or the code is inside a transaction on
+  ``default``;
+* the current request has already written (read-your-writes);
+* the session made a non-GET request in the last
+  ``REPLICA_STICKY_SECONDS`` (default 10), so a report opened right after
+  placing an order is not behind the replica's lag. The pin is kept in the
+  shared cache by ``ReplicaPinMiddleware``.
+"""
+import threading
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+PIN_KEY = 'replica:pin:{}'
+SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'TRACE'))
+
+_state = threading.local()
+
+
+def _get(name, default=None):
+    return getattr(_state, name, default)
+
+
+def sticky_seconds():
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+def _pin_key(request):
+    session = getattr(request, 'session', None)
+    ident = session.session_key if session is not None else None
+    if not ident:
+        user = getattr(request, 'user', None)
+        ident = f'u{user.pk}' if user is not None and user.is_authenticated else request.META.get('REMOTE_ADDR')
+    return PIN_KEY.format(ident) if ident else None
+
+
+def _pinned():
+    pinned = _get('pinned')
+    if pinned is None:
+        request = _get('request')
+        key = _pin_key(request) if request is not None else None
+        try:
+            pinned = bool(key) and caches['shared'].get(key) is not None
+        except Exception:
+            # Without the pin we cannot promise read-your-writes; stay on the primary.
+            pinned = True
+        _state.pinned = pinned
+    return pinned
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def read_alias():
+    """The alias reads should use here and now: ``replica`` or ``default``."""
+    if (
+        not _get('depth', 0)
+        or not replica_configured()
+        or _get('wrote')
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        or _pinned()
+    ):
+        return DEFAULT_DB_ALIAS
+    return REPLICA
+
+
+def read_connection():
+    """Connection for raw read-only SQL; honours ``replica_reads`` like the router."""
+    return connections[read_alias()]
+
+
+class _ReplicaReads(ContextDecorator):
+    def __enter__(self):
+        _state.depth = _get('depth', 0) + 1
+        return self
+
+    def __exit__(self, *exc_info):
+        _state.depth -= 1
+        return False
+
+
+def replica_reads(func=None):
+    """Send reads in a block (``with replica_reads():``) or view (``@replica_reads``) to the replica."""
+    if func is None:
+        return _ReplicaReads()
+    return _ReplicaReads()(func)
+
+
+class ReplicaRouter:
+    """``DATABASE_ROUTERS`` entry: replica reads inside ``replica_reads``, everything else on default."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema from the primary.
+        return db != REPLICA
+
+
+class ReplicaPinMiddleware:
+    """Tracks the request for the router and pins a session to the primary after it writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.request, _state.pinned, _state.wrote = request, None, False
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.request = _state.pinned = None
+            _state.wrote = False
+        if request.method not in SAFE_METHODS and replica_configured():
+            key = _pin_key(request)
+            if key:
+                try:
+                    caches['shared'].set(key, 1, sticky_seconds())
+                except Exception:
+                    pass
+        return response
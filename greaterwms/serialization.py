@@ -0,0 +1,141 @@
+"""
+Fast read path for flat ModelSerializers.
+
+``ValuesSerializer`` compiles a serializer class once into a tuple of
+``(name, source, converter)`` entries and then turns ``.values()`` rows
+into the same dicts ``serializer(rows, many=True).data`` would produce,
+without building model instances or running per-field ``to_representation``
+for plain columns. Only flat serializers qualify (model columns and
+primary-key relations); anything else makes ``compile`` return ``None``
+and callers keep the regular serializer.
+
+``FastListMixin`` applies it to a viewset's ``list`` action.
+"""
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+# Field types whose database value already is the representation.
+PASSTHROUGH = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.FloatField,
+    serializers.IntegerField, serializers.JSONField, serializers.PrimaryKeyRelatedField,
+)
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return None
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None:
+        return None
+    if output_format.lower() != ISO_8601:
+        return field.to_representation
+    return lambda value: value.isoformat() if value is not None and not isinstance(value, str) else value
+
+
+def _file_converter(field, model_field, context):
+    storage = model_field.storage
+    request = context.get('request')
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def convert(value):
+        if not value:
+            return None
+        if not use_url:
+            return value
+        url = storage.url(value)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def _converter(field, model, context):
+    """Converter for one serializer field, ``None`` for passthrough; raises LookupError if unsupported."""
+    if field.source == '*' or '.' in field.source:
+        raise LookupError(field.field_name)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, serializers.DateField):
+        return _date_converter(field)
+    if isinstance(field, serializers.FileField):
+        return _file_converter(field, model._meta.get_field(field.source), context)
+    if isinstance(field, serializers.DecimalField):
+        return field.to_representation
+    if isinstance(field, PASSTHROUGH):
+        return None
+    raise LookupError(field.field_name)
+
+
+class ValuesSerializer:
+    def __init__(self, model, entries):
+        self.model = model
+        self.entries = entries
+        self.sources = [source for _, source, _ in entries]
+
+    @classmethod
+    def compile(cls, serializer_class, context=None):
+        """Compile ``serializer_class`` for ``context``; ``None`` if it is not flat."""
+        context = context or {}
+        serializer = serializer_class(context=context)
+        model = serializer.Meta.model
+        entries = []
+        try:
+            for name, field in serializer.fields.items():
+                if field.write_only:
+                    continue
+                source = model._meta.get_field(field.source).attname if isinstance(
+                    field, serializers.PrimaryKeyRelatedField) else field.source
+                entries.append((name, source, _converter(field, model, context)))
+        except (LookupError, AttributeError):
+            return None
+        return cls(model, tuple(entries))
+
+    def many(self, rows):
+        """Representations of ``.values()`` dicts; ``None`` stays ``None`` as in DRF."""
+        entries = self.entries
+        return [
+            {name: (convert(row[source]) if convert and row[source] is not None else row[source])
+             for name, source, convert in entries}
+            for row in rows
+        ]
+
+
+class FastListMixin:
+    """
+    Serve ``list`` from ``.values()`` rows through ``ValuesSerializer``.
+
+    Filtering, search and pagination run as usual and the response body is
+    the same as the regular serializer's. The serializer is compiled once
+    per request (file URLs depend on it), not once per row. Views whose
+    serializer is not flat fall back to the standard ``list``.
+    """
+    def list(self, request, *args, **kwargs):
+        fast = ValuesSerializer.compile(self.get_serializer_class(), self.get_serializer_context())
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        sources = list(fast.sources)
+        # Keyset pagination reads its ordering key and the primary key from each row.
+        ordering_key = getattr(self, 'cursor_ordering', '-id').lstrip('-')
+        for key in (queryset.model._meta.pk.attname, ordering_key):
+            if key != 'pk' and key not in sources:
+                sources.append(key)
+        rows = queryset.values(*sources)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.many(page))
+        return Response(fast.many(rows))
@@ -0,0 +1,200 @@
+"""
+Low-write session engine (``SESSION_ENGINE = 'greaterwms.sessions'``).
+
+Django's database engine with ``SESSION_SAVE_EVERY_REQUEST`` wrote an
+``UPDATE django_session`` on every request, polling APIs included, and on
+SQLite every such write queues behind the single writer lock. This engine
+keeps the database as the authoritative copy and serves sessions from a
+read-through cache:
+
+* Reads come from ``caches[SESSION_CACHE_ALIAS]`` (one ``get_many``), so
+  ``login_verified`` and the auth keys need no database round trip. A
+  miss, a culled entry or an unreachable cache falls back to the row.
+* Every change to session data (login, logout, ``login_verified``, a cart)
+  is written to the database synchronously, like the database engine,
+  and deletes are immediate.
+* The expiry slides only when the remaining lifetime drops below
+  ``SESSION_REFRESH_THRESHOLD`` seconds (default: half of
+  ``SESSION_COOKIE_AGE``); ``load`` then marks the session modified and
+  ``SessionMiddleware`` saves it once. This replaces
+  ``SESSION_SAVE_EVERY_REQUEST``. When only the expiry moved, the new
+  ``expire_date`` goes to the cache at once and to the database
+  write-behind: a process-local queue, flushed as one ``bulk_update`` of
+  ``expire_date`` at the end of a request every ``FLUSH_INTERVAL`` seconds
+  (or at ``MAX_PENDING`` sessions) and at exit. A lost refresh only means
+  the row expires at its previous date, and the flush only updates rows
+  that still exist, so a session deleted meanwhile stays deleted.
+
+``invalidate_all`` drops every cached session by moving to a new cache
+generation, for code that deletes all session rows.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.core.signals import request_finished
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'sessions.lowwrite.'
+GENERATION_KEY = 'sessions:generation'
+FLUSH_INTERVAL = 30.0
+MAX_PENDING = 500
+
+_lock = threading.Lock()
+_pending = {}
+_last_flush = [time.monotonic()]
+
+
+def _cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def refresh_threshold():
+    return getattr(settings, 'SESSION_REFRESH_THRESHOLD', settings.SESSION_COOKIE_AGE // 2)
+
+
+class SessionStore(DBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        self._cache = _cache()
+        super().__init__(session_key)
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def _cache_entry(self, data, expires):
+        return {'data': data, 'expires': expires.timestamp(), 'generation': self._generation}
+
+    def _read_cache(self):
+        """The cached entry (``None`` on a miss), noting the current generation."""
+        try:
+            values = self._cache.get_many([GENERATION_KEY, self.cache_key])
+        except Exception:
+            logger.warning('Session cache unavailable; reading from the database', exc_info=True)
+            self._generation = None
+            return None
+        self._generation = values.get(GENERATION_KEY, 0)
+        entry = values.get(self.cache_key)
+        if entry is None or entry.get('generation') != self._generation:
+            return None
+        return entry
+
+    def _write_cache(self, data, expires):
+        if self._generation is None:
+            return
+        try:
+            self._cache.set(self.cache_key, self._cache_entry(data, expires), self.get_expiry_age(expiry=expires))
+        except Exception:
+            logger.warning('Could not cache session', exc_info=True)
+
+    def load(self):
+        entry = self._read_cache()
+        if entry is None:
+            session = self._get_session_from_db()
+            if session is None:
+                return {}
+            data = self.decode(session.session_data)
+            self._write_cache(data, session.expire_date)
+            expires = session.expire_date.timestamp()
+        else:
+            data, expires = entry['data'], entry['expires']
+        remaining = expires - time.time()
+        if remaining <= 0:
+            self._session_key = None
+            return {}
+        self._loaded = self.serializer().dumps(data)
+        if remaining < refresh_threshold():
+            # Slide the expiry; SessionMiddleware saves modified sessions once.
+            self.modified = True
+        return data
+
+    def exists(self, session_key):
+        return self.cache_key_prefix + session_key in self._cache or super().exists(session_key)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if not hasattr(self, '_generation'):
+            self._read_cache()
+        data = self._get_session(no_load=must_create)
+        expires = self.get_expiry_date()
+        if must_create or getattr(self, '_loaded', None) != self.serializer().dumps(data):
+            # Data changes are written now; a queued expiry refresh is superseded by this write.
+            with _lock:
+                _pending.pop(self.session_key, None)
+            super().save(must_create=must_create)
+            self._loaded = self.serializer().dumps(data)
+        else:
+            with _lock:
+                _pending[self.session_key] = expires
+        self._write_cache(data, expires)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        with _lock:
+            _pending.pop(session_key, None)
+        try:
+            self._cache.delete(self.cache_key_prefix + session_key)
+        except Exception:
+            logger.warning('Could not drop cached session', exc_info=True)
+        super().delete(session_key)
+
+
+def flush():
+    """Write queued expiry refreshes to the database; returns the number of sessions written."""
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush[0] = time.monotonic()
+    if not batch:
+        return 0
+    model = SessionStore.get_model_class()
+    rows = [model(session_key=key, expire_date=expires) for key, expires in batch.items()]
+    try:
+        # UPDATE only: a session deleted since it was queued must not come back.
+        model.objects.bulk_update(rows, ['expire_date'], batch_size=MAX_PENDING)
+    except Exception:
+        logger.exception('Could not flush %d sessions; keeping them for the next flush', len(batch))
+        with _lock:
+            for key, value in batch.items():
+                _pending.setdefault(key, value)
+        return 0
+    return len(batch)
+
+
+def pending():
+    with _lock:
+        return len(_pending)
+
+
+def invalidate_all():
+    """Forget every cached session (the database rows are the caller's business)."""
+    with _lock:
+        _pending.clear()
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        cache.incr(GENERATION_KEY)
+
+
+def _flush_if_due(**kwargs):
+    if not _pending:
+        return
+    if len(_pending) >= MAX_PENDING or time.monotonic() - _last_flush[0] >= FLUSH_INTERVAL:
+        flush()
+
+
+request_finished.connect(_flush_if_due, dispatch_uid='greaterwms_sessions_flush')
+atexit.register(flush)
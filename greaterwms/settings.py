@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 import sys
+import tempfile
 from decouple import config, Csv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -82,6 +83,9 @@ INSTALLED_APPS = [
     'adjustments',
     'returns',
     'transfers',
+    'backup',
+    'availability',
+    'core',
     'django.contrib.sites',
     'allauth',
     'allauth.account',
@@ -89,6 +93,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -96,6 +101,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'greaterwms.routers.ReplicaPinMiddleware',
+    'security.middleware.RateLimitMiddleware',
     'auth_system.middleware.RoleBasedAccessMiddleware',
     'audit.middleware.AuditLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -141,6 +148,29 @@ DATABASES = {
     )
 }
 
+# Optional read replica for reports, dashboards and exports (see greaterwms.routers).
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default='').strip()
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+        ssl_require=config('DB_SSL_REQUIRE', default=not DEBUG, cast=bool),
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['greaterwms.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# SQLite has no SSL. Deployments running several workers on one SQLite file
+# set SQLITE_TUNED=True for WAL and BEGIN IMMEDIATE (see greaterwms.sqlite.base).
+# It is off by default: WAL mode is persistent and would convert the tracked
+# db.sqlite3, which stays in rollback-journal mode.
+for database in DATABASES.values():
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        database.get('OPTIONS', {}).pop('sslmode', None)
+        if config('SQLITE_TUNED', default=False, cast=bool):
+            database['ENGINE'] = 'greaterwms.sqlite'
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -163,6 +193,36 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# 'default' stays process-local. 'shared' is seen by every worker: Redis when
+# REDIS_URL is set, otherwise a file cache on this host. Use it for small
+# cross-worker state such as invalidation version keys.
+REDIS_URL = config('REDIS_URL', default='').strip()
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('SHARED_CACHE_DIR', default=str(Path(tempfile.gettempdir()) / 'multistock_cache')),
+        # Rate-limit counters live here too; the default of 300 entries would cull them.
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    # Read-through copy of django_session for greaterwms.sessions. The database
+    # row stays authoritative, so a culled or lost entry only costs a query.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'sessions',
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('SESSION_CACHE_DIR', default=str(Path(tempfile.gettempdir()) / 'multistock_sessions')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -173,7 +233,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'greaterwms.renderers.FastJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
@@ -205,10 +265,13 @@ ACCOUNT_LOGIN_ON_GET = False
 ACCOUNT_LOGOUT_ON_GET = False
 SOCIALACCOUNT_LOGIN_ON_GET = False
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessions read from the cache; only expiry refreshes are written behind (see greaterwms.sessions).
+SESSION_ENGINE = 'greaterwms.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_COOKIE_AGE = 86400
-SESSION_SAVE_EVERY_REQUEST = True
+# The expiry slides once less than this many seconds remain, instead of on every request.
+SESSION_REFRESH_THRESHOLD = SESSION_COOKIE_AGE // 2
 
 CSRF_COOKIE_SECURE = not DEBUG
 CSRF_COOKIE_HTTPONLY = False
@@ -239,5 +302,18 @@ EMAIL_TIMEOUT = 30
 if not EMAIL_HOST_USER or not EMAIL_HOST_PASSWORD:
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Shared rate limits (see security.ratelimit). Every policy whose path prefix
+# (and methods) match a request counts it.
+RATE_LIMITS = [
+    {'name': 'api', 'path': '/api/', 'rate': config('RATE_LIMIT_API', default='1000/hour'), 'key': 'user'},
+    {'name': 'stock-api', 'path': '/stock/api/', 'rate': config('RATE_LIMIT_API', default='1000/hour'), 'key': 'user'},
+    {'name': 'auth', 'path': '/auth/', 'methods': ['POST'], 'rate': config('RATE_LIMIT_AUTH', default='30/minute'),
+     'key': 'ip'},
+]
+# Proxies in front of the app that append to X-Forwarded-For (0: use REMOTE_ADDR).
+RATE_LIMIT_PROXY_COUNT = config('RATE_LIMIT_PROXY_COUNT', default=0, cast=int)
+
 OTP_EXPIRY_SECONDS = 600
 OTP_MAX_ATTEMPTS = 3
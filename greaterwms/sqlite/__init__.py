@@ -0,0 +1,4 @@
+"""
+Tuned SQLite backend for running on SQLite in production
+(``ENGINE = 'greaterwms.sqlite'``); see ``base``.
+"""
@@ -0,0 +1,101 @@
+"""
+SQLite backend tuned for several workers writing to one database file.
+
+Django's SQLite backend keeps SQLite's defaults: a rollback journal (a
+writer blocks every reader), ``synchronous=FULL`` and deferred
+transactions. A deferred transaction that reads and then writes takes the
+write lock only at its first write; when two workers do that at once, one
+of them gets ``database is locked`` straight away, because SQLite cannot
+wait without deadlocking. This backend:
+
+* sets ``PRAGMAS`` on every new connection: WAL (readers and the writer no
+  longer block each other), ``synchronous=NORMAL`` (durable in WAL mode
+  except for the last commits on power loss), ``busy_timeout``, a memory
+  map and a larger page cache. ``OPTIONS['pragmas']`` overrides them;
+* starts ``atomic()`` blocks with ``BEGIN IMMEDIATE``, so a transaction
+  waits for the write lock up front instead of failing half way;
+* retries a statement that still fails with SQLITE_BUSY outside a
+  transaction (including ``BEGIN IMMEDIATE`` itself) up to
+  ``OPTIONS['busy_retries']`` times with exponential backoff starting at
+  ``OPTIONS['busy_backoff']`` seconds. A statement inside a transaction is
+  not retried: the caller's transaction has to be rolled back.
+
+Settings select it for SQLite databases when ``SQLITE_TUNED=True`` (off by
+default, since switching a file to WAL is persistent and the repository's
+``db.sqlite3`` is kept in rollback-journal mode);
+``manage.py benchmark_sqlite`` compares it with the stock backend.
+"""
+import logging
+import random
+import sqlite3
+import time
+
+from django.db.backends.sqlite3 import base
+
+logger = logging.getLogger(__name__)
+
+PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32000,
+}
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05
+
+
+def is_busy(error):
+    message = str(error)
+    return 'database is locked' in message or 'database is busy' in message
+
+
+class SQLiteCursorWrapper(base.SQLiteCursorWrapper):
+    retries = BUSY_RETRIES
+    backoff = BUSY_BACKOFF
+
+    def _retry(self, run, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return run(*args)
+            except sqlite3.OperationalError as error:
+                if not is_busy(error) or attempt == self.retries or self.connection.in_transaction:
+                    raise
+                delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+                logger.info('SQLite busy, retrying in %.0f ms (attempt %d)', delay * 1000, attempt + 1)
+                time.sleep(delay)
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        # Materialise generators so a retry sends the same rows.
+        return self._retry(super().executemany, query, list(param_list))
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        self.busy_retries = options.get('busy_retries', BUSY_RETRIES)
+        self.busy_backoff = options.get('busy_backoff', BUSY_BACKOFF)
+        kwargs = super().get_connection_params()
+        for key in ('pragmas', 'busy_retries', 'busy_backoff'):
+            kwargs.pop(key, None)
+        # sqlite3 waits on locks for `timeout` seconds; keep it in line with busy_timeout.
+        kwargs.setdefault('timeout', self.pragmas['busy_timeout'] / 1000)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=SQLiteCursorWrapper)
+        cursor.retries, cursor.backoff = self.busy_retries, self.busy_backoff
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -7,6 +7,7 @@ from django.http import JsonResponse
 from django.views.generic import RedirectView
 from . import views, views_superadmin, views_dashboards, views_purge, views_guest
 from supplier.views import supplier_management_view
+from monitoring import health_check
 
 urlpatterns = [
     path('favicon.ico', RedirectView.as_view(url='/static/images/favicon.svg', permanent=True)),
@@ -100,12 +101,16 @@ urlpatterns = [
     path('mobile/api-docs/', lambda request: render(request, 'mobile/api_docs.html'), name='mobile_api_docs'),
 
     # APIs
+    path('api/availability/', include('availability.urls')),
     path('api/', include('api.urls')),
     path('search/', include('search.urls')),
     path('api/search/', views.search_api, name='search_api'),
     path('api/automation/', views.automation_api, name='automation_api'),
     path('api/reports/', views.reports_api, name='reports_api'),
     path('health/', lambda request: JsonResponse({'status': 'healthy', 'version': '2.0'}), name='health_check'),
+    path('health/services/', health_check.health_check, name='health_services'),
+    path('health/metrics/', health_check.prometheus_metrics, name='prometheus_metrics'),
+    path('health/metrics.json', health_check.metrics_api, name='metrics_api'),
     path('admin/purge/', views_purge.purge_data, name='purge_data'),
 ]
 
@@ -0,0 +1,68 @@
+"""
+Shared version numbers for process-local snapshots.
+
+Several modules keep a whole table (categories, system settings, resolved
+roles) in process memory and need to know when another worker changed it.
+A ``SharedVersion`` is an integer in the shared cache: readers compare it
+with the version their snapshot was built from, and writers bump it once
+their transaction commits. The version is read at most once per request
+(the check is forgotten on ``request_started``) or every
+``check_interval`` seconds outside one, so an unchanged snapshot costs a
+single cache read per request::
+
+    VERSION = SharedVersion('categories:registry:version')
+
+    if _state['version'] != VERSION.get():
+        ...reload...
+
+    VERSION.invalidate()  # in a post_save/post_delete handler
+"""
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.signals import request_started
+from django.db import transaction
+
+CHECK_INTERVAL = 5.0
+
+
+class SharedVersion:
+    def __init__(self, key, check_interval=CHECK_INTERVAL):
+        self.key = key
+        self.check_interval = check_interval
+        self._checked = threading.local()
+        request_started.connect(self.forget, dispatch_uid=f'shared_version:{key}')
+
+    def forget(self, **kwargs):
+        """Re-read the shared version on the next ``get`` (connected to ``request_started``)."""
+        self._checked.version = None
+
+    def _remember(self, version):
+        self._checked.version, self._checked.at = version, time.monotonic()
+
+    def get(self):
+        version = getattr(self._checked, 'version', None)
+        if version is not None and time.monotonic() - self._checked.at < self.check_interval:
+            return version
+        cache = caches['shared']
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, 1, timeout=None)
+            version = cache.get(self.key, 1)
+        self._remember(version)
+        return version
+
+    def bump(self):
+        cache = caches['shared']
+        try:
+            version = cache.incr(self.key)
+        except ValueError:
+            cache.add(self.key, 1, timeout=None)
+            version = cache.incr(self.key)
+        self._remember(version)
+        return version
+
+    def invalidate(self):
+        """Bump the shared version after the current transaction commits."""
+        transaction.on_commit(self.bump)